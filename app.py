@@ -199,6 +199,53 @@ st.sidebar.info(
     """
 )
 
+# Dữ liệu có sẵn cho mã đang chọn (tra cứu từ catalog in-memory, không quét thư mục)
+with st.sidebar.expander("🗂️ Dữ liệu có sẵn", expanded=False):
+    try:
+        from utils.data_loader import get_dataset_catalog
+        available = get_dataset_catalog().availability(ticker)
+        source_labels = {"sentiment": "Sentiment", "granger": "Granger/TVAR"}
+        if available:
+            for entry in available:
+                date_range = (
+                    f" ({entry['date_min']} → {entry['date_max']})" if entry.get("date_min") else ""
+                )
+                rows = f"{entry['rows']:,} dòng" if entry.get("rows") is not None else "chưa rõ số dòng"
+                st.caption(
+                    f"✅ {source_labels.get(entry['source'], entry['source'])} · "
+                    f"{entry['data_type']} · {entry['period']} — {rows}{date_range}"
+                )
+        else:
+            st.caption(f"ℹ️ Không có dữ liệu cục bộ cho `{ticker}`.")
+    except Exception as e:
+        logger.error(f"Không thể đọc catalog dữ liệu: {e}")
+        st.caption("⚠️ Không thể đọc catalog dữ liệu.")
+
+# Prefetch giá nền cho toàn bộ mã trên sidebar (mỗi session chỉ khởi động một lần)
+with st.sidebar.expander("📡 Trạng thái dữ liệu giá", expanded=False):
+    try:
+        from config.cache_config import ENABLE_PRICE_PREFETCH
+        if ENABLE_PRICE_PREFETCH:
+            from utils.price_prefetcher import get_price_prefetcher
+            prefetcher = get_price_prefetcher()
+            if not st.session_state.get("price_prefetch_started"):
+                prefetcher.prefetch([t for group in tickers.values() for t in group] + [ticker])
+                st.session_state["price_prefetch_started"] = True
+
+            state_icons = {"fresh": "✅", "stale": "⚠️", "failed": "❌", "running": "🔄", "queued": "⏳"}
+            summary = prefetcher.summary()
+            st.caption(" · ".join(f"{state_icons.get(s, '')} {s}: {n}" for s, n in sorted(summary.items())))
+            for t, info in sorted(prefetcher.status().items()):
+                last_date = f" (đến {info['last_date']})" if info.get("last_date") else ""
+                st.caption(f"{state_icons.get(info['state'], '')} `{t}` — {info['state']}{last_date}")
+            if st.button("🔄 Làm mới trạng thái", key="price_prefetch_refresh"):
+                st.rerun()
+        else:
+            st.caption("ℹ️ Prefetch giá đang tắt (ENABLE_PRICE_PREFETCH).")
+    except Exception as e:
+        logger.error(f"Không thể khởi động prefetch giá: {e}")
+        st.caption("⚠️ Không thể đọc trạng thái dữ liệu giá.")
+
 # Lưu cấu hình vào session_state
 st.session_state["ticker"] = ticker
 st.session_state["data_type"] = data_type
@@ -255,8 +302,53 @@ with tabs[6]:
     wordcloud_tab = get_tab_module("ui.wordcloud_tab")
     wordcloud_tab()
 
+# ==============================
+# 🩺 CACHE DIAGNOSTICS (ẩn — bật bằng ?debug=cache hoặc SHOW_CACHE_INFO)
+# ==============================
+from config.cache_config import SHOW_CACHE_INFO
+if SHOW_CACHE_INFO or st.query_params.get("debug") == "cache":
+    with st.sidebar.expander("🩺 Cache diagnostics", expanded=True):
+        from config.cache_config import get_cache_stats
+        cache_stats = get_cache_stats()
+        components = cache_stats["components"]
+        if components:
+            import pandas as pd
+            stats_df = pd.DataFrame.from_dict(components, orient="index")[[
+                "calls", "hits", "misses", "hit_rate", "avg_compute_seconds",
+                "time_saved_seconds", "avg_entry_bytes", "evictions", "disk_hits",
+            ]].sort_values("calls", ascending=False)
+            st.dataframe(stats_df, use_container_width=True)
+        else:
+            st.caption("ℹ️ Chưa có lời gọi hàm cache nào trong process này.")
+        disk = cache_stats["disk"]
+        st.caption(
+            f"💾 Disk cache: {disk['size_bytes'] / 1024 / 1024:.1f} / {cache_stats['max_size_mb']} MB"
+            f"{'' if disk['enabled'] else ' (tắt)'}"
+        )
+        from models.sentiment_service import get_inference_stats
+        for service in get_inference_stats():
+            st.caption(
+                f"🤖 PhoBERT ({service['backend']}): hàng đợi {service['queue_depth']}/{service['queue_capacity']}, "
+                f"{service['batches']} batch (~{service['avg_requests_per_batch']} request/batch), "
+                f"p50 {service['batch_latency_p50_ms']} ms, p95 {service['batch_latency_p95_ms']} ms, "
+                f"threads {service['intra_op_threads']}/{service['inter_op_threads']}"
+            )
+
 
 
+# ==============================
+# 🔥 PHOBERT WARMUP (luồng nền, sau lần render đầu tiên)
+# ==============================
+from config.inference_config import ENABLE_MODEL_WARMUP
+if ENABLE_MODEL_WARMUP:
+    from models.model_warmup import start_warmup
+    warmup_status = start_warmup().status()
+    if not warmup_status["ready"]:
+        st.sidebar.progress(
+            warmup_status["progress"],
+            text=f"🤖 PhoBERT: {warmup_status['message']}",
+        )
+
 # ==============================
 # FLOATING CHATBOT BUTTON (LAZY LOADED)
 # ==============================
@@ -0,0 +1,171 @@
+"""
+Script đo thông lượng & độ trễ suy luận PhoBERT (phát hiện hồi quy hiệu năng)
+Chạy: python benchmark_sentiment.py [--batch-sizes 1,8,32] [--backends fp32,int8] [--threads 1,4]
+                                    [--output sentiment_benchmark.json] [--compare baseline.json]
+
+- Độ dài văn bản lấy mẫu từ dữ liệu thật: tiêu đề (title) và nội dung (content) vneconomy
+- Với mỗi tổ hợp (dữ liệu × backend × số luồng × batch size): văn bản/giây, độ trễ p50/p95 mỗi batch
+- Đo trực tiếp đường suy luận (tokenize + forward), bỏ qua sentiment store và inference service
+- Kết quả ghi ra JSON; --compare so với lần đo trước, exit code 1 nếu thông lượng giảm quá ngưỡng
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import torch
+
+from config.inference_config import INFERENCE_MAX_LENGTH, SUPPORTED_BACKENDS
+from models.sentiment_phobert import _predict_batches, configure_torch_threads, get_model, model_key, normalize_text
+
+DEFAULT_CORPUS = "data/data_world_cloud"
+DEFAULT_OUTPUT = "sentiment_benchmark.json"
+DATASETS = ("title", "content")
+
+# Thông lượng giảm quá tỉ lệ này so với baseline → coi là hồi quy
+REGRESSION_TOLERANCE = 0.15
+
+
+def sample_texts(corpus: str, column: str, samples: int, seed: int):
+    """Lấy mẫu ngẫu nhiên `samples` văn bản của cột `column` từ các file trong corpus"""
+    frames = []
+    for path in sorted(glob.glob(os.path.join(corpus, "*.xlsx"))):
+        df = pd.read_excel(path, usecols=[column], engine="openpyxl")
+        frames.append(df[column].dropna().astype(str))
+    if not frames:
+        raise SystemExit(f"❌ Không có file .xlsx nào trong {corpus}")
+    texts = pd.concat(frames, ignore_index=True)
+    texts = texts[texts.str.strip() != ""]
+    return [normalize_text(t) for t in texts.sample(min(samples, len(texts)), random_state=seed)]
+
+
+def token_lengths(texts, backend: str):
+    tokenizer, _ = get_model(backend)
+    encoded = tokenizer(texts, truncation=True, max_length=INFERENCE_MAX_LENGTH, padding=False)
+    return np.array([len(ids) for ids in encoded["input_ids"]])
+
+
+def run_case(texts, backend: str, threads: int, batch_size: int, repeats: int):
+    """Chạy `repeats` lượt qua toàn bộ texts theo từng request `batch_size` văn bản"""
+    configure_torch_threads(intra_op=threads)
+    # Chạy nóng: khởi tạo kernel / bộ nhớ cho kích thước batch này
+    _predict_batches(texts[:batch_size], batch_size, INFERENCE_MAX_LENGTH, backend)
+
+    latencies, total_seconds, total_texts = [], 0.0, 0
+    for _ in range(repeats):
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start:start + batch_size]
+            began = time.perf_counter()
+            _predict_batches(chunk, batch_size, INFERENCE_MAX_LENGTH, backend)
+            elapsed = time.perf_counter() - began
+            latencies.append(elapsed)
+            total_seconds += elapsed
+            total_texts += len(chunk)
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "texts_per_s": round(total_texts / total_seconds, 2),
+        "batch_p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "batch_p95_ms": round(float(np.percentile(latencies_ms, 95)), 2),
+        "batches": len(latencies),
+    }
+
+
+def case_id(result) -> str:
+    return f"{result['dataset']}/{result['backend']}/t{result['threads']}/b{result['batch_size']}"
+
+
+def compare(results, baseline_path: str, tolerance: float = REGRESSION_TOLERANCE) -> bool:
+    """In so sánh thông lượng với baseline; False nếu có tổ hợp giảm quá `tolerance`"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {case_id(r): r for r in json.load(f)["results"]}
+
+    ok = True
+    print(f"\n📐 So sánh với {baseline_path} (ngưỡng -{tolerance:.0%}):")
+    for result in results:
+        old = baseline.get(case_id(result))
+        if old is None:
+            continue
+        change = result["texts_per_s"] / old["texts_per_s"] - 1
+        regressed = change < -tolerance
+        ok &= not regressed
+        print(f"   {'❌' if regressed else '✅'} {case_id(result)}: {old['texts_per_s']} → {result['texts_per_s']} ({change:+.1%})")
+    return ok
+
+
+def parse_list(value: str, cast=str):
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark thông lượng PhoBERT (batch × độ dài × backend × luồng)")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help=f"Thư mục dữ liệu thật (mặc định: {DEFAULT_CORPUS})")
+    parser.add_argument("--datasets", default=",".join(DATASETS), help="Cột văn bản cần đo (title,content)")
+    parser.add_argument("--batch-sizes", default="1,8,16,32,64")
+    parser.add_argument("--backends", default=",".join(SUPPORTED_BACKENDS))
+    parser.add_argument("--threads", default=str(torch.get_num_threads()), help="Danh sách số luồng intra-op, vd. 1,2,4")
+    parser.add_argument("--samples", type=int, default=256, help="Số văn bản mỗi dataset")
+    parser.add_argument("--repeats", type=int, default=2, help="Số lượt đo mỗi tổ hợp")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--compare", default=None, help="File JSON baseline để phát hiện hồi quy")
+    args = parser.parse_args()
+
+    batch_sizes = parse_list(args.batch_sizes, int)
+    backends = parse_list(args.backends)
+    thread_counts = parse_list(args.threads, int)
+
+    results, length_stats = [], {}
+    for dataset in parse_list(args.datasets):
+        texts = sample_texts(args.corpus, dataset, args.samples, args.seed)
+        lengths = token_lengths(texts, backends[0])
+        length_stats[dataset] = {
+            "texts": len(texts),
+            "tokens_mean": round(float(lengths.mean()), 1),
+            "tokens_p50": int(np.percentile(lengths, 50)),
+            "tokens_p95": int(np.percentile(lengths, 95)),
+            "truncated_pct": round(float(np.mean(lengths >= INFERENCE_MAX_LENGTH)) * 100, 1),
+        }
+        print(f"\n📄 {dataset}: {length_stats[dataset]}")
+
+        for backend in backends:
+            get_model(backend)
+            for threads in thread_counts:
+                for batch_size in batch_sizes:
+                    result = {"dataset": dataset, "backend": backend, "threads": threads, "batch_size": batch_size}
+                    result.update(run_case(texts, backend, threads, batch_size, args.repeats))
+                    results.append(result)
+                    print(
+                        f"   {case_id(result):<28} {result['texts_per_s']:>9.1f} văn bản/s   "
+                        f"p50 {result['batch_p50_ms']:>8.1f} ms   p95 {result['batch_p95_ms']:>8.1f} ms"
+                    )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "model": model_key("fp32"),
+            "max_length": INFERENCE_MAX_LENGTH,
+            "torch": torch.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "samples": args.samples,
+            "repeats": args.repeats,
+            "seed": args.seed,
+        },
+        "lengths": length_stats,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Đã ghi {len(results)} kết quả vào {args.output}")
+
+    if args.compare and not compare(results, args.compare):
+        sys.exit(1)
@@ -0,0 +1,124 @@
+"""
+Script kiểm tra độ chính xác & tốc độ của backend int8 so với PhoBERT fp32
+(chạy trước khi đặt INFERENCE_BACKEND = "int8" trong config/inference_config.py)
+Chạy: python check_quantization.py [--input file] [--text-column title] [--label-column label] [--limit 500]
+
+- Độ trùng nhãn (argmax) và sai lệch xác suất int8 so với fp32
+- Nếu file có cột nhãn (-1/0/1 hoặc NEG/NEU/POS): độ chính xác của từng backend
+- Thông lượng (văn bản/giây) và dung lượng trọng số của từng backend
+"""
+
+import argparse
+import io
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+from config.inference_config import (
+    INFERENCE_BATCH_SIZE,
+    PARITY_MAX_MEAN_ABS_DIFF,
+    PARITY_MIN_AGREEMENT,
+)
+from models.sentiment_phobert import _label_to_score, get_label_names, get_model, predict_proba
+
+DEFAULT_INPUT = "data/data_world_cloud/cleaned_data_vneconomy_2018.xlsx"
+
+LABEL_ALIASES = {"neg": -1, "negative": -1, "neu": 0, "neutral": 0, "pos": 1, "positive": 1}
+
+
+def read_texts(path: str, text_column: str, label_column: str, limit: int):
+    """Đọc văn bản (và nhãn nếu có) từ xlsx / csv / parquet"""
+    if path.endswith(".csv"):
+        df = pd.read_csv(path, encoding="utf-8-sig")
+    elif path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_excel(path, engine="openpyxl")
+
+    if text_column not in df.columns:
+        raise SystemExit(f"❌ Không có cột '{text_column}' trong {path} (các cột: {list(df.columns)})")
+
+    df = df[df[text_column].notna() & (df[text_column].astype(str).str.strip() != "")].head(limit)
+    labels = None
+    if label_column in df.columns:
+        raw = df[label_column]
+        labels = raw.map(lambda v: LABEL_ALIASES.get(str(v).strip().lower(), v)).astype(int).to_numpy()
+    return df[text_column].astype(str).tolist(), labels
+
+
+def weights_size_mb(model) -> float:
+    """Dung lượng state_dict khi serialize (int8 lưu packed params nên không đếm được qua parameters())"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes / 1024 / 1024
+
+
+def run_backend(backend: str, texts, batch_size: int):
+    """Nạp model theo backend rồi chấm điểm toàn bộ văn bản (bỏ qua cache)"""
+    start = time.perf_counter()
+    _, model = get_model(backend)
+    load_seconds = time.perf_counter() - start
+
+    # Chạy nóng 1 batch để loại thời gian khởi tạo kernel khỏi phép đo
+    predict_proba(texts[:batch_size], batch_size=batch_size, use_cache=False, backend=backend)
+
+    start = time.perf_counter()
+    probs = predict_proba(texts, batch_size=batch_size, use_cache=False, backend=backend)
+    seconds = time.perf_counter() - start
+
+    return probs, {
+        "backend": backend,
+        "load_s": round(load_seconds, 2),
+        "score_s": round(seconds, 2),
+        "texts_per_s": round(len(texts) / seconds, 1) if seconds else float("inf"),
+        "weights_mb": round(weights_size_mb(model), 1),
+    }
+
+
+def check_quantization(path: str, text_column: str, label_column: str, limit: int, batch_size: int) -> bool:
+    texts, labels = read_texts(path, text_column, label_column, limit)
+    print(f"📄 {path}: {len(texts)} văn bản (cột '{text_column}')")
+
+    probs_fp32, stats_fp32 = run_backend("fp32", texts, batch_size)
+    probs_int8, stats_int8 = run_backend("int8", texts, batch_size)
+
+    names = get_label_names()
+    pred_fp32 = probs_fp32.argmax(axis=1)
+    pred_int8 = probs_int8.argmax(axis=1)
+    agreement = float(np.mean(pred_fp32 == pred_int8))
+    abs_diff = np.abs(probs_fp32 - probs_int8)
+
+    report = pd.DataFrame([stats_fp32, stats_int8]).set_index("backend")
+    if labels is not None:
+        for name, pred in (("fp32", pred_fp32), ("int8", pred_int8)):
+            scores = np.array([_label_to_score(names[i]) for i in pred])
+            report.loc[name, "accuracy"] = round(float(np.mean(scores == labels)), 4)
+
+    print(f"\n{report.to_string()}")
+    print(f"\n⚡ Tăng tốc int8: x{stats_int8['texts_per_s'] / stats_fp32['texts_per_s']:.2f}")
+    print(f"🗜️  Trọng số: {stats_fp32['weights_mb']} MB → {stats_int8['weights_mb']} MB")
+    print(f"🎯 Trùng nhãn với fp32: {agreement:.2%} (ngưỡng {PARITY_MIN_AGREEMENT:.0%})")
+    print(
+        f"📏 Sai lệch xác suất: trung bình {abs_diff.mean():.4f} (ngưỡng {PARITY_MAX_MEAN_ABS_DIFF}), "
+        f"lớn nhất {abs_diff.max():.4f}"
+    )
+
+    passed = agreement >= PARITY_MIN_AGREEMENT and abs_diff.mean() <= PARITY_MAX_MEAN_ABS_DIFF
+    print("\n✅ int8 đạt yêu cầu parity" if passed else "\n⚠️  int8 KHÔNG đạt yêu cầu parity — giữ backend fp32")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="So sánh PhoBERT int8 với fp32 (độ chính xác & tốc độ)")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help=f"File xlsx/csv/parquet (mặc định: {DEFAULT_INPUT})")
+    parser.add_argument("--text-column", default="title", help="Cột văn bản (mặc định: title)")
+    parser.add_argument("--label-column", default="label", help="Cột nhãn -1/0/1 hoặc NEG/NEU/POS (nếu có)")
+    parser.add_argument("--limit", type=int, default=500, help="Số văn bản tối đa (mặc định: 500)")
+    parser.add_argument("--batch-size", type=int, default=INFERENCE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    ok = check_quantization(args.input, args.text_column, args.label_column, args.limit, args.batch_size)
+    sys.exit(0 if ok else 1)
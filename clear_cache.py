@@ -28,6 +28,15 @@ def clear_streamlit_cache():
         else:
             print(f"ℹ️  Không tồn tại: {cache_dir}")
     
+    # Cache kết quả trên đĩa (SQLite, dùng chung giữa các worker)
+    try:
+        from config.cache_config import DISK_CACHE_PATH
+        from utils.disk_cache import get_disk_cache
+        removed = get_disk_cache().clear()
+        print(f"✅ Đã xóa {removed} entry trong disk cache: {DISK_CACHE_PATH}")
+    except Exception as e:
+        print(f"⚠️  Không thể xóa disk cache: {e}")
+    
     print("\n✨ Hoàn tất! Khởi động lại app để áp dụng.")
 
 if __name__ == "__main__":
@@ -35,6 +35,14 @@ PHOBERT_MODEL_TTL = None  # Vĩnh viễn - PhoBERT model
 # Giới hạn kích thước cache (MB)
 MAX_CACHE_SIZE_MB = 500
 
+# Cache kết quả trên đĩa (SQLite), dùng chung giữa các worker và sống qua restart
+ENABLE_DISK_CACHE = True
+DISK_CACHE_PATH = "data/.cache/results.sqlite"
+
+# Kho kết quả PhoBERT theo hash văn bản (không hết hạn — điểm chỉ phụ thuộc văn bản + model)
+ENABLE_SENTIMENT_CACHE = True
+SENTIMENT_CACHE_PATH = "data/.cache/sentiment.sqlite"
+
 # ======================================================
 # OPTIMIZATION FLAGS
 # ======================================================
@@ -46,6 +54,13 @@ ENABLE_LAZY_LOADING = True
 # Debouncing (milliseconds)
 DEBOUNCE_DELAY = 300
 
+# Compact dtypes cho DataFrame đã tải (float32 / int8 / category / string[pyarrow])
+# Giảm bộ nhớ mỗi session khi chạy nhiều worker Streamlit trên cùng máy
+ENABLE_COMPACT_DTYPES = False
+
+# Prefetch giá nền cho toàn bộ mã trên sidebar (đổi mã không phải chờ mạng)
+ENABLE_PRICE_PREFETCH = True
+
 # Show spinner
 SHOW_DATA_SPINNER = True
 SHOW_MODEL_SPINNER = True
@@ -89,6 +104,10 @@ def get_cache_config(component: str) -> dict:
             'ttl': GRANGER_TEST_TTL,
             'show_spinner': SHOW_MODEL_SPINNER
         },
+        'rolling_granger': {
+            'ttl': GRANGER_TEST_TTL,
+            'show_spinner': SHOW_MODEL_SPINNER
+        },
         'pearson_test': {
             'ttl': PEARSON_TEST_TTL,
             'show_spinner': SHOW_MODEL_SPINNER
@@ -116,6 +135,12 @@ def clear_all_cache():
         import streamlit as st
         st.cache_data.clear()
         st.cache_resource.clear()
+
+        from utils.disk_cache import get_disk_cache
+        get_disk_cache().clear()
+
+        from models.var_service import clear_var_cache
+        clear_var_cache()
         return True
     except Exception as e:
         print(f"Error clearing cache: {e}")
@@ -123,16 +148,26 @@ def clear_all_cache():
 
 
 def get_cache_stats():
-    """Lấy thống kê cache (chỉ dùng khi debug)"""
-    if not SHOW_CACHE_INFO:
-        return None
-    
-    # TODO: Implement cache statistics tracking
-    return {
+    """
+    Lấy thống kê cache theo component (hit, miss, thời gian tiết kiệm, dung lượng, eviction)
+
+    Returns:
+        dict: {'enabled', 'max_size_mb', 'components': {component: {...}}, 'disk': {...}}
+    """
+    from utils.cache_stats import get_stats
+
+    stats = {
         'enabled': True,
         'max_size_mb': MAX_CACHE_SIZE_MB,
-        'components_cached': [
-            'data_loader', 'price_data', 'granger_test',
-            'pearson_test', 'tvar_model', 'phobert_model'
-        ]
+        'components': get_stats().snapshot(),
+        'disk': {'enabled': ENABLE_DISK_CACHE, 'path': DISK_CACHE_PATH, 'size_bytes': 0},
     }
+
+    if ENABLE_DISK_CACHE:
+        try:
+            from utils.disk_cache import get_disk_cache
+            stats['disk']['size_bytes'] = get_disk_cache().size_bytes()
+        except Exception as e:
+            print(f"Error reading disk cache size: {e}")
+
+    return stats
@@ -0,0 +1,62 @@
+# ======================================================
+# 🤖 Inference Configuration cho PhoBERT (CPU)
+# ======================================================
+
+"""
+Cấu hình suy luận PhoBERT: backend, batch và ngưỡng kiểm tra độ chính xác
+Server không có GPU → ưu tiên các tùy chọn tối ưu cho CPU
+"""
+
+# ======================================================
+# BACKEND
+# ======================================================
+# "fp32": model gốc (mặc định)
+# "int8": dynamic quantization các lớp Linear sang int8 (nhanh hơn, nhẹ hơn trên CPU)
+INFERENCE_BACKEND = "fp32"
+SUPPORTED_BACKENDS = ("fp32", "int8")
+
+# ======================================================
+# MODEL SNAPSHOT & WARMUP
+# ======================================================
+# Bản lưu cục bộ của model (python snapshot_model.py) → khởi động không cần gọi Hub
+PHOBERT_SNAPSHOT_DIR = "data/.models/phobert"
+ENABLE_MODEL_WARMUP = True  # Nạp model trong luồng nền ngay sau lần render đầu tiên
+WARMUP_TEXT = "Thị trường chứng khoán hôm nay"  # Câu chạy thử để khởi tạo kernel
+
+# ======================================================
+# BATCH Settings
+# ======================================================
+INFERENCE_BATCH_SIZE = 32   # Số văn bản mỗi lần forward
+INFERENCE_MAX_LENGTH = 256  # Giới hạn độ dài input (token)
+
+# ======================================================
+# LONG TEXT (cửa sổ trượt cho bài báo đầy đủ)
+# ======================================================
+LONG_TEXT_OVERLAP = 64                # Số token chồng lấn giữa hai cửa sổ liên tiếp
+LONG_TEXT_MAX_WINDOWS = 32            # Số cửa sổ tối đa mỗi văn bản (~6.000 token)
+LONG_TEXT_ATTENTION_TEMPERATURE = 0.25  # Nhỏ hơn → cửa sổ cảm xúc rõ chiếm trọng số lớn hơn
+
+# ======================================================
+# THREADS (torch)
+# ======================================================
+# None → để torch tự chọn (mặc định = số core vật lý)
+INFERENCE_INTRA_OP_THREADS = None  # Số luồng trong một phép toán (matmul, ...)
+INFERENCE_INTER_OP_THREADS = 1     # Số luồng chạy song song các phép toán độc lập
+
+# ======================================================
+# INFERENCE SERVICE (1 luồng sở hữu model, gom request thành micro-batch)
+# ======================================================
+ENABLE_INFERENCE_SERVICE = True  # False → mỗi session tự chạy model (tranh chấp CPU)
+INFERENCE_QUEUE_SIZE = 64        # Số request chờ tối đa trong hàng đợi
+INFERENCE_QUEUE_TIMEOUT = 30     # Giây chờ chỗ trống trong hàng đợi / chờ kết quả
+INFERENCE_MAX_WAIT_MS = 10       # Thời gian chờ gom thêm request vào cùng micro-batch
+INFERENCE_MAX_BATCH_TEXTS = 256  # Số văn bản tối đa trong một micro-batch
+INFERENCE_LATENCY_WINDOW = 200   # Số batch gần nhất dùng để tính độ trễ p50/p95
+
+# ======================================================
+# PARITY CHECK (python check_quantization.py)
+# ======================================================
+# Tỉ lệ nhãn int8 trùng với fp32 tối thiểu để chấp nhận backend int8
+PARITY_MIN_AGREEMENT = 0.97
+# Sai lệch xác suất tuyệt đối trung bình tối đa
+PARITY_MAX_MEAN_ABS_DIFF = 0.02
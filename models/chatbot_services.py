@@ -19,6 +19,7 @@ from functools import lru_cache
 from utils.vndirect_api import get_vndirect_api
 from utils.chat_history_manager import ChatHistoryManager
 from utils.data_loader import load_price_data, load_sentiment_data, load_realtime_price_quote
+from utils.cache_stats import cached_data
 
 logger = logging.getLogger(__name__)
 
@@ -501,7 +502,7 @@ Bạn có thể:
     # ====================================================================
     # MARKET DATA ANALYSIS TOOLS FOR CHATBOT
     # ====================================================================
-    @st.cache_data(ttl=CACHE_TTL_TECHNICAL, show_spinner=False)
+    @cached_data("chatbot_technical", ttl=CACHE_TTL_TECHNICAL, show_spinner=False)
     def _get_technical_analysis(_self, symbol: str) -> str:
         """Lấy phân tích kỹ thuật cơ bản cho chatbot"""
         try:
@@ -546,7 +547,7 @@ Bạn có thể:
             logger.error(f"Lỗi phân tích kỹ thuật {symbol}: {e}")
             return ""
     
-    @st.cache_data(ttl=CACHE_TTL_SENTIMENT, show_spinner=False)
+    @cached_data("chatbot_sentiment", ttl=CACHE_TTL_SENTIMENT, show_spinner=False)
     def _get_sentiment_summary(_self, symbol: str) -> str:
         """Lấy tóm tắt cảm xúc tin tức"""
         try:
@@ -582,7 +583,7 @@ Bạn có thể:
     # ====================================================================
     # TRADING SIGNALS - Tín hiệu giao dịch
     # ====================================================================
-    @st.cache_data(ttl=CACHE_TTL_TECHNICAL, show_spinner=False)
+    @cached_data("chatbot_signals", ttl=CACHE_TTL_TECHNICAL, show_spinner=False)
     def _get_trading_signals(_self, symbol: str) -> str:
         """Lấy tín hiệu giao dịch kỹ thuật"""
         try:
@@ -633,7 +634,7 @@ Bạn có thể:
     # ====================================================================
     # REALTIME VNDirect PRICES WITH TIMEOUT HANDLING
     # ====================================================================
-    @st.cache_data(ttl=CACHE_TTL_REALTIME, show_spinner=False)
+    @cached_data("chatbot_realtime", ttl=CACHE_TTL_REALTIME, show_spinner=False)
     def _get_realtime_prices(_self, symbols_tuple) -> str:
         """
         Fetch realtime prices, skip timeout error silently.
@@ -731,7 +732,7 @@ Bạn có thể:
 
 
 # Quick questions
-@st.cache_data(show_spinner=False)
+@cached_data("chatbot_ui", show_spinner=False)
 def create_quick_question_buttons() -> List[str]:
     """Câu hỏi gợi ý với khả năng phân tích realtime"""
     return [
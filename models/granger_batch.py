@@ -0,0 +1,211 @@
+"""
+Granger Batch - Chạy kiểm định Granger VAR-based cho toàn bộ lưới dữ liệu
+
+- Lưới: mã cổ phiếu × Content/Title × Before/After Scandal, lấy từ DatasetCatalog
+  (data/data_{,title_}{before,after}_scandals/*.xlsx)
+- Mỗi dataset là một job độc lập (ADF → chọn lag → ước lượng VAR → test nhân quả)
+  chạy trên process pool; log chi tiết của từng job được gom lại, không in lẫn nhau
+- Kết quả gộp thành MỘT bảng tidy (mỗi dòng = một cặp caused ← causing của một dataset);
+  job lỗi vẫn có một dòng với cột `error` để bảng phủ đủ lưới
+- Module này không phụ thuộc Streamlit → dùng được từ run_granger_batch.py
+"""
+
+import contextlib
+import io
+import logging
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from models.granger_test import _granger_test_core
+from utils.data_loader import read_normalized_excel
+from utils.dataset_catalog import DatasetCatalog
+from utils.fingerprint import derive_fingerprint
+from utils.snapshot_store import load_or_build
+
+logger = logging.getLogger(__name__)
+
+DATA_TYPES = ("Content", "Title")
+TIME_PERIODS = ("Before Scandal", "After Scandal")
+
+# Biến mặc định: giá đóng cửa + điểm cảm xúc (theo paper)
+DEFAULT_COLUMNS = ("close", "tích cực", "tiêu cực")
+
+# Số process tối đa (mỗi job chỉ vài giây CPU, dữ liệu nhỏ)
+MAX_BATCH_WORKERS = min(8, os.cpu_count() or 1)
+
+RESULT_COLUMNS = [
+    "ticker", "data_type", "period", "caused", "causing", "lag", "coef_mean_abs",
+    "f_stat", "p_value", "p_value_bootstrap", "significant", "nobs", "stable", "error",
+]
+
+
+# ======================================================
+# 📋 LƯỚI JOB
+# ======================================================
+def build_jobs(
+    data_dir: str = "data",
+    tickers: Optional[Iterable[str]] = None,
+    data_types: Sequence[str] = DATA_TYPES,
+    periods: Sequence[str] = TIME_PERIODS,
+) -> List[Dict]:
+    """Danh sách job {ticker, data_type, period, path} theo thứ tự (loại dữ liệu, giai đoạn, mã)"""
+    # Không ghi manifest: catalog ở đây chỉ cần ánh xạ thư mục → file
+    catalog = DatasetCatalog(data_dir, manifest_path=None)
+    catalog.refresh()
+    wanted = {t.upper() for t in tickers} if tickers else None
+
+    jobs = []
+    for data_type in data_types:
+        for period in periods:
+            for entry in catalog.entries("granger", data_type, period):
+                if wanted is None or entry["ticker"] in wanted:
+                    jobs.append({
+                        "ticker": entry["ticker"],
+                        "data_type": data_type,
+                        "period": period,
+                        "path": entry["path"],
+                    })
+    return jobs
+
+
+# ======================================================
+# ⚙️ WORKER (process con)
+# ======================================================
+def _error_rows(job: Dict, error: str) -> List[Dict]:
+    return [{**_job_fields(job), "error": error}]
+
+
+def _job_fields(job: Dict) -> Dict:
+    return {"ticker": job["ticker"], "data_type": job["data_type"], "period": job["period"]}
+
+
+def run_job(
+    job: Dict,
+    columns: Sequence[str] = DEFAULT_COLUMNS,
+    maxlags: int = 14,
+    significance_level: float = 0.05,
+    test_individually: bool = True,
+    bootstrap_draws: int = 0,
+    bootstrap_method: str = "wild",
+    bootstrap_seed: Optional[int] = None,
+) -> Dict:
+    """
+    Chạy kiểm định cho một dataset.
+
+    Returns:
+        {"job": job, "rows": [dòng kết quả tidy], "log": output của _granger_test_core}
+    """
+    log = io.StringIO()
+    try:
+        df = load_or_build(job["path"], read_normalized_excel)
+        if "date" in df.columns:
+            df = derive_fingerprint(df.sort_values("date", ignore_index=True), df, "sort:date")
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            return {"job": job, "rows": _error_rows(job, f"Thiếu cột {missing}"), "log": ""}
+
+        # ValueWarning "unsupported index" của statsmodels: index sau dropna không liên tục, vô hại
+        with contextlib.redirect_stdout(log), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            results_df, var_model = _granger_test_core(
+                df[list(columns)], list(columns), maxlags, significance_level, test_individually,
+                bootstrap_draws, bootstrap_method, bootstrap_seed,
+                bootstrap_workers=1,  # đã song song theo job, không mở pool lồng nhau
+            )
+        if var_model is None or results_df.empty:
+            return {"job": job, "rows": _error_rows(job, "Không có kết quả hợp lệ"), "log": log.getvalue()}
+
+        nobs, stable = int(var_model.nobs), bool(var_model.is_stable())
+        rows = [
+            {
+                **_job_fields(job),
+                "caused": r["Biến bị ảnh hưởng"],
+                "causing": r["Biến gây ảnh hưởng"],
+                "lag": int(r["Lag"]),
+                "coef_mean_abs": r["Coef (TB)"],
+                "f_stat": r["F-statistic"],
+                "p_value": r["p-value"],
+                "p_value_bootstrap": r.get("p-value (bootstrap)"),
+                "significant": bool(r["p-value"] < significance_level),
+                "nobs": nobs,
+                "stable": stable,
+                "error": None,
+            }
+            for r in results_df.to_dict("records")
+        ]
+        return {"job": job, "rows": rows, "log": log.getvalue()}
+    except Exception as e:
+        return {"job": job, "rows": _error_rows(job, str(e)), "log": log.getvalue()}
+
+
+# ======================================================
+# 🚀 CHẠY CẢ LƯỚI
+# ======================================================
+def run_granger_batch(
+    jobs: List[Dict],
+    columns: Sequence[str] = DEFAULT_COLUMNS,
+    maxlags: int = 14,
+    significance_level: float = 0.05,
+    test_individually: bool = True,
+    bootstrap_draws: int = 0,
+    bootstrap_method: str = "wild",
+    bootstrap_seed: Optional[int] = None,
+    workers: int = MAX_BATCH_WORKERS,
+    progress: Optional[Callable[[Dict], None]] = None,
+) -> pd.DataFrame:
+    """
+    Chạy toàn bộ job trên process pool, trả về bảng tidy (thứ tự dòng theo thứ tự job).
+
+    `progress(outcome)` được gọi khi mỗi job xong (outcome như run_job trả về).
+    """
+    kwargs = dict(
+        columns=tuple(columns), maxlags=maxlags,
+        significance_level=significance_level, test_individually=test_individually,
+        bootstrap_draws=bootstrap_draws, bootstrap_method=bootstrap_method, bootstrap_seed=bootstrap_seed,
+    )
+    outcomes: List[Optional[Dict]] = [None] * len(jobs)
+
+    if workers > 1 and len(jobs) > 1:
+        # spawn: run_job import các module phụ thuộc Streamlit; không fork process có nhiều luồng
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = {pool.submit(run_job, job, **kwargs): i for i, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                outcomes[futures[future]] = future.result()
+                if progress:
+                    progress(outcomes[futures[future]])
+    else:
+        for i, job in enumerate(jobs):
+            outcomes[i] = run_job(job, **kwargs)
+            if progress:
+                progress(outcomes[i])
+
+    rows = [row for outcome in outcomes for row in outcome["rows"]]
+    failed = sum(1 for outcome in outcomes if outcome["rows"][0].get("error"))
+    logger.info(f"Granger batch: {len(jobs)} dataset, {failed} lỗi, {len(rows)} dòng kết quả")
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def pivot_results(results: pd.DataFrame, value: str = "p_value") -> pd.DataFrame:
+    """
+    Bảng kiểu paper: dòng = (mã, caused, causing), cột = (loại dữ liệu, giai đoạn).
+
+    Hậu tố "_diff" (biến đã lấy sai phân) được bỏ để cùng một biến nằm trên một dòng
+    dù giai đoạn này dừng còn giai đoạn kia phải sai phân.
+    """
+    valid = results[results["error"].isna()].copy()
+    for column in ("caused", "causing"):
+        valid[column] = valid[column].str.replace(r"_diff\b", "", regex=True)
+    return valid.pivot_table(
+        index=["ticker", "caused", "causing"],
+        columns=["data_type", "period"],
+        values=value,
+        aggfunc="first",
+    )
@@ -0,0 +1,133 @@
+"""
+Granger Bootstrap - p-value Granger bằng bootstrap (cho mẫu nhỏ)
+
+- Bootstrap fixed-design dưới giả thuyết H0 (các lag của biến gây ảnh hưởng = 0):
+  giữ nguyên ma trận thiết kế có trễ, sinh y* = ŷ_hạn_chế + e*
+  · "wild":     e* = e_hạn_chế × v, v ~ Rademacher (bền với phương sai thay đổi)
+  · "residual": e* rút có hoàn lại từ phần dư hạn chế đã trung tâm hóa
+- Vì ŷ_hạn_chế nằm trong cả hai không gian hồi quy, RSS* chỉ phụ thuộc e*:
+  mỗi batch là hai phép chiếu ma trận (Q Qᵀ E*) cho B lượt rút cùng lúc
+- Các batch (mỗi kiểm định × mỗi khối lượt rút) có thể chạy trên process pool (spawn); seed
+  của từng batch sinh từ SeedSequence(seed) → kết quả không phụ thuộc số process.
+  Gọi từ Streamlit hoặc từ process con của granger_batch thì truyền workers=1
+- p-value = (1 + #{F* ≥ F}) / (draws + 1)
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.granger_kernel import lagged_design
+
+BOOTSTRAP_METHODS = ("wild", "residual")
+
+# Số lượt rút mỗi batch (ma trận nobs × batch trong bộ nhớ)
+BOOTSTRAP_BATCH_SIZE = 256
+# Dưới ngưỡng này chạy tuần tự (chi phí khởi tạo process lớn hơn phần tính toán)
+BOOTSTRAP_PARALLEL_MIN_DRAWS = 2000
+BOOTSTRAP_MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# (biến bị ảnh hưởng, [các biến gây ảnh hưởng]) — chỉ số cột trong dữ liệu
+GrangerPair = Tuple[int, Sequence[int]]
+
+
+def _rss(q: np.ndarray, e: np.ndarray) -> np.ndarray:
+    """Tổng bình phương phần dư khi hồi quy từng cột của e lên không gian cột của q"""
+    resid = e - q @ (q.T @ e)
+    return np.einsum("ij,ij->j", resid, resid)
+
+
+def _count_exceed(q_u, q_r, base, method, n_restrictions, df_resid, f_observed, size, seed) -> int:
+    """Một batch: số lượt rút có F* ≥ F quan sát"""
+    rng = np.random.default_rng(seed)
+    if method == "wild":
+        shocks = base[:, None] * rng.choice((-1.0, 1.0), size=(len(base), size))
+    else:
+        shocks = base[rng.integers(0, len(base), size=(len(base), size))]
+    rss_u = _rss(q_u, shocks)
+    rss_r = _rss(q_r, shocks)
+    f_star = ((rss_r - rss_u) / n_restrictions) / (rss_u / df_resid)
+    return int(np.count_nonzero(f_star >= f_observed))
+
+
+def bootstrap_granger(
+    data,
+    lag: int,
+    pairs: Sequence[GrangerPair],
+    draws: int = 999,
+    method: str = "wild",
+    seed: Optional[int] = None,
+    batch_size: int = BOOTSTRAP_BATCH_SIZE,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    p-value bootstrap cho từng kiểm định Granger trong `pairs` của VAR(lag) có hằng số.
+
+    Args:
+        data: DataFrame hoặc mảng (nobs × neqs) các biến đã dừng, không NaN
+        pairs: Danh sách (chỉ số biến bị ảnh hưởng, [chỉ số biến gây ảnh hưởng])
+        draws: Số lượt bootstrap mỗi kiểm định
+        method: "wild" hoặc "residual"
+        seed: Seed gốc (None → ngẫu nhiên)
+        workers: Số process (None → tự chọn theo số lượt rút; 1 = tuần tự)
+
+    Returns:
+        Mảng p-value theo thứ tự `pairs`
+    """
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"method phải thuộc {BOOTSTRAP_METHODS}")
+
+    y = np.asarray(data, dtype=float)
+    neqs = y.shape[1]
+    design = lagged_design(y, lag)
+    target = y[lag:]
+    nobs, n_params = design.shape
+    df_resid = nobs - n_params
+    q_u = np.linalg.qr(design)[0]
+
+    batches = [min(batch_size, draws - start) for start in range(0, draws, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(pairs))
+
+    tasks: List[Tuple[int, tuple]] = []
+    for index, (caused, causing) in enumerate(pairs):
+        causing = set(causing)
+        keep = [0] + [1 + j * lag + l for j in range(neqs) if j not in causing for l in range(lag)]
+        q_r = np.linalg.qr(design[:, keep])[0]
+        y_i = target[:, caused]
+        resid_r = y_i - q_r @ (q_r.T @ y_i)
+        rss_r = resid_r @ resid_r
+        resid_u = y_i - q_u @ (q_u.T @ y_i)
+        rss_u = resid_u @ resid_u
+        n_restrictions = lag * len(causing)
+        f_observed = ((rss_r - rss_u) / n_restrictions) / (rss_u / df_resid)
+
+        if method == "wild":
+            base = resid_r
+        else:
+            # Trung tâm hóa + bù bậc tự do của mô hình hạn chế
+            base = (resid_r - resid_r.mean()) * np.sqrt(nobs / (nobs - len(keep)))
+
+        for size, batch_seed in zip(batches, seeds[index].spawn(len(batches))):
+            tasks.append((index, (q_u, q_r, base, method, n_restrictions, df_resid, f_observed, size, batch_seed)))
+
+    if workers is None:
+        workers = BOOTSTRAP_MAX_WORKERS if draws * len(pairs) >= BOOTSTRAP_PARALLEL_MIN_DRAWS else 1
+
+    exceed = np.zeros(len(pairs), dtype=np.int64)
+    if workers > 1 and len(tasks) > 1:
+        # spawn: không fork process đang có nhiều luồng (server Streamlit)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tasks)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = [(index, pool.submit(_count_exceed, *args)) for index, args in tasks]
+            for index, future in futures:
+                exceed[index] += future.result()
+    else:
+        for index, args in tasks:
+            exceed[index] += _count_exceed(*args)
+
+    return (1 + exceed) / (draws + 1)
@@ -0,0 +1,78 @@
+"""
+Granger Kernel - Kiểm định Granger từng cặp (pairwise) dạng đóng bằng NumPy
+
+- Ma trận thiết kế có trễ dựng MỘT lần bằng stride tricks (sliding_window_view, không copy
+  từng lag), cột: [hằng số, L1..Lp của biến 1, L1..Lp của biến 2, ...]
+- Một phân rã QR dùng chung cho mọi phương trình: hệ số B = R⁻¹Qᵀy, (ZᵀZ)⁻¹ = R⁻¹R⁻ᵀ
+- Với cặp (caused i ← causing j), thống kê Wald của ràng buộc "các lag của j trong phương
+  trình i bằng 0" = b'[(ZᵀZ)⁻¹_jj]⁻¹b / σ²_i — đúng bằng (RSS hạn chế − RSS đầy đủ) / σ²_i,
+  nên không cần ước lượng lại mô hình hạn chế; mọi cặp giải trong một lệnh np.linalg.solve
+- Khớp `VARResults.test_causality(caused, [causing], kind="f")` của statsmodels:
+  F = Wald / p, bậc tự do (p, neqs × df_resid), σ² hiệu chỉnh theo df_resid
+- Trả về mảng F, p-value và |hệ số| trung bình (neqs × neqs, đường chéo = NaN)
+"""
+
+from typing import Dict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import linalg, stats
+
+
+def lagged_design(y: np.ndarray, lag: int) -> np.ndarray:
+    """
+    Ma trận thiết kế VAR(lag) có hằng số: (nobs - lag) × (1 + neqs × lag).
+
+    Cột 1 + j*lag + (l-1) là y[t - l, j] (các lag của cùng một biến nằm liền nhau).
+    """
+    nobs, neqs = y.shape
+    # windows[t, j, s] = y[t + s, j]; đảo trục s → lag 1 đứng đầu
+    windows = sliding_window_view(y[:-1], lag, axis=0)[:, :, ::-1]
+    design = np.empty((nobs - lag, 1 + neqs * lag))
+    design[:, 0] = 1.0
+    design[:, 1:] = windows.reshape(nobs - lag, neqs * lag)
+    return design
+
+
+def pairwise_granger(data, lag: int) -> Dict[str, np.ndarray]:
+    """
+    Kiểm định Granger cho mọi cặp có thứ tự (caused ← causing) của VAR(lag).
+
+    Args:
+        data: DataFrame hoặc mảng (nobs × neqs) các biến đã dừng, không NaN
+        lag: Bậc trễ VAR
+
+    Returns:
+        {"f_stat", "p_value", "mean_coef"}: mảng neqs × neqs, phần tử [i, j] ứng với
+        "biến j gây ra biến i"; cùng "df" = (bậc tự do tử số, mẫu số)
+    """
+    y = np.asarray(data, dtype=float)
+    nobs, neqs = y.shape
+    design = lagged_design(y, lag)
+    target = y[lag:]
+    df_resid = design.shape[0] - design.shape[1]
+    if df_resid <= 0:
+        raise ValueError(f"Không đủ quan sát cho VAR({lag}) với {neqs} biến")
+
+    q, r = np.linalg.qr(design)
+    coefs = linalg.solve_triangular(r, q.T @ target)            # (1 + neqs*lag) × neqs
+    r_inv = linalg.solve_triangular(r, np.eye(r.shape[0]))
+    resid = target - design @ coefs
+    sigma2 = np.einsum("ij,ij->j", resid, resid) / df_resid       # σ² từng phương trình
+
+    # Khối (ZᵀZ)⁻¹ của từng biến gây ảnh hưởng j: neqs × lag × lag
+    blocks = r_inv[1:].reshape(neqs, lag, -1)
+    zz_inv = blocks @ blocks.transpose(0, 2, 1)
+    # Hệ số các lag của j trong mọi phương trình i: neqs(j) × lag × neqs(i)
+    b = coefs[1:].reshape(neqs, lag, neqs)
+
+    wald = np.einsum("jli,jli->ij", b, np.linalg.solve(zz_inv, b)) / sigma2[:, None]
+    f_stat = wald / lag
+    df = (lag, neqs * df_resid)
+    p_value = stats.f.sf(f_stat, *df)
+    mean_coef = np.abs(b).mean(axis=1).T
+
+    diagonal = np.eye(neqs, dtype=bool)
+    for values in (f_stat, p_value, mean_coef):
+        values[diagonal] = np.nan
+    return {"f_stat": f_stat, "p_value": p_value, "mean_coef": mean_coef, "df": df}
@@ -3,18 +3,25 @@
 # ============================================================
 import pandas as pd
 import numpy as np
-import streamlit as st
+from utils.disk_cache import disk_cached
+from utils.cache_stats import cached_data
+from utils.fingerprint import FINGERPRINT_HASH_FUNCS, drop_fingerprint
 from statsmodels.tsa.stattools import adfuller
-from statsmodels.tsa.api import VAR
+from models import granger_bootstrap, granger_kernel, var_service
+from models.granger_kernel import pairwise_granger
+from models.granger_bootstrap import bootstrap_granger
 
 
-@st.cache_data(show_spinner="Đang chạy kiểm định Granger...")
-def granger_test(
+def _granger_test_core(
     df: pd.DataFrame, 
     columns_to_test: list, 
     maxlags: int = 14,
     significance_level: float = 0.05,
-    test_individually: bool = False
+    test_individually: bool = False,
+    bootstrap_draws: int = 0,
+    bootstrap_method: str = "wild",
+    bootstrap_seed: int = None,
+    bootstrap_workers: int = 1
 ):
     """
     Thực hiện kiểm định nhân quả Granger đa biến (VAR-based) theo phương pháp trong paper.
@@ -31,6 +38,15 @@ def granger_test(
         Mức ý nghĩa thống kê (mặc định: 0.05)
     test_individually : bool
         Nếu True, test từng biến riêng lẻ; False = test tất cả cùng lúc
+    bootstrap_draws : int
+        Số lượt bootstrap cho cột "p-value (bootstrap)" (0 = không chạy)
+    bootstrap_method : str
+        "wild" (mặc định) hoặc "residual" — xem models/granger_bootstrap.py
+    bootstrap_seed : int
+        Seed của bộ sinh số ngẫu nhiên (None = ngẫu nhiên)
+    bootstrap_workers : int
+        Số process cho bootstrap (mặc định 1 = tuần tự: hàm này chạy trong Streamlit
+        hoặc trong process con của granger_batch; None = để bootstrap_granger tự chọn)
     
     Returns:
     --------
@@ -38,6 +54,9 @@ def granger_test(
         Bảng kết quả kiểm định
     var_model : VAR
         Mô hình VAR đã ước lượng (để sử dụng cho TVAR sau này)
+
+    Hàm thuần (không cache, không Streamlit) → chạy được trong process con
+    của models/granger_batch.py; giao diện gọi qua granger_test() có cache.
     """
 
     print("\n" + "="*80)
@@ -50,6 +69,7 @@ def granger_test(
 
     df = df.copy()
     results = []
+    tested_pairs = []  # (biến bị ảnh hưởng, [biến gây ảnh hưởng]) theo thứ tự results
     stationary_vars = []
     transformation_info = {}
 
@@ -106,7 +126,7 @@ def granger_test(
             print(f"❌ Lỗi kiểm định ADF cho '{column}': {e}")
 
     # Loại bỏ dòng có NaN sau khi sai phân
-    df_var = df[stationary_vars].dropna()
+    df_var = drop_fingerprint(df[stationary_vars].dropna())
     
     if df_var.empty:
         print("\n❌ THẤT BẠI: Không còn dữ liệu hợp lệ sau khi xử lý sai phân.")
@@ -124,8 +144,8 @@ def granger_test(
     print("-" * 80)
     
     try:
-        model = VAR(df_var)
-        lag_selection = model.select_order(maxlags=maxlags)
+        # Bảng tiêu chí & mô hình VAR dùng chung với TVAR (models/var_service.py)
+        lag_selection = var_service.select_order(df_var, stationary_vars, maxlags)
         
         # Lấy lag theo AIC
         best_lag = lag_selection.selected_orders.get("aic", 5)
@@ -178,7 +198,7 @@ def granger_test(
     print("-" * 80)
     
     try:
-        var_model = model.fit(best_lag)
+        var_model = var_service.fit(df_var, stationary_vars, best_lag)
         print(f"✅ Mô hình VAR({best_lag}) đã được ước lượng thành công.")
         
         # Kiểm tra tính ổn định của mô hình
@@ -211,45 +231,44 @@ def granger_test(
         print("🔍 Chế độ: Test từng biến riêng lẻ (pairwise)")
         print()
         
-        for caused in df_var.columns:
+        # F-test dạng đóng cho mọi cặp một lượt (models/granger_kernel.py),
+        # khớp var_model.test_causality(caused, [causing], kind='f')
+        try:
+            kernel = pairwise_granger(df_var, best_lag)
+        except Exception as e:
+            print(f"   ⚠️ Lỗi kiểm định từng cặp: {e}")
+            kernel = None
+
+        variables = list(df_var.columns) if kernel is not None else []
+        for i, caused in enumerate(variables):
             print(f"\n📊 Biến bị ảnh hưởng: {caused}")
             print(f"   {'-'*70}")
             
-            for causing_var in [c for c in df_var.columns if c != caused]:
-                try:
-                    test = var_model.test_causality(
-                        caused=caused, 
-                        causing=[causing_var], 
-                        kind='f'
-                    )
-                    
-                    f_stat = round(test.test_statistic, 4)
-                    p_value = round(test.pvalue, 4)
-                    is_significant = p_value < significance_level
-                    conclusion = "✅ Có nhân quả" if is_significant else "❌ Không có nhân quả"
-                    
-                    # Tính hệ số trung bình CHÍNH XÁC
-                    mean_coef = _calculate_mean_coefficient(
-                        var_model, caused, [causing_var], best_lag
-                    )
-                    
-                    results.append({
-                        "Biến bị ảnh hưởng": caused,
-                        "Biến gây ảnh hưởng": causing_var,
-                        "Lag": best_lag,
-                        "Coef (TB)": mean_coef,
-                        "F-statistic": f_stat,
-                        "p-value": p_value,
-                        "Có ý nghĩa": "✅" if is_significant else "❌",
-                        "Kết luận": conclusion
-                    })
-                    
-                    # Hiển thị kết quả
-                    sig_marker = "***" if p_value < 0.01 else "**" if p_value < 0.05 else "*" if p_value < 0.1 else ""
-                    print(f"   {causing_var:20s} → F={f_stat:8.2f} | p={p_value:.4f}{sig_marker:3s} | Coef={mean_coef:8.4f} | {conclusion}")
-                    
-                except Exception as e:
-                    print(f"   ⚠️ Lỗi test {causing_var}: {e}")
+            for j, causing_var in enumerate(variables):
+                if j == i:
+                    continue
+
+                f_stat = round(float(kernel["f_stat"][i, j]), 4)
+                p_value = round(float(kernel["p_value"][i, j]), 4)
+                is_significant = p_value < significance_level
+                conclusion = "✅ Có nhân quả" if is_significant else "❌ Không có nhân quả"
+                mean_coef = round(float(kernel["mean_coef"][i, j]), 6)
+                
+                results.append({
+                    "Biến bị ảnh hưởng": caused,
+                    "Biến gây ảnh hưởng": causing_var,
+                    "Lag": best_lag,
+                    "Coef (TB)": mean_coef,
+                    "F-statistic": f_stat,
+                    "p-value": p_value,
+                    "Có ý nghĩa": "✅" if is_significant else "❌",
+                    "Kết luận": conclusion
+                })
+                tested_pairs.append((i, [j]))
+                
+                # Hiển thị kết quả
+                sig_marker = "***" if p_value < 0.01 else "**" if p_value < 0.05 else "*" if p_value < 0.1 else ""
+                print(f"   {causing_var:20s} → F={f_stat:8.2f} | p={p_value:.4f}{sig_marker:3s} | Coef={mean_coef:8.4f} | {conclusion}")
     
     else:
         # Test tất cả biến khác cùng lúc (mặc định)
@@ -286,6 +305,9 @@ def granger_test(
                     "Có ý nghĩa": "✅" if is_significant else "❌",
                     "Kết luận": conclusion
                 })
+                tested_pairs.append((
+                    df_var.columns.get_loc(caused), [df_var.columns.get_loc(c) for c in causing]
+                ))
                 
                 print(f"\n📊 {caused} ← [{', '.join(causing)}]:")
                 print(f"   F-statistic = {f_stat:.4f}")
@@ -296,6 +318,25 @@ def granger_test(
             except Exception as e:
                 print(f"\n⚠️ Lỗi kiểm định nhân quả cho '{caused}': {e}")
 
+    # =======================
+    # BƯỚC 4b: P-VALUE BOOTSTRAP (mẫu nhỏ)
+    # =======================
+    if bootstrap_draws and results:
+        print(f"\n📌 BƯỚC 4b: Bootstrap {bootstrap_method} ({bootstrap_draws} lượt)")
+        print("-" * 80)
+        try:
+            boot_p = bootstrap_granger(
+                df_var, best_lag, tested_pairs,
+                draws=bootstrap_draws, method=bootstrap_method, seed=bootstrap_seed,
+                workers=bootstrap_workers,
+            )
+            for row, p_boot in zip(results, boot_p):
+                row["p-value (bootstrap)"] = round(float(p_boot), 4)
+                print(f"   {row['Biến gây ảnh hưởng']} → {row['Biến bị ảnh hưởng']}: "
+                      f"p = {row['p-value']:.4f} | p (bootstrap) = {p_boot:.4f}")
+        except Exception as e:
+            print(f"⚠️ Lỗi bootstrap: {e}")
+
     # =======================
     # BƯỚC 5: TÓM TẮT KẾT QUẢ
     # =======================
@@ -305,6 +346,11 @@ def granger_test(
     
     if results:
         results_df = pd.DataFrame(results)
+        if "p-value (bootstrap)" in results_df.columns:
+            # Đặt cạnh p-value tiệm cận
+            columns = [c for c in results_df.columns if c != "p-value (bootstrap)"]
+            columns.insert(columns.index("p-value") + 1, "p-value (bootstrap)")
+            results_df = results_df[columns]
         
         # Đếm số quan hệ có ý nghĩa
         significant_count = len(results_df[results_df['p-value'] < significance_level])
@@ -370,6 +416,28 @@ def _calculate_mean_coefficient(var_model, caused: str, causing: list, best_lag:
         return 0.0
 
 
+@cached_data("granger_test", show_spinner="Đang chạy kiểm định Granger...", hash_funcs=FINGERPRINT_HASH_FUNCS)
+@disk_cached(
+    "granger_test",
+    depends=(_granger_test_core, _calculate_mean_coefficient, var_service, granger_kernel, granger_bootstrap),
+)
+def granger_test(
+    df: pd.DataFrame, 
+    columns_to_test: list, 
+    maxlags: int = 14,
+    significance_level: float = 0.05,
+    test_individually: bool = False,
+    bootstrap_draws: int = 0,
+    bootstrap_method: str = "wild",
+    bootstrap_seed: int = None
+):
+    """Kiểm định Granger VAR-based có cache (bộ nhớ + đĩa) — xem _granger_test_core"""
+    return _granger_test_core(
+        df, columns_to_test, maxlags, significance_level, test_individually,
+        bootstrap_draws, bootstrap_method, bootstrap_seed,
+    )
+
+
 def perform_granger_analysis(
     sentiment_scores: pd.Series, 
     stock_prices: pd.Series, 
@@ -0,0 +1,130 @@
+"""
+Model Warmup - Nạp PhoBERT trong luồng nền để click đầu tiên không phải chờ
+
+- app.py gọi start_warmup() sau lần render đầu tiên; luồng nền lần lượt:
+  import torch/transformers → nạp trọng số (snapshot cục bộ nếu có) → chạy thử 1 câu
+- Trạng thái & tiến độ đọc qua status(); chờ sẵn sàng qua wait(timeout)
+- Giao diện dùng is_ready() để tạm chấm điểm bằng keyword cho tới khi model "nóng"
+- Module này KHÔNG import torch → gọi từ luồng chính không tốn thời gian
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from config.inference_config import INFERENCE_BACKEND, INFERENCE_MAX_LENGTH, WARMUP_TEXT
+
+logger = logging.getLogger(__name__)
+
+# Các bước warmup và tiến độ (0 → 1) khi bắt đầu mỗi bước
+STAGES = {
+    "pending": (0.0, "Chưa bắt đầu"),
+    "importing": (0.1, "Đang import torch / transformers"),
+    "loading": (0.4, "Đang nạp trọng số PhoBERT"),
+    "warming": (0.8, "Đang chạy thử"),
+    "ready": (1.0, "Sẵn sàng"),
+    "failed": (1.0, "Lỗi khi nạp model"),
+}
+
+
+class ModelWarmup:
+    """Luồng nền nạp model một lần cho cả process"""
+
+    def __init__(self, backend: str = INFERENCE_BACKEND):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stage = "pending"
+        self._error: Optional[str] = None
+        self._started_at: Optional[float] = None
+        self._seconds: Optional[float] = None
+
+    def start(self) -> "ModelWarmup":
+        """Khởi động luồng nền (gọi nhiều lần cũng chỉ chạy một lần)"""
+        with self._lock:
+            if self._thread is None:
+                self._started_at = time.perf_counter()
+                self._thread = threading.Thread(
+                    target=self._run, name=f"phobert-warmup-{self.backend}", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def _set_stage(self, stage: str):
+        with self._lock:
+            self._stage = stage
+        logger.info(f"PhoBERT warmup: {STAGES[stage][1]}")
+
+    def _run(self):
+        try:
+            self._set_stage("importing")
+            from models.sentiment_phobert import _infer, get_model, normalize_text
+
+            self._set_stage("loading")
+            get_model(self.backend)
+
+            self._set_stage("warming")
+            # Qua inference service (nếu bật) như mọi request khác → chỉ luồng worker của
+            # service dùng tokenizer/model, đồng thời khởi động luồng đó trước click đầu tiên
+            _infer([normalize_text(WARMUP_TEXT)], 1, INFERENCE_MAX_LENGTH, self.backend)
+
+            self._set_stage("ready")
+            self._ready.set()
+        except Exception as e:
+            with self._lock:
+                self._error = str(e)
+            self._set_stage("failed")
+            logger.error(f"PhoBERT warmup lỗi: {e}")
+        finally:
+            self._seconds = time.perf_counter() - self._started_at
+            self._done.set()
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Chờ warmup kết thúc (tự khởi động nếu chưa); True nếu model đã sẵn sàng"""
+        self.start()
+        self._done.wait(timeout)
+        return self.is_ready()
+
+    def status(self) -> Dict:
+        with self._lock:
+            stage, error = self._stage, self._error
+        progress, message = STAGES[stage]
+        elapsed = self._seconds
+        if elapsed is None and self._started_at is not None:
+            elapsed = time.perf_counter() - self._started_at
+        return {
+            "backend": self.backend,
+            "stage": stage,
+            "progress": progress,
+            "message": message,
+            "ready": stage == "ready",
+            "error": error,
+            "elapsed_seconds": round(elapsed, 1) if elapsed is not None else None,
+        }
+
+
+_warmups: Dict[str, ModelWarmup] = {}
+_warmups_lock = threading.Lock()
+
+
+def get_warmup(backend: str = None) -> ModelWarmup:
+    """Đối tượng warmup dùng chung trong process (chưa khởi động luồng)"""
+    backend = backend or INFERENCE_BACKEND
+    with _warmups_lock:
+        if backend not in _warmups:
+            _warmups[backend] = ModelWarmup(backend)
+        return _warmups[backend]
+
+
+def start_warmup(backend: str = None) -> ModelWarmup:
+    return get_warmup(backend).start()
+
+
+def is_model_ready(backend: str = None) -> bool:
+    return get_warmup(backend).is_ready()
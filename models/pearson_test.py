@@ -1,9 +1,12 @@
 import pandas as pd
 from scipy.stats import pearsonr
 import numpy as np
-import streamlit as st
+from utils.disk_cache import disk_cached
+from utils.cache_stats import cached_data
+from utils.fingerprint import FINGERPRINT_HASH_FUNCS
 
-@st.cache_data(show_spinner="Đang tính toán kiểm định Pearson...")
+@cached_data("pearson_test", show_spinner="Đang tính toán kiểm định Pearson...", hash_funcs=FINGERPRINT_HASH_FUNCS)
+@disk_cached("pearson_test")
 def pearson_test(df: pd.DataFrame, sentiment_col: str, variables: list) -> pd.DataFrame:
     """
     Thực hiện kiểm định tương quan Pearson giữa cột cảm xúc và các biến được chọn.
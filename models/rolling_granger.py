@@ -0,0 +1,166 @@
+"""
+Rolling Granger - Kiểm định Granger từng cặp theo cửa sổ trượt / mở rộng
+
+- Dựng ma trận thiết kế VAR(lag) MỘT lần (models/granger_kernel.lagged_design)
+- Giữ phương trình chuẩn G = ZᵀZ, H = ZᵀY, Σy² của cửa sổ hiện tại và G⁻¹;
+  khi cửa sổ trượt: thêm dòng mới / bớt dòng cũ bằng cập nhật hạng 1 (Sherman–Morrison)
+  thay vì ước lượng lại từ đầu
+- Cứ ROLLING_RECOMPUTE_EVERY lần cập nhật thì tính lại G, H, G⁻¹ từ dữ liệu của cửa sổ
+  → sai số làm tròn không tích lũy
+- Thống kê F giống granger_kernel.pairwise_granger (khớp statsmodels test_causality kind='f')
+- Kết quả: chuỗi p-value theo thời gian cho từng chiều "causing → caused"
+"""
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+from statsmodels.tsa.stattools import adfuller
+
+from models.granger_kernel import lagged_design
+from utils.cache_stats import cached_data
+from utils.disk_cache import disk_cached
+from utils.fingerprint import FINGERPRINT_HASH_FUNCS
+
+# Số lần cập nhật hạng 1 trước khi tính lại phương trình chuẩn từ đầu
+ROLLING_RECOMPUTE_EVERY = 200
+
+
+def make_stationary(df: pd.DataFrame, columns: Sequence[str], significance_level: float = 0.05) -> pd.DataFrame:
+    """ADF trên toàn giai đoạn; biến không dừng → sai phân bậc 1 (cùng quy tắc với granger_test)"""
+    out = {}
+    for column in columns:
+        series = pd.to_numeric(df[column], errors="coerce")
+        p_value = adfuller(series.dropna(), autolag="AIC")[1]
+        if p_value > significance_level:
+            out[f"{column}_diff"] = series.diff()
+        else:
+            out[column] = series
+    return pd.DataFrame(out, index=df.index).dropna()
+
+
+def _sherman_morrison(g_inv: np.ndarray, z: np.ndarray, sign: float):
+    """G⁻¹ của (G + sign·zzᵀ), cập nhật tại chỗ"""
+    u = g_inv @ z
+    g_inv -= sign * np.outer(u, u) / (1.0 + sign * (z @ u))
+
+
+def rolling_granger(
+    data: pd.DataFrame,
+    lag: int,
+    window: int,
+    step: int = 1,
+    expanding: bool = False,
+    recompute_every: int = ROLLING_RECOMPUTE_EVERY,
+) -> pd.DataFrame:
+    """
+    p-value Granger từng cặp cho mỗi cửa sổ.
+
+    Args:
+        data: Các biến đã dừng, không NaN (index = ngày hoặc thứ tự quan sát)
+        lag: Bậc trễ VAR
+        window: Số quan sát hồi quy trong mỗi cửa sổ (cửa sổ đầu tiên với expanding=True)
+        step: Số quan sát dịch chuyển giữa hai lần kiểm định
+        expanding: True → giữ nguyên điểm đầu, cửa sổ chỉ mở rộng (không bớt dòng)
+        recompute_every: Số cập nhật hạng 1 trước khi tính lại từ dữ liệu
+
+    Returns:
+        DataFrame: index = nhãn quan sát cuối mỗi cửa sổ, cột "causing → caused" (p-value),
+        thêm cột "nobs"
+    """
+    names = [str(c) for c in data.columns]
+    values = data.to_numpy(dtype=float)
+    # Chuẩn hóa thang đo: F không đổi, G được điều kiện tốt hơn cho cập nhật hạng 1
+    scale = values.std(axis=0)
+    values = (values - values.mean(axis=0)) / np.where(scale > 0, scale, 1.0)
+
+    neqs = values.shape[1]
+    design = lagged_design(values, lag)
+    target = values[lag:]
+    labels = data.index[lag:]
+    n_rows, n_params = design.shape
+    if window <= n_params:
+        raise ValueError(f"Cửa sổ {window} quá nhỏ cho VAR({lag}) với {neqs} biến (cần > {n_params})")
+    if window > n_rows:
+        raise ValueError(f"Cửa sổ {window} lớn hơn số quan sát hồi quy ({n_rows})")
+
+    block_index = 1 + np.arange(neqs * lag).reshape(neqs, lag)
+    off_diagonal = ~np.eye(neqs, dtype=bool)
+
+    def normal_equations(start: int, end: int):
+        z, y = design[start:end], target[start:end]
+        gram = z.T @ z
+        return np.linalg.inv(gram), z.T @ y, np.einsum("ij,ij->j", y, y)
+
+    start, end = 0, window
+    g_inv, zy, yy = normal_equations(start, end)
+    updates = 0
+    f_rows: List[np.ndarray] = []
+    nobs: List[int] = []
+    ends: List[int] = []
+
+    while True:
+        coefs = g_inv @ zy
+        rss = yy - np.einsum("ij,ij->j", zy, coefs)
+        sigma2 = rss / (end - start - n_params)
+        blocks = g_inv[block_index[:, :, None], block_index[:, None, :]]
+        b = coefs[1:].reshape(neqs, lag, neqs)
+        wald = np.einsum("jli,jli->ij", b, np.linalg.solve(blocks, b)) / sigma2[:, None]
+        f_rows.append(wald[off_diagonal] / lag)
+        nobs.append(end - start)
+        ends.append(end)
+
+        if end + step > n_rows:
+            break
+        new_start = start if expanding else start + step
+        if updates + 2 * step > recompute_every or step >= window:
+            start, end = new_start, end + step
+            g_inv, zy, yy = normal_equations(start, end)
+            updates = 0
+            continue
+
+        for row in range(end, end + step):
+            z, y = design[row], target[row]
+            _sherman_morrison(g_inv, z, 1.0)
+            zy += np.outer(z, y)
+            yy += y * y
+            updates += 1
+        for row in range(start, new_start):
+            z, y = design[row], target[row]
+            _sherman_morrison(g_inv, z, -1.0)
+            zy -= np.outer(z, y)
+            yy -= y * y
+            updates += 1
+        start, end = new_start, end + step
+
+    f_stat = np.vstack(f_rows)
+    nobs = np.asarray(nobs)
+    p_value = stats.f.sf(f_stat, lag, (neqs * (nobs - n_params))[:, None])
+
+    columns = [f"{names[j]} → {names[i]}" for i in range(neqs) for j in range(neqs) if i != j]
+    result = pd.DataFrame(p_value, index=labels[np.asarray(ends) - 1], columns=columns)
+    result["nobs"] = nobs
+    return result
+
+
+@cached_data("rolling_granger", show_spinner="Đang chạy Granger theo cửa sổ trượt...", hash_funcs=FINGERPRINT_HASH_FUNCS)
+@disk_cached("rolling_granger", depends=(rolling_granger, make_stationary, _sherman_morrison, lagged_design))
+def rolling_granger_test(
+    df: pd.DataFrame,
+    columns_to_test: list,
+    lag: int = 5,
+    window: int = 250,
+    step: int = 5,
+    expanding: bool = False,
+    significance_level: float = 0.05,
+    date_column: Optional[str] = "date",
+) -> pd.DataFrame:
+    """
+    Granger theo cửa sổ cho giao diện: xử lý tính dừng như granger_test rồi gọi rolling_granger.
+    Index kết quả là ngày (cột `date_column`) nếu có.
+    """
+    if date_column and date_column in df.columns:
+        df = df.sort_values(date_column).set_index(date_column)
+    data = make_stationary(df, columns_to_test, significance_level)
+    return rolling_granger(data, lag, window, step=step, expanding=expanding)
@@ -2,100 +2,488 @@
 # 📦 PHOBERT SENTIMENT ANALYSIS (WONRAX VERSION)
 # ======================================================
 
+import json
+import logging
+import os
+import threading
+
+import numpy as np
 import torch
 import pandas as pd
+from huggingface_hub import HfApi, try_to_load_from_cache
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import streamlit as st
+from utils.sentiment_store import get_sentiment_store, normalize_text, text_hash
+from config.inference_config import (
+    ENABLE_INFERENCE_SERVICE,
+    INFERENCE_BACKEND,
+    INFERENCE_BATCH_SIZE,
+    INFERENCE_INTER_OP_THREADS,
+    INFERENCE_INTRA_OP_THREADS,
+    INFERENCE_MAX_LENGTH,
+    LONG_TEXT_ATTENTION_TEMPERATURE,
+    LONG_TEXT_MAX_WINDOWS,
+    LONG_TEXT_OVERLAP,
+    PHOBERT_SNAPSHOT_DIR,
+    SUPPORTED_BACKENDS,
+)
+
+logger = logging.getLogger(__name__)
 
 # ------------------------------------------------------
 # 1️⃣ Load model và tokenizer (Wonrax fine-tuned PhoBERT)
 # ------------------------------------------------------
 MODEL_NAME = "wonrax/phobert-base-vietnamese-sentiment"
+# Nhánh / tag / SHA trên Hugging Face Hub. Nhánh được phân giải thành SHA commit khi nạp
+# (resolve_revision) → model nạp đúng commit đó và khóa cache ghi theo SHA, không theo tên nhánh
+MODEL_REVISION = "main"
+
+
+def configure_torch_threads(intra_op: int = None, inter_op: int = None):
+    """
+    Đặt số luồng torch (mặc định theo config/inference_config.py).
+    Số luồng inter-op chỉ đặt được trước khi torch chạy phép toán song song đầu tiên.
+    """
+    intra_op = intra_op or INFERENCE_INTRA_OP_THREADS
+    inter_op = inter_op or INFERENCE_INTER_OP_THREADS
+    if intra_op:
+        torch.set_num_threads(intra_op)
+    if inter_op and torch.get_num_interop_threads() != inter_op:
+        try:
+            torch.set_num_interop_threads(inter_op)
+        except RuntimeError as e:
+            logger.warning(f"Không thể đặt inter-op threads = {inter_op}: {e}")
+    return torch.get_num_threads(), torch.get_num_interop_threads()
+
+
+SNAPSHOT_MANIFEST = "snapshot.json"
+
+
+def _read_manifest(path: str):
+    try:
+        with open(os.path.join(path, SNAPSHOT_MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def local_snapshot_dir(path: str = PHOBERT_SNAPSHOT_DIR):
+    """Thư mục snapshot cục bộ nếu có và đúng MODEL_NAME @ MODEL_REVISION (kèm SHA commit), ngược lại None"""
+    manifest = _read_manifest(path)
+    if manifest is None:
+        return None
+    if manifest.get("model") != MODEL_NAME or manifest.get("revision") != MODEL_REVISION:
+        logger.warning(
+            f"Snapshot {path} là {manifest.get('model')}@{manifest.get('revision')}, "
+            f"không khớp {MODEL_NAME}@{MODEL_REVISION} → tải từ Hub"
+        )
+        return None
+    if not manifest.get("commit"):
+        # Snapshot cũ không ghi SHA → không phân biệt được phiên bản trọng số
+        logger.warning(f"Snapshot {path} không ghi commit → tải từ Hub (chạy lại snapshot_model.py)")
+        return None
+    return path
+
+
+def _hub_commit(revision: str = MODEL_REVISION):
+    """SHA commit của `revision` trên Hub; offline → SHA trong cache Hugging Face cục bộ; không có → None"""
+    try:
+        return HfApi().model_info(MODEL_NAME, revision=revision, timeout=10).sha
+    except Exception as e:
+        logger.warning(f"Không phân giải được {MODEL_NAME}@{revision} trên Hub: {e}")
+    # Cache HF lưu file tại .../snapshots/<sha>/config.json
+    cached = try_to_load_from_cache(MODEL_NAME, "config.json", revision=revision)
+    if isinstance(cached, str):
+        return os.path.basename(os.path.dirname(cached))
+    return None
+
+
+_resolved_revision = None
+_revision_lock = threading.Lock()
+
+
+def resolve_revision() -> str:
+    """
+    SHA commit của model sẽ được nạp (ghi nhớ trong process):
+    snapshot cục bộ hợp lệ → SHA trong manifest; ngược lại MODEL_REVISION phân giải trên Hub.
+    Không phân giải được thì trả về MODEL_REVISION nguyên dạng.
+    """
+    global _resolved_revision
+    if _resolved_revision is None:
+        with _revision_lock:
+            if _resolved_revision is None:
+                snapshot = local_snapshot_dir()
+                commit = _read_manifest(snapshot)["commit"] if snapshot else _hub_commit()
+                if commit is None:
+                    logger.warning(f"Dùng revision chưa phân giải '{MODEL_REVISION}' làm khóa cache")
+                _resolved_revision = commit or MODEL_REVISION
+    return _resolved_revision
+
+
+def save_model_snapshot(path: str = PHOBERT_SNAPSHOT_DIR) -> str:
+    """Tải model từ Hub (revision phân giải thành SHA) và lưu tokenizer + trọng số (safetensors) vào `path`"""
+    commit = _hub_commit()
+    if commit is None:
+        raise RuntimeError(f"Không phân giải được {MODEL_NAME}@{MODEL_REVISION} thành commit")
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME, revision=commit, use_fast=True)
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME, revision=commit)
+    os.makedirs(path, exist_ok=True)
+    tokenizer.save_pretrained(path)
+    model.save_pretrained(path, safe_serialization=True)
+    # Ghi manifest sau cùng → snapshot dở dang không bao giờ được coi là hợp lệ
+    with open(os.path.join(path, SNAPSHOT_MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"model": MODEL_NAME, "revision": MODEL_REVISION, "commit": commit}, f)
+    return path
+
 
 @st.cache_resource(show_spinner=False)
-def load_phobert_model():
-    """Cache PhoBERT model để tránh load lại mỗi lần chạy"""
+def load_phobert_model(backend: str = INFERENCE_BACKEND):
+    """
+    Cache PhoBERT model để tránh load lại mỗi lần chạy
+
+    backend="int8": dynamic quantization các lớp Linear (trọng số int8, activation
+    lượng tử hóa động) → nhanh hơn và nhẹ hơn trên CPU
+    """
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"❌ Backend '{backend}' không hỗ trợ (chọn một trong {SUPPORTED_BACKENDS})")
+
+    configure_torch_threads()
+
+    # Ưu tiên bản lưu cục bộ (không gọi Hub); chưa có thì tải từ Hub như cũ
+    snapshot = local_snapshot_dir()
+    name_or_path = snapshot or MODEL_NAME
+    # Nạp đúng commit đã phân giải → trọng số khớp model_key
+    hub_kwargs = {"local_files_only": True} if snapshot else {"revision": resolve_revision()}
+
     # Sử dụng use_fast=True cho tokenizer nhanh hơn
     tokenizer = AutoTokenizer.from_pretrained(
-        MODEL_NAME, 
+        name_or_path,
+        **hub_kwargs,
         use_fast=True,  # Tokenizer nhanh hơn
-        model_max_length=256  # Giới hạn độ dài input
+        model_max_length=INFERENCE_MAX_LENGTH  # Giới hạn độ dài input
     )
-    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(name_or_path, **hub_kwargs)
     model.eval()  # Set eval mode
     
     # Tắt gradient để tối ưu memory
     for param in model.parameters():
         param.requires_grad = False
+
+    if backend == "int8":
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
     
     return tokenizer, model
 
-def get_model():
+# Model đã nạp trong process, theo backend. st.cache_resource không giữ gì khi chạy
+# ngoài Streamlit (script CLI) → tự ghi nhớ để không nạp lại ở mỗi lần gọi
+_loaded_models = {}
+_load_lock = threading.Lock()
+
+
+def get_model(backend: str = None):
     """Lazy getter cho model"""
-    return load_phobert_model()
+    backend = backend or INFERENCE_BACKEND
+    if backend not in _loaded_models:
+        with _load_lock:
+            if backend not in _loaded_models:
+                _loaded_models[backend] = load_phobert_model(backend)
+    return _loaded_models[backend]
+
+
+def model_key(backend: str = None) -> str:
+    """Định danh model dùng làm khóa cache kết quả (tên @ SHA commit, kèm backend nếu không phải fp32)"""
+    backend = backend or INFERENCE_BACKEND
+    suffix = "" if backend == "fp32" else f"/{backend}"
+    return f"{MODEL_NAME}@{resolve_revision()}{suffix}"
 
 # ------------------------------------------------------
-# 2️⃣ Phân tích cảm xúc cho 1 văn bản
+# 2️⃣ Suy luận theo batch (dynamic padding + gom nhóm theo độ dài)
 # ------------------------------------------------------
-def analyze_sentiment(text: str):
-    if not isinstance(text, str):
-        text = str(text)
+MAX_LENGTH = INFERENCE_MAX_LENGTH          # Giới hạn độ dài input (token)
+DEFAULT_BATCH_SIZE = INFERENCE_BATCH_SIZE  # Số văn bản mỗi lần forward
 
-    # Lazy load model
-    tokenizer, model = get_model()
-    
-    # Tokenize với max_length giới hạn
-    inputs = tokenizer(
-        text, 
-        return_tensors="pt", 
-        truncation=True, 
-        max_length=256,  # Giới hạn độ dài input
-        padding="max_length"
+
+def get_label_names():
+    """Tên nhãn theo thứ tự cột của ma trận xác suất (vd. ['NEG', 'POS', 'NEU'])"""
+    # Nhãn là thuộc tính của checkpoint, giống nhau giữa các backend
+    store = get_sentiment_store()
+    names = store.labels(model_key("fp32")) if store is not None else None
+    if names:
+        return names
+
+    _, model = get_model()
+    label_map = model.config.id2label
+    names = [label_map[i] for i in range(len(label_map))]
+    if store is not None:
+        store.set_labels(model_key("fp32"), names)
+    return names
+
+
+def _label_to_score(label: str) -> int:
+    """NEG → -1, NEU → 0, POS → 1"""
+    label = label.lower()
+    if "neg" in label:
+        return -1
+    if "neu" in label:
+        return 0
+    return 1
+
+
+def _forward_ids(input_ids, batch_size: int, backend: str = None) -> np.ndarray:
+    """Forward các chuỗi token id đã có special token: gom theo độ dài, pad động từng batch"""
+    tokenizer, model = get_model(backend)
+    num_labels = len(model.config.id2label)
+    probs = np.zeros((len(input_ids), num_labels), dtype=np.float32)
+    if not len(input_ids):
+        return probs
+
+    lengths = np.array([len(ids) for ids in input_ids])
+    order = np.argsort(lengths, kind="stable")
+
+    with torch.inference_mode():
+        for start in range(0, len(input_ids), batch_size):
+            idx = order[start:start + batch_size]
+            batch = tokenizer.pad(
+                {"input_ids": [input_ids[i] for i in idx]},
+                padding="longest",
+                return_tensors="pt",
+            )
+            logits = model(**batch).logits
+            probs[idx] = torch.nn.functional.softmax(logits, dim=-1).float().cpu().numpy()
+
+    return probs
+
+
+def _predict_batches(texts, batch_size: int, max_length: int, backend: str = None) -> np.ndarray:
+    """Chạy PhoBERT cho danh sách văn bản (đã chuẩn hóa), không qua cache"""
+    if not texts:
+        return _forward_ids([], batch_size, backend)
+    tokenizer, _ = get_model(backend)
+    encoded = tokenizer(texts, truncation=True, max_length=max_length, padding=False)
+    return _forward_ids(encoded["input_ids"], batch_size, backend)
+
+
+def _infer(texts, batch_size: int, max_length: int, backend: str = None) -> np.ndarray:
+    """Chạy model qua inference service (nếu bật) để các session không tranh nhau CPU"""
+    if not ENABLE_INFERENCE_SERVICE or not texts:
+        return _predict_batches(texts, batch_size, max_length, backend)
+    from models.sentiment_service import get_inference_service
+
+    return get_inference_service(backend).predict(texts, batch_size=batch_size, max_length=max_length)
+
+
+def _cached_predict(texts, key: str, compute, use_cache: bool) -> np.ndarray:
+    """Tra sentiment store theo hash văn bản; chỉ gọi `compute` cho văn bản chưa có rồi ghi lại"""
+    store = get_sentiment_store() if use_cache else None
+    if store is None:
+        return compute(texts)
+    if not texts:
+        return np.zeros((0, len(get_label_names())), dtype=np.float32)
+
+    hashes = [text_hash(t) for t in texts]
+    found = store.get_many(key, hashes)
+
+    first_text = {}
+    for h, t in zip(hashes, texts):
+        if h not in found:
+            first_text.setdefault(h, t)
+
+    if first_text:
+        missing = list(first_text)
+        probs = compute([first_text[h] for h in missing])
+        store.put_many(key, missing, probs)
+        found.update(zip(missing, probs))
+        # Model đã nạp → lưu luôn tên nhãn để lần sau không cần nạp model
+        get_label_names()
+
+    return np.vstack([found[h] for h in hashes]).astype(np.float32, copy=False)
+
+
+def predict_proba(
+    texts,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_length: int = MAX_LENGTH,
+    use_cache: bool = True,
+    backend: str = None,
+) -> np.ndarray:
+    """
+    Tính xác suất cảm xúc cho nhiều văn bản cùng lúc.
+
+    - Tra sentiment store theo hash văn bản trước; chỉ chạy model cho văn bản
+      chưa có (mỗi nội dung trùng lặp chỉ tính một lần) rồi ghi lại kết quả
+    - Tokenize toàn bộ một lần (không padding), sắp xếp theo độ dài token
+    - Mỗi batch chỉ pad tới văn bản dài nhất trong batch (dynamic padding)
+      → các câu ngắn không phải chạy qua 256 token padding
+    - `backend` = None → theo INFERENCE_BACKEND ("fp32" / "int8")
+    - Văn bản chưa có trong store được gửi qua inference service (nếu bật)
+      để gom chung micro-batch với request của các session khác
+
+    Returns:
+        np.ndarray: Ma trận (số văn bản × số nhãn), cột theo `get_label_names()`,
+        hàng theo đúng thứ tự `texts`
+    """
+    if isinstance(texts, str):
+        texts = [texts]
+    texts = [normalize_text(t) for t in texts]
+
+    key = model_key(backend)
+    if max_length != MAX_LENGTH:
+        key = f"{key}|max_length={max_length}"
+    return _cached_predict(
+        texts, key, lambda batch: _infer(batch, batch_size, max_length, backend), use_cache
     )
-    
-    with torch.no_grad():
-        outputs = model(**inputs)
-        probs = torch.nn.functional.softmax(outputs.logits, dim=-1)
 
+
+# ------------------------------------------------------
+# 2️⃣b Văn bản dài: cửa sổ trượt + gộp xác suất theo văn bản
+# ------------------------------------------------------
+LONG_TEXT_AGGREGATES = ("mean", "attention")
+
+
+def _window_starts(n_tokens: int, body: int, overlap: int, max_windows: int) -> list:
+    """Vị trí bắt đầu các cửa sổ `body` token chồng lấn `overlap`, cửa sổ cuối chạm hết văn bản"""
+    if n_tokens <= body:
+        return [0]
+    step = max(body - overlap, 1)
+    starts = list(range(0, n_tokens - body, step)) + [n_tokens - body]
+    if len(starts) > max_windows:
+        # Văn bản quá dài → rải đều max_windows cửa sổ trên toàn văn bản
+        starts = np.linspace(0, n_tokens - body, max_windows).astype(int).tolist()
+    return starts
+
+
+def _aggregate_windows(probs: np.ndarray, lengths: np.ndarray, aggregate: str) -> np.ndarray:
+    """
+    Gộp xác suất các cửa sổ của một văn bản.
+    mean: trung bình theo số token mỗi cửa sổ.
+    attention: trọng số softmax(-entropy / nhiệt độ) × số token → cửa sổ thể hiện
+    cảm xúc rõ (entropy thấp) chi phối kết quả, đoạn trung tính dài không làm loãng.
+    """
+    weights = lengths.astype(np.float64)
+    if aggregate == "attention":
+        entropy = -(probs * np.log(np.clip(probs, 1e-12, None))).sum(axis=1) / np.log(probs.shape[1])
+        weights = weights * np.exp(-entropy / LONG_TEXT_ATTENTION_TEMPERATURE)
+    return (weights[:, None] * probs).sum(axis=0) / weights.sum()
+
+
+def _predict_long(
+    texts, batch_size: int, max_length: int, aggregate: str, overlap: int, max_windows: int, backend: str = None
+) -> np.ndarray:
+    """Văn bản dài qua inference service (nếu bật): cắt cửa sổ + tokenizer chạy trên luồng worker"""
+    if not ENABLE_INFERENCE_SERVICE or not texts:
+        return _predict_long_local(texts, batch_size, max_length, aggregate, overlap, max_windows, backend)
+    from models.sentiment_service import get_inference_service
+
+    return get_inference_service(backend).predict_long(
+        texts, aggregate, overlap, max_windows, batch_size=batch_size, max_length=max_length
+    )
+
+
+def _predict_long_local(
+    texts, batch_size: int, max_length: int, aggregate: str, overlap: int, max_windows: int, backend: str = None
+) -> np.ndarray:
+    """Cắt mọi văn bản thành cửa sổ token, chạy TẤT CẢ cửa sổ trong một lượt batch, rồi gộp"""
+    tokenizer, _ = get_model(backend)
+    if not texts:
+        return _forward_ids([], batch_size, backend)
+
+    encoded = tokenizer(texts, add_special_tokens=False, truncation=False, padding=False, verbose=False)
+    body = max_length - tokenizer.num_special_tokens_to_add()
+
+    # Cửa sổ được xếp liên tiếp theo văn bản (mỗi văn bản ≥ 1 cửa sổ)
+    windows, counts, lengths = [], [], []
+    for ids in encoded["input_ids"]:
+        starts = _window_starts(len(ids), body, overlap, max_windows)
+        for start in starts:
+            chunk = ids[start:start + body]
+            windows.append(tokenizer.build_inputs_with_special_tokens(chunk))
+            lengths.append(max(len(chunk), 1))
+        counts.append(len(starts))
+
+    window_probs = _forward_ids(windows, batch_size, backend)
+    bounds = np.cumsum(counts)[:-1]
+    return np.vstack([
+        _aggregate_windows(probs, doc_lengths, aggregate)
+        for probs, doc_lengths in zip(np.split(window_probs, bounds), np.split(np.array(lengths), bounds))
+    ]).astype(np.float32)
+
+
+def predict_proba_long(
+    texts,
+    aggregate: str = "mean",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_length: int = MAX_LENGTH,
+    overlap: int = LONG_TEXT_OVERLAP,
+    max_windows: int = LONG_TEXT_MAX_WINDOWS,
+    use_cache: bool = True,
+    backend: str = None,
+) -> np.ndarray:
+    """
+    Như predict_proba nhưng phủ toàn bộ văn bản dài (bài báo đầy đủ) thay vì cắt ở 256 token.
+
+    - Mỗi văn bản được chia thành các cửa sổ `max_length` token chồng lấn `overlap` token
+      (tối đa `max_windows` cửa sổ / văn bản)
+    - Cửa sổ của mọi văn bản chạy chung trong một lượt batch (không gọi model N lần)
+    - `aggregate`: "mean" hoặc "attention" (xem _aggregate_windows)
+    """
+    if aggregate not in LONG_TEXT_AGGREGATES:
+        raise ValueError(f"❌ aggregate '{aggregate}' không hỗ trợ (chọn một trong {LONG_TEXT_AGGREGATES})")
+    if isinstance(texts, str):
+        texts = [texts]
+    texts = [normalize_text(t) for t in texts]
+
+    key = f"{model_key(backend)}|long={aggregate},max_length={max_length},overlap={overlap},windows={max_windows}"
+    return _cached_predict(
+        texts,
+        key,
+        lambda batch: _predict_long(batch, batch_size, max_length, aggregate, overlap, max_windows, backend),
+        use_cache,
+    )
+
+
+# ------------------------------------------------------
+# 3️⃣ Phân tích cảm xúc cho 1 văn bản
+# ------------------------------------------------------
+def _predict(texts, batch_size: int = DEFAULT_BATCH_SIZE, long_text: str = None) -> np.ndarray:
+    """long_text = None → cắt ở MAX_LENGTH; "mean" / "attention" → cửa sổ trượt"""
+    if long_text:
+        return predict_proba_long(texts, aggregate=long_text, batch_size=batch_size)
+    return predict_proba(texts, batch_size=batch_size)
+
+
+def analyze_sentiment(text: str, long_text: str = None):
+    probs = _predict([text], long_text=long_text)[0]
     # Map nhãn sang cảm xúc
-    label_map = model.config.id2label
-    result = {label_map[i]: probs[0][i].item() for i in range(len(probs[0]))}
-    return result
+    return {label: float(p) for label, p in zip(get_label_names(), probs)}
 
 # ------------------------------------------------------
-# 3️⃣ Hàm xử lý DataFrame
+# 4️⃣ Hàm xử lý DataFrame
 # ------------------------------------------------------
-def analyze_dataframe(df: pd.DataFrame, column: str):
+def analyze_dataframe(
+    df: pd.DataFrame, column: str, batch_size: int = DEFAULT_BATCH_SIZE, long_text: str = None
+):
     if column not in df.columns:
         raise ValueError(f"❌ Cột '{column}' không tồn tại trong DataFrame!")
 
     df[column] = df[column].fillna("").astype(str)
-    results = [analyze_sentiment(text) for text in df[column]]
-    return pd.DataFrame(results)
+    probs = _predict(df[column].tolist(), batch_size=batch_size, long_text=long_text)
+    return pd.DataFrame(probs, columns=get_label_names())
 
 # ------------------------------------------------------
-# 4️⃣ Hàm phân loại nhanh cho Streamlit
+# 5️⃣ Hàm phân loại nhanh cho Streamlit
 # ------------------------------------------------------
-def classify_sentiment(texts):
+def classify_sentiment(texts, batch_size: int = DEFAULT_BATCH_SIZE, long_text: str = None):
     if isinstance(texts, str):
         texts = [texts]
 
-    results = []
-    for text in texts:
-        output = analyze_sentiment(text)
-        label = max(output, key=output.get).lower()
-
-        if "neg" in label:
-            results.append(-1)
-        elif "neu" in label:
-            results.append(0)
-        else:
-            results.append(1)
-    return results
+    probs = _predict(texts, batch_size=batch_size, long_text=long_text)
+    labels = get_label_names()
+    return [_label_to_score(labels[i]) for i in probs.argmax(axis=1)]
 
 # ------------------------------------------------------
-# 5️⃣ Test nhanh
+# 6️⃣ Test nhanh
 # ------------------------------------------------------
 if __name__ == "__main__":
     text = "Thị trường chứng khoán giảm mạnh, khối ngoại bán ròng hàng trăm tỷ đồng."
     print(analyze_sentiment(text))
+    print(classify_sentiment([text, "Lợi nhuận quý III tăng trưởng vượt kỳ vọng."]))
@@ -0,0 +1,277 @@
+"""
+Sentiment Inference Service - Một luồng duy nhất sở hữu model PhoBERT
+
+- Mọi session Streamlit gửi request vào hàng đợi có giới hạn (bounded queue)
+  thay vì tự chạy model → không còn nhiều forward pass tranh nhau toàn bộ core
+- Luồng worker gom các request đến gần nhau (trong INFERENCE_MAX_WAIT_MS) thành
+  một micro-batch → một lần forward cho nhiều session
+- Hàng đợi đầy hoặc request chưa được nhận sau INFERENCE_QUEUE_TIMEOUT → InferenceTimeout
+  (phía gọi chuyển sang phương án dự phòng, vd. chấm điểm theo từ khóa); request đã chạy
+  được chờ thêm tỉ lệ với khối lượng (khối lớn của score_news), vẫn có giới hạn
+- Thống kê: độ sâu hàng đợi, số batch, kích thước batch, độ trễ p50/p95 mỗi batch
+"""
+
+import logging
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config.inference_config import (
+    INFERENCE_BACKEND,
+    INFERENCE_BATCH_SIZE,
+    INFERENCE_LATENCY_WINDOW,
+    INFERENCE_MAX_BATCH_TEXTS,
+    INFERENCE_MAX_LENGTH,
+    INFERENCE_MAX_WAIT_MS,
+    INFERENCE_QUEUE_SIZE,
+    INFERENCE_QUEUE_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceTimeout(TimeoutError):
+    """Service PhoBERT quá tải: hàng đợi đầy hoặc kết quả không về kịp"""
+
+
+class _Request:
+    """
+    Một request văn bản thô. `long` = (aggregate, overlap, max_windows) → văn bản dài:
+    worker tự cắt cửa sổ token (tokenizer chỉ chạy trên luồng worker)
+    """
+
+    __slots__ = ("texts", "batch_size", "max_length", "long", "future", "enqueued")
+
+    def __init__(self, texts: list, batch_size: int, max_length: int, long: Optional[tuple] = None):
+        self.texts = texts
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.long = long
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class SentimentInferenceService:
+    """Hàng đợi request + 1 luồng worker chạy model theo micro-batch"""
+
+    def __init__(
+        self,
+        backend: str = INFERENCE_BACKEND,
+        queue_size: int = INFERENCE_QUEUE_SIZE,
+        max_wait_ms: float = INFERENCE_MAX_WAIT_MS,
+        max_batch_texts: int = INFERENCE_MAX_BATCH_TEXTS,
+    ):
+        self.backend = backend
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_texts = max_batch_texts
+        self._queue: "queue.Queue[_Request]" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=INFERENCE_LATENCY_WINDOW)
+        self._waits = deque(maxlen=INFERENCE_LATENCY_WINDOW)
+        self._batches = 0
+        self._requests = 0
+        self._texts = 0
+        self._errors = 0
+        self._thread = threading.Thread(target=self._run, name=f"phobert-{backend}", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------
+    # Phía gọi (session Streamlit / script)
+    # ------------------------------------------------------
+    def submit(
+        self,
+        texts: List[str],
+        batch_size: int = INFERENCE_BATCH_SIZE,
+        max_length: int = INFERENCE_MAX_LENGTH,
+        timeout: float = INFERENCE_QUEUE_TIMEOUT,
+        long: Optional[tuple] = None,
+    ) -> Future:
+        """Đưa request vào hàng đợi; InferenceTimeout nếu hàng đợi đầy quá `timeout` giây"""
+        request = _Request(list(texts), batch_size, max_length, long)
+        try:
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            raise InferenceTimeout(
+                f"Hàng đợi PhoBERT đầy ({self._queue.maxsize} request) sau {timeout}s"
+            ) from None
+        return request.future
+
+    def predict(
+        self,
+        texts: List[str],
+        batch_size: int = INFERENCE_BATCH_SIZE,
+        max_length: int = INFERENCE_MAX_LENGTH,
+        timeout: float = INFERENCE_QUEUE_TIMEOUT,
+    ) -> np.ndarray:
+        """
+        Gửi request và chờ ma trận xác suất (cùng định dạng _predict_batches).
+        InferenceTimeout nếu hàng đợi đầy / request chưa được nhận trong `timeout` giây
+        (hoặc đã chạy quá thời gian cho phép, xem _wait).
+        """
+        future = self.submit(texts, batch_size, max_length, timeout)
+        return self._wait(future, timeout, self._work_units(len(texts)))
+
+    def predict_long(
+        self,
+        texts: List[str],
+        aggregate: str,
+        overlap: int,
+        max_windows: int,
+        batch_size: int = INFERENCE_BATCH_SIZE,
+        max_length: int = INFERENCE_MAX_LENGTH,
+        timeout: float = INFERENCE_QUEUE_TIMEOUT,
+    ) -> np.ndarray:
+        """Như predict cho văn bản dài (cửa sổ trượt, xem sentiment_phobert._predict_long_local)"""
+        long = (aggregate, overlap, max_windows)
+        future = self.submit(texts, batch_size, max_length, timeout, long=long)
+        return self._wait(future, timeout, self._work_units(len(texts) * max_windows))
+
+    def _work_units(self, n_inputs: int) -> int:
+        """Số micro-batch đầy (max_batch_texts) tương ứng khối lượng request, tối thiểu 1"""
+        return max(1, math.ceil(n_inputs / self.max_batch_texts))
+
+    @staticmethod
+    def _wait(future: Future, timeout: float, units: int = 1) -> np.ndarray:
+        """
+        Chờ kết quả: sau `timeout` giây mà worker chưa nhận request → hủy, InferenceTimeout
+        (quá tải). Đã chạy → chờ thêm tối đa `timeout` × `units` giây.
+        """
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            # Request chưa được worker nhận → hủy để không chạy model vô ích
+            if future.cancel():
+                raise InferenceTimeout(f"PhoBERT chưa nhận request sau {timeout}s (quá tải)") from None
+        try:
+            return future.result(timeout * units)
+        except FutureTimeout:
+            raise InferenceTimeout(f"PhoBERT không trả kết quả sau {timeout * (units + 1)}s") from None
+
+    # ------------------------------------------------------
+    # Luồng worker
+    # ------------------------------------------------------
+    def _collect(self, first: _Request) -> List[_Request]:
+        """Gom thêm request đến trong khoảng max_wait (tối đa max_batch_texts văn bản)"""
+        requests = [first]
+        total = len(first.texts)
+        deadline = time.perf_counter() + self.max_wait
+        while total < self.max_batch_texts:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            requests.append(request)
+            total += len(request.texts)
+        return requests
+
+    def _run(self):
+        from models.sentiment_phobert import _predict_batches, _predict_long_local
+
+        while True:
+            first = self._queue.get()
+            # Bỏ request phía gọi đã hủy (hết thời gian chờ); số còn lại chuyển sang "đang chạy"
+            requests = [r for r in self._collect(first) if r.future.set_running_or_notify_cancel()]
+
+            # Request khác loại / tham số (batch_size, max_length) không ghép chung được
+            groups: Dict[tuple, List[_Request]] = {}
+            for request in requests:
+                key = (request.long, request.batch_size, request.max_length)
+                groups.setdefault(key, []).append(request)
+
+            for (long, batch_size, max_length), group in groups.items():
+                texts = [t for request in group for t in request.texts]
+                start = time.perf_counter()
+                try:
+                    if long:
+                        probs = _predict_long_local(texts, batch_size, max_length, *long, self.backend)
+                    else:
+                        probs = _predict_batches(texts, batch_size, max_length, self.backend)
+                except Exception as e:
+                    logger.error(f"PhoBERT batch lỗi ({len(texts)} văn bản): {e}")
+                    with self._lock:
+                        self._errors += 1
+                    for request in group:
+                        request.future.set_exception(e)
+                    continue
+
+                elapsed = time.perf_counter() - start
+                offset = 0
+                for request in group:
+                    request.future.set_result(probs[offset:offset + len(request.texts)])
+                    offset += len(request.texts)
+
+                with self._lock:
+                    self._batches += 1
+                    self._requests += len(group)
+                    self._texts += len(texts)
+                    self._latencies.append(elapsed)
+                    self._waits.extend(start - request.enqueued for request in group)
+                logger.debug(
+                    f"PhoBERT micro-batch: {len(group)} request, {len(texts)} văn bản, "
+                    f"{elapsed * 1000:.0f} ms, hàng đợi còn {self._queue.qsize()}"
+                )
+
+    # ------------------------------------------------------
+    # Thống kê
+    # ------------------------------------------------------
+    def stats(self) -> Dict:
+        """Độ sâu hàng đợi, số batch, kích thước batch trung bình, độ trễ p50/p95 (ms)"""
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            waits = np.array(self._waits) * 1000
+            batches, requests, texts, errors = self._batches, self._requests, self._texts, self._errors
+
+        def pct(values, q):
+            return round(float(np.percentile(values, q)), 1) if len(values) else None
+
+        return {
+            "backend": self.backend,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "batches": batches,
+            "requests": requests,
+            "texts": texts,
+            "errors": errors,
+            "avg_requests_per_batch": round(requests / batches, 2) if batches else None,
+            "avg_texts_per_batch": round(texts / batches, 1) if batches else None,
+            "batch_latency_p50_ms": pct(latencies, 50),
+            "batch_latency_p95_ms": pct(latencies, 95),
+            "queue_wait_p95_ms": pct(waits, 95),
+        }
+
+
+# Một service cho mỗi backend trong process (dùng chung giữa mọi session Streamlit)
+_services: Dict[str, SentimentInferenceService] = {}
+_services_lock = threading.Lock()
+
+
+def get_inference_service(backend: str = None) -> SentimentInferenceService:
+    backend = backend or INFERENCE_BACKEND
+    with _services_lock:
+        if backend not in _services:
+            _services[backend] = SentimentInferenceService(backend)
+        return _services[backend]
+
+
+def get_inference_stats() -> List[Dict]:
+    """Thống kê của các service đã khởi động (rỗng nếu chưa có request nào)"""
+    with _services_lock:
+        services = list(_services.values())
+    stats = [service.stats() for service in services]
+    if stats:
+        import torch
+
+        for item in stats:
+            item.update(
+                intra_op_threads=torch.get_num_threads(),
+                inter_op_threads=torch.get_num_interop_threads(),
+            )
+    return stats
@@ -3,8 +3,10 @@
 # ============================================================
 import pandas as pd
 import numpy as np
-import streamlit as st
-from statsmodels.tsa.api import VAR
+from utils.disk_cache import disk_cached
+from utils.cache_stats import cached_data
+from utils.fingerprint import FINGERPRINT_HASH_FUNCS, drop_fingerprint
+from models import var_service
 from statsmodels.stats.diagnostic import acorr_ljungbox
 import warnings
 
@@ -66,8 +68,7 @@ class ThresholdVAR:
     # ============================================================
     def select_lag_order(self, regime_data: pd.DataFrame, maxlags: int = 10):
         try:
-            model = VAR(regime_data[self.dependent_vars])
-            lag_order = model.select_order(maxlags=maxlags)
+            lag_order = var_service.select_order(regime_data, self.dependent_vars, maxlags)
             selected_lag = lag_order.selected_orders.get("aic") or 1
             print(f"📈 Lag tối ưu (AIC) = {selected_lag}")
             return selected_lag
@@ -85,8 +86,7 @@ class ThresholdVAR:
         # LOW regime
         try:
             p_low = self.select_lag_order(self.regime_low, maxlags=maxlags)
-            model_low = VAR(self.regime_low[self.dependent_vars])
-            self.model_low = model_low.fit(p_low)
+            self.model_low = var_service.fit(self.regime_low, self.dependent_vars, p_low)
             print(f"✅ LOW regime fitted (lag={p_low})")
         except Exception as e:
             print("❌ Lỗi khi ước lượng LOW regime:", e)
@@ -95,8 +95,7 @@ class ThresholdVAR:
         # HIGH regime
         try:
             p_high = self.select_lag_order(self.regime_high, maxlags=maxlags)
-            model_high = VAR(self.regime_high[self.dependent_vars])
-            self.model_high = model_high.fit(p_high)
+            self.model_high = var_service.fit(self.regime_high, self.dependent_vars, p_high)
             print(f"✅ HIGH regime fitted (lag={p_high})")
         except Exception as e:
             print("❌ Lỗi khi ước lượng HIGH regime:", e)
@@ -129,8 +128,14 @@ class ThresholdVAR:
     # 🔹 6. Impulse Response Function
     # ============================================================
     def impulse_response(self, steps=15):
-        irf_low = self.model_low.irf(steps) if self.model_low else None
-        irf_high = self.model_high.irf(steps) if self.model_high else None
+        irf_low = (
+            var_service.irf(self.regime_low, self.dependent_vars, self.model_low.k_ar, steps)
+            if self.model_low else None
+        )
+        irf_high = (
+            var_service.irf(self.regime_high, self.dependent_vars, self.model_high.k_ar, steps)
+            if self.model_high else None
+        )
         self.results["irf_low"] = irf_low
         self.results["irf_high"] = irf_high
         return irf_low, irf_high
@@ -153,7 +158,8 @@ class ThresholdVAR:
 # ============================================================
 # 🧠 HÀM CHẠY TVAR DÙNG CHO DASHBOARD STREAMLIT
 # ============================================================
-@st.cache_data(show_spinner="Đang chạy mô hình TVAR...")
+@cached_data("tvar_model", show_spinner="Đang chạy mô hình TVAR...", hash_funcs=FINGERPRINT_HASH_FUNCS)
+@disk_cached("tvar_model", depends=(ThresholdVAR, var_service))
 def run_tvar(df: pd.DataFrame, ticker: str, steps: int = 15):
     df = df.copy()
     df["close"] = pd.to_numeric(df["close"], errors="coerce")
@@ -162,7 +168,8 @@ def run_tvar(df: pd.DataFrame, ticker: str, steps: int = 15):
         pd.to_numeric(df.get("tích cực"), errors="coerce")
         - pd.to_numeric(df.get("tiêu cực"), errors="coerce")
     )
-    df = df[["ret", "score"]].replace([np.inf, -np.inf], np.nan).dropna()
+    # Cột mới tính từ dữ liệu gốc → bỏ token thừa hưởng qua attrs
+    df = drop_fingerprint(df[["ret", "score"]].replace([np.inf, -np.inf], np.nan).dropna())
 
     if len(df) < 40:
         return {"error": f"Dữ liệu quá nhỏ ({len(df)} quan sát) cho {ticker}"}
@@ -0,0 +1,122 @@
+"""
+VAR Service - Ước lượng VAR dùng chung (có nhớ) cho Granger và TVAR
+
+- Khóa: (fingerprint dữ liệu, danh sách biến, lag / maxlags, trend)
+  fingerprint lấy từ utils.fingerprint.frame_fingerprint của đúng các cột được dùng;
+  frame đến đây luôn là frame suy ra (sai phân, chia regime) → bỏ token thừa hưởng, hash dữ liệu
+- select_order(): bảng tiêu chí AIC/BIC/FPE/HQIC; fit(): hệ số, phần dư, ma trận hiệp phương sai
+  phần dư (sigma_u); irf(): hàm phản ứng xung — mỗi thứ chỉ tính MỘT lần mỗi process
+- granger_test, ThresholdVAR.fit / diagnostics / impulse_response đều đi qua đây
+  → đổi tab, đổi mức ý nghĩa, đổi chế độ test không phải chạy lại OLS
+- Hit/miss ghi vào utils.cache_stats (component "var_select_order", "var_fit", "var_irf")
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.api import VAR
+
+from utils.cache_stats import estimate_size, get_stats
+from utils.fingerprint import drop_fingerprint, frame_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Số kết quả tối đa giữ trong bộ nhớ mỗi loại (LRU)
+VAR_SERVICE_MAX_ENTRIES = 128
+
+
+class _Memo:
+    """LRU nhỏ an toàn đa luồng; hàm tính chạy ngoài lock (tính trùng hiếm, vô hại)"""
+
+    def __init__(self, component: str, max_entries: int = VAR_SERVICE_MAX_ENTRIES):
+        self.component = component
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        start = time.perf_counter()
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                value = self._entries[key]
+                get_stats().record_hit(self.component, time.perf_counter() - start)
+                return value
+
+        value = compute()
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        get_stats().record_miss(self.component, seconds, estimate_size(value))
+        if evicted:
+            get_stats().record_eviction(self.component, evicted)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_orders = _Memo("var_select_order")
+_fits = _Memo("var_fit")
+_irfs = _Memo("var_irf")
+
+
+def dataset_key(data: pd.DataFrame, variables: Sequence[str]) -> Tuple[str, Tuple[str, ...]]:
+    """(fingerprint của các cột `variables`, tuple biến) — phần chung của mọi khóa"""
+    variables = tuple(variables)
+    # data[cols] mang attrs (bản sao) của frame gốc → bỏ token để không trùng khóa với frame gốc
+    return frame_fingerprint(drop_fingerprint(data[list(variables)])), variables
+
+
+# ======================================================
+# 📐 ƯỚC LƯỢNG
+# ======================================================
+def select_order(data: pd.DataFrame, variables: Sequence[str], maxlags: int, trend: str = "c"):
+    """VAR(...).select_order(maxlags) có nhớ → LagOrderResults"""
+    key = (*dataset_key(data, variables), int(maxlags), trend)
+    return _orders.get_or_compute(
+        key, lambda: VAR(data[list(variables)]).select_order(maxlags=maxlags, trend=trend)
+    )
+
+
+def fit(data: pd.DataFrame, variables: Sequence[str], lag: int, trend: str = "c"):
+    """VAR(...).fit(lag) có nhớ → VARResults (params, resid, sigma_u, roots, ...)"""
+    key = (*dataset_key(data, variables), int(lag), trend)
+    return _fits.get_or_compute(key, lambda: VAR(data[list(variables)]).fit(int(lag), trend=trend))
+
+
+def residual_covariance(data: pd.DataFrame, variables: Sequence[str], lag: int, trend: str = "c") -> np.ndarray:
+    """Ma trận hiệp phương sai phần dư Σu của VAR(lag) (dùng lại kết quả fit)"""
+    return np.asarray(fit(data, variables, lag, trend).sigma_u)
+
+
+def irf(data: pd.DataFrame, variables: Sequence[str], lag: int, steps: int, trend: str = "c"):
+    """Hàm phản ứng xung `steps` bước của VAR(lag) có nhớ → IRAnalysis"""
+    key = (*dataset_key(data, variables), int(lag), trend, int(steps))
+    return _irfs.get_or_compute(key, lambda: fit(data, variables, lag, trend).irf(int(steps)))
+
+
+# ======================================================
+# 🧹 QUẢN LÝ
+# ======================================================
+def clear_var_cache():
+    for memo in (_orders, _fits, _irfs):
+        memo.clear()
+
+
+def get_var_cache_sizes() -> Dict[str, int]:
+    return {memo.component: len(memo) for memo in (_orders, _fits, _irfs)}
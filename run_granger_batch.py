@@ -0,0 +1,117 @@
+"""
+Script chạy kiểm định Granger VAR-based cho toàn bộ mã × Content/Title × Before/After Scandal
+Chạy: python run_granger_batch.py [--tickers AMD,FLC] [--columns close,tích cực,tiêu cực]
+                                  [--maxlags 14] [--joint] [--workers 4]
+                                  [--bootstrap 999 --bootstrap-method wild --seed 42]
+                                  [--output data/granger_batch.xlsx]
+
+- Mỗi dataset chạy trên một process riêng (ADF → chọn lag → VAR → test nhân quả)
+- Kết quả: sheet "results" (bảng tidy, mỗi dòng một cặp caused ← causing)
+  và sheet "p_value" (bảng chéo kiểu paper); đuôi .csv → chỉ ghi bảng tidy
+- --log-dir: lưu log chi tiết của từng dataset (như output của tab Granger)
+"""
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from models.granger_batch import (
+    DATA_TYPES,
+    DEFAULT_COLUMNS,
+    MAX_BATCH_WORKERS,
+    TIME_PERIODS,
+    build_jobs,
+    pivot_results,
+    run_granger_batch,
+)
+from models.granger_bootstrap import BOOTSTRAP_METHODS
+
+DEFAULT_OUTPUT = "data/granger_batch.xlsx"
+
+
+def parse_list(value: str):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def job_name(job) -> str:
+    return f"{job['ticker']}/{job['data_type']}/{job['period']}"
+
+
+def write_results(results: pd.DataFrame, output: str):
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    if output.endswith(".csv"):
+        results.to_csv(output, index=False, encoding="utf-8-sig")
+        return
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        results.to_excel(writer, sheet_name="results", index=False)
+        pivot = pivot_results(results)
+        if not pivot.empty:
+            pivot.to_excel(writer, sheet_name="p_value")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Granger VAR-based hàng loạt trên toàn bộ dữ liệu")
+    parser.add_argument("--data-dir", default="data", help="Thư mục dữ liệu gốc (mặc định: data)")
+    parser.add_argument("--tickers", default=None, help="Chỉ chạy các mã này, vd. AMD,FLC (mặc định: tất cả)")
+    parser.add_argument("--data-types", default=",".join(DATA_TYPES))
+    parser.add_argument("--periods", default=",".join(TIME_PERIODS))
+    parser.add_argument("--columns", default=",".join(DEFAULT_COLUMNS), help="Các biến đưa vào VAR")
+    parser.add_argument("--maxlags", type=int, default=14)
+    parser.add_argument("--alpha", type=float, default=0.05, help="Mức ý nghĩa thống kê")
+    parser.add_argument("--joint", action="store_true", help="Test tất cả biến cùng lúc thay vì từng cặp")
+    parser.add_argument("--bootstrap", type=int, default=0, help="Số lượt bootstrap (0 = chỉ p-value tiệm cận)")
+    parser.add_argument("--bootstrap-method", default="wild", choices=BOOTSTRAP_METHODS)
+    parser.add_argument("--seed", type=int, default=42, help="Seed cho bootstrap")
+    parser.add_argument("--workers", type=int, default=MAX_BATCH_WORKERS)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="File .xlsx hoặc .csv")
+    parser.add_argument("--log-dir", default=None, help="Thư mục lưu log chi tiết từng dataset")
+    args = parser.parse_args()
+
+    jobs = build_jobs(
+        args.data_dir,
+        tickers=parse_list(args.tickers) if args.tickers else None,
+        data_types=parse_list(args.data_types),
+        periods=parse_list(args.periods),
+    )
+    if not jobs:
+        raise SystemExit(f"❌ Không tìm thấy dataset nào trong {args.data_dir}")
+    print(f"🔁 {len(jobs)} dataset × biến {parse_list(args.columns)} — {args.workers} process")
+
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+
+    def report(outcome):
+        job, rows = outcome["job"], outcome["rows"]
+        error = rows[0].get("error")
+        if error:
+            print(f"   ⚠️  {job_name(job)}: {error}")
+        else:
+            significant = sum(r["significant"] for r in rows)
+            print(f"   ✅ {job_name(job)}: VAR({rows[0]['lag']}), {significant}/{len(rows)} quan hệ có ý nghĩa")
+        if args.log_dir:
+            name = f"{job['ticker']}_{job['data_type']}_{job['period']}.log".replace(" ", "_")
+            with open(os.path.join(args.log_dir, name), "w", encoding="utf-8") as f:
+                f.write(outcome["log"])
+
+    start = time.perf_counter()
+    results = run_granger_batch(
+        jobs,
+        columns=parse_list(args.columns),
+        maxlags=args.maxlags,
+        significance_level=args.alpha,
+        test_individually=not args.joint,
+        bootstrap_draws=args.bootstrap,
+        bootstrap_method=args.bootstrap_method,
+        bootstrap_seed=args.seed,
+        workers=args.workers,
+        progress=report,
+    )
+    write_results(results, args.output)
+
+    failed = results["error"].notna().sum()
+    print(
+        f"\n✨ Hoàn tất sau {time.perf_counter() - start:.1f}s: {len(results)} dòng, "
+        f"{failed} dataset lỗi → {args.output}"
+    )
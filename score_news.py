@@ -0,0 +1,301 @@
+"""
+Script chấm điểm cảm xúc PhoBERT hàng loạt cho kho tin tức (không cần Streamlit)
+Chạy: python score_news.py [inputs ...] [--text-column title] [--workers 2] [--daily] [--restart]
+
+- Đọc xlsx / csv / parquet theo từng khối (không nạp cả file vào RAM)
+- Mỗi khối được chấm theo batch trong một process con (nhiều worker song song)
+- Khối đã xong được lưu checkpoint (Parquet) → chạy lại sẽ tiếp tục từ chỗ dừng
+- Kết quả có các cột 'Tiêu cực' / 'Tích cực' / 'Trung tính' / 'label' đúng định dạng
+  mà utils.data_loader._safe_load_excel đọc (--daily: gộp trung bình theo ngày)
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.inference_config import INFERENCE_BACKEND, INFERENCE_BATCH_SIZE
+from utils.snapshot_store import snapshot_key
+
+DEFAULT_INPUT = "data/data_world_cloud"
+DEFAULT_OUTPUT_DIR = "data/data_scored"
+CHECKPOINT_DIR = "data/.cache/score_news"
+DEFAULT_CHUNK_SIZE = 2000
+INPUT_EXTENSIONS = (".xlsx", ".csv", ".parquet")
+
+# Nhãn PhoBERT → cột cảm xúc (cùng tên & thứ tự như file data_*_scandals)
+SENTIMENT_COLUMNS = {"NEG": "Tiêu cực", "POS": "Tích cực", "NEU": "Trung tính"}
+LABEL_SCORES = {"Tiêu cực": -1, "Trung tính": 0, "Tích cực": 1}
+
+
+# ======================================================
+# 📥 ĐỌC FILE THEO KHỐI
+# ======================================================
+def iter_input_files(inputs: List[str]) -> Iterator[str]:
+    """Mở rộng thư mục → danh sách file xlsx/csv/parquet (bỏ file tạm của Excel)"""
+    for item in inputs:
+        if os.path.isdir(item):
+            for file in sorted(os.listdir(item)):
+                if file.endswith(INPUT_EXTENSIONS) and not file.startswith("~$"):
+                    yield os.path.join(item, file)
+        elif os.path.exists(item):
+            yield item
+        else:
+            print(f"⚠️  Bỏ qua (không tồn tại): {item}")
+
+
+def iter_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Đọc file theo từng khối `chunk_size` dòng"""
+    if path.endswith(".csv"):
+        yield from pd.read_csv(path, chunksize=chunk_size, encoding="utf-8-sig")
+
+    elif path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+    else:
+        # openpyxl read-only: duyệt từng dòng, không dựng cả workbook trong RAM
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(c) if c is not None else f"col_{i}" for i, c in enumerate(next(rows, ()))]
+            buffer = []
+            for row in rows:
+                if all(v is None for v in row):
+                    continue
+                buffer.append(row)
+                if len(buffer) >= chunk_size:
+                    yield pd.DataFrame(buffer, columns=header)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=header)
+        finally:
+            workbook.close()
+
+
+# ======================================================
+# 🤖 CHẤM ĐIỂM TRONG PROCESS CON
+# ======================================================
+def _init_worker(threads: int):
+    """Chia đều số core cho các worker để không tranh chấp luồng tính toán"""
+    import torch
+
+    torch.set_num_threads(threads)
+
+
+def _score_chunk(index: int, texts: List[str], batch_size: int, backend: str, long_text: Optional[str] = None):
+    """Chạy trong process con: trả về (chỉ số khối, ma trận xác suất, tên nhãn)"""
+    from models.sentiment_phobert import get_label_names, predict_proba, predict_proba_long
+
+    if long_text:
+        probs = predict_proba_long(texts, aggregate=long_text, batch_size=batch_size, backend=backend)
+    else:
+        probs = predict_proba(texts, batch_size=batch_size, backend=backend)
+    return index, probs, get_label_names()
+
+
+def sentiment_frame(chunk: pd.DataFrame, probs: np.ndarray, names: List[str]) -> pd.DataFrame:
+    """Ghép các cột cảm xúc + label (-1/0/1) vào khối dữ liệu gốc"""
+    out = chunk.reset_index(drop=True).copy()
+    columns = [SENTIMENT_COLUMNS.get(n.upper()[:3], n) for n in names]
+    for i, column in enumerate(columns):
+        out[column] = probs[:, i].astype(float)
+    out["label"] = [LABEL_SCORES.get(columns[i], 0) for i in probs.argmax(axis=1)]
+    return out
+
+
+def aggregate_daily(df: pd.DataFrame, date_column: str) -> pd.DataFrame:
+    """Trung bình xác suất theo ngày (giống bố cục file data_*_scandals)"""
+    dates = pd.to_datetime(df[date_column], errors="coerce", dayfirst=True)
+    prob_columns = [c for c in SENTIMENT_COLUMNS.values() if c in df.columns]
+    daily = df[prob_columns].groupby(dates.dt.normalize().rename("date")).mean()
+    daily["label"] = daily.idxmax(axis=1).map(LABEL_SCORES)
+    daily["count"] = df.groupby(dates.dt.normalize()).size()
+    return daily.reset_index()
+
+
+# ======================================================
+# 💾 CHECKPOINT
+# ======================================================
+def checkpoint_dir(path: str, text_column: str, chunk_size: int, backend: str, long_text: Optional[str] = None) -> str:
+    """Thư mục checkpoint gắn với phiên bản file + tham số (đổi gì → chấm lại từ đầu)"""
+    raw = f"{snapshot_key(path)}|{text_column}|{chunk_size}|{backend}|{long_text}"
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CHECKPOINT_DIR, f"{stem}.{hashlib.sha1(raw.encode()).hexdigest()[:12]}")
+
+
+def _part_path(folder: str, index: int) -> str:
+    return os.path.join(folder, f"chunk-{index:06d}.parquet")
+
+
+def _write_part(folder: str, index: int, df: pd.DataFrame):
+    """Ghi khối qua file tạm + os.replace → không bao giờ để lại file dở dang"""
+    target = _part_path(folder, index)
+    tmp = f"{target}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+
+
+def write_output(df: pd.DataFrame, target: str):
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    if target.endswith(".csv"):
+        df.to_csv(target, index=False, encoding="utf-8-sig")
+    elif target.endswith(".parquet"):
+        df.to_parquet(target, index=False)
+    else:
+        df.to_excel(target, index=False, engine="openpyxl")
+
+
+# ======================================================
+# 🚀 CHẤM ĐIỂM MỘT FILE
+# ======================================================
+def score_file(
+    path: str,
+    output_dir: str = DEFAULT_OUTPUT_DIR,
+    text_column: str = "title",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    batch_size: int = INFERENCE_BATCH_SIZE,
+    workers: int = 1,
+    backend: str = INFERENCE_BACKEND,
+    output_format: str = "xlsx",
+    daily: bool = False,
+    date_column: str = "date",
+    restart: bool = False,
+    long_text: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Chấm điểm 1 file, trả về đường dẫn file kết quả (None nếu lỗi).
+    `long_text` = "mean" / "attention" → chấm toàn bộ bài viết bằng cửa sổ trượt.
+    """
+    folder = checkpoint_dir(path, text_column, chunk_size, backend, long_text)
+    if restart and os.path.isdir(folder):
+        shutil.rmtree(folder)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "source": path, "text_column": text_column, "chunk_size": chunk_size,
+            "backend": backend, "long_text": long_text,
+        }, f)
+
+    start = time.perf_counter()
+    resumed, scored, rows = 0, 0, 0
+    pool = None
+    if workers > 1:
+        # spawn: không fork process đang giữ luồng của torch
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(max(1, (os.cpu_count() or 1) // workers),),
+        )
+    pending, futures = {}, set()
+
+    def collect(index, probs, names):
+        nonlocal scored
+        _write_part(folder, index, sentiment_frame(pending.pop(index), probs, names))
+        scored += 1
+        print(f"   ✅ Khối {index} ({len(probs):,} dòng)")
+
+    try:
+        for index, chunk in enumerate(iter_chunks(path, chunk_size)):
+            rows += len(chunk)
+            if os.path.exists(_part_path(folder, index)):
+                resumed += 1
+                continue
+            if text_column not in chunk.columns:
+                print(f"❌ {path}: không có cột '{text_column}' (các cột: {list(chunk.columns)})")
+                return None
+
+            texts = chunk[text_column].fillna("").astype(str).tolist()
+            pending[index] = chunk
+            if pool is None:
+                collect(*_score_chunk(index, texts, batch_size, backend, long_text))
+                continue
+
+            futures.add(pool.submit(_score_chunk, index, texts, batch_size, backend, long_text))
+            # Giữ tối đa 2 khối chờ mỗi worker → bộ nhớ không phụ thuộc kích thước file
+            if len(futures) >= workers * 2:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(*future.result())
+
+        for future in futures:
+            collect(*future.result())
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    parts = sorted(f for f in os.listdir(folder) if f.startswith("chunk-") and f.endswith(".parquet"))
+    if not parts:
+        print(f"ℹ️  {path}: không có dòng nào")
+        return None
+    result = pd.concat([pd.read_parquet(os.path.join(folder, p)) for p in parts], ignore_index=True)
+    if daily:
+        result = aggregate_daily(result, date_column)
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    target = os.path.join(output_dir, f"{stem}{'_daily' if daily else ''}.{output_format}")
+    write_output(result, target)
+    shutil.rmtree(folder, ignore_errors=True)
+
+    print(
+        f"📊 {path} → {target}: {rows:,} dòng, {scored} khối mới, {resumed} khối từ checkpoint "
+        f"({time.perf_counter() - start:.1f}s)"
+    )
+    return target
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chấm điểm cảm xúc PhoBERT hàng loạt cho file tin tức")
+    parser.add_argument("inputs", nargs="*", default=[DEFAULT_INPUT], help=f"File hoặc thư mục (mặc định: {DEFAULT_INPUT})")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help=f"Thư mục kết quả (mặc định: {DEFAULT_OUTPUT_DIR})")
+    parser.add_argument("--text-column", default="title", help="Cột văn bản cần chấm (mặc định: title)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Số dòng mỗi khối/checkpoint")
+    parser.add_argument("--batch-size", type=int, default=INFERENCE_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="Số process chấm điểm song song")
+    parser.add_argument("--backend", default=INFERENCE_BACKEND, help="fp32 | int8")
+    parser.add_argument("--format", dest="output_format", default="xlsx", choices=["xlsx", "csv", "parquet"])
+    parser.add_argument("--daily", action="store_true", help="Gộp trung bình xác suất theo ngày")
+    parser.add_argument("--date-column", default="date", help="Cột ngày dùng cho --daily")
+    parser.add_argument("--restart", action="store_true", help="Bỏ checkpoint cũ, chấm lại từ đầu")
+    parser.add_argument(
+        "--long-text", choices=["mean", "attention"], default=None,
+        help="Chấm toàn bộ văn bản dài (vd. --text-column content) bằng cửa sổ trượt",
+    )
+    args = parser.parse_args()
+
+    outputs, failed = [], 0
+    for path in iter_input_files(args.inputs):
+        print(f"\n🔄 {path}")
+        target = score_file(
+            path,
+            output_dir=args.output_dir,
+            text_column=args.text_column,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            backend=args.backend,
+            output_format=args.output_format,
+            daily=args.daily,
+            date_column=args.date_column,
+            restart=args.restart,
+            long_text=args.long_text,
+        )
+        if target:
+            outputs.append(target)
+        else:
+            failed += 1
+
+    print(f"\n🎉 Hoàn tất: {len(outputs)} file kết quả, {failed} file lỗi/bỏ qua")
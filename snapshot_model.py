@@ -0,0 +1,50 @@
+"""
+Script lưu PhoBERT (tokenizer + trọng số safetensors) vào thư mục cục bộ
+→ app khởi động / warmup nạp model từ đĩa, không gọi Hugging Face Hub
+Chạy: python snapshot_model.py [--path data/.models/phobert] [--check]
+"""
+
+import argparse
+import json
+import os
+import time
+
+from config.inference_config import PHOBERT_SNAPSHOT_DIR
+from models.sentiment_phobert import (
+    MODEL_NAME,
+    MODEL_REVISION,
+    SNAPSHOT_MANIFEST,
+    local_snapshot_dir,
+    save_model_snapshot,
+)
+
+
+def check_snapshot(path: str) -> bool:
+    """Nạp thử model từ snapshot (chỉ file cục bộ) và in thời gian nạp"""
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    if local_snapshot_dir(path) is None:
+        print(f"❌ Chưa có snapshot hợp lệ tại {path}")
+        return False
+    start = time.perf_counter()
+    AutoTokenizer.from_pretrained(path, local_files_only=True, use_fast=True)
+    AutoModelForSequenceClassification.from_pretrained(path, local_files_only=True)
+    with open(os.path.join(path, SNAPSHOT_MANIFEST), encoding="utf-8") as f:
+        commit = json.load(f)["commit"]
+    print(f"✅ Nạp snapshot {path} (commit {commit[:12]}): {time.perf_counter() - start:.2f}s")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lưu PhoBERT vào thư mục cục bộ cho khởi động nhanh")
+    parser.add_argument("--path", default=PHOBERT_SNAPSHOT_DIR, help=f"Thư mục đích (mặc định: {PHOBERT_SNAPSHOT_DIR})")
+    parser.add_argument("--check", action="store_true", help="Chỉ kiểm tra snapshot hiện có")
+    args = parser.parse_args()
+
+    if not args.check:
+        print(f"⬇️  Tải {MODEL_NAME}@{MODEL_REVISION} ...")
+        start = time.perf_counter()
+        save_model_snapshot(args.path)
+        print(f"💾 Đã lưu snapshot vào {args.path} ({time.perf_counter() - start:.1f}s)")
+
+    check_snapshot(args.path)
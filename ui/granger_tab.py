@@ -10,6 +10,9 @@ from statsmodels.tsa.stattools import grangercausalitytests
 # ✅ Import module nội bộ
 from utils.data_loader import load_granger_data
 from models.granger_test import granger_test  # VAR-based nâng cao
+from models.granger_bootstrap import BOOTSTRAP_METHODS
+from models.rolling_granger import rolling_granger_test
+from utils.fingerprint import FINGERPRINT_HASH_FUNCS, derive_fingerprint
 
 
 # ======================================================
@@ -175,7 +178,8 @@ def render(ticker: str = None):
         "**Chọn phương pháp kiểm định:**",
         [
             "🔹 Kiểm định Granger đơn biến (Classic)",
-            "🔸 Kiểm định VAR-based đa biến (Nâng cao - theo Paper)"
+            "🔸 Kiểm định VAR-based đa biến (Nâng cao - theo Paper)",
+            "📈 Granger theo cửa sổ trượt (Rolling)"
         ],
         index=1,
         help="VAR-based cho phép kiểm tra nhiều biến cùng lúc và xử lý chuỗi không dừng tự động"
@@ -190,7 +194,7 @@ def render(ticker: str = None):
         return
 
     # Lọc các cột số
-    available_cols = [c for c in df.columns if df[c].dtype in ['float64', 'int64', 'float32', 'int32']]
+    available_cols = df.select_dtypes(include="number").columns.tolist()
     
     if len(available_cols) < 2:
         st.error("❌ Dữ liệu cần ít nhất 2 biến số (ví dụ: sentiment_score, stock_price).")
@@ -236,23 +240,20 @@ def render(ticker: str = None):
         if st.button("🚀 Chạy kiểm định Classic Granger", type="primary", use_container_width=True):
             df_test = df[[y_col, x_col]].dropna().copy()
             df_test.columns = ["y", "x"]
+            derive_fingerprint(df_test, df, f"classic:{y_col},{x_col}")
             
             if len(df_test) < maxlag + 10:
                 st.error(f"❌ Không đủ dữ liệu: cần ít nhất {maxlag + 10} quan sát, hiện có {len(df_test)}")
                 return
 
-            @st.cache_data(show_spinner=False, ttl=7200)
-            def run_granger_test_cached(test_data_tuple, max_lag):
-                # Convert tuple back to DataFrame
-                import pandas as pd
-                df_temp = pd.DataFrame(test_data_tuple, columns=['y', 'x'])
-                return grangercausalitytests(df_temp, maxlag=max_lag, verbose=False)
+            # Khóa cache theo fingerprint của frame (không hash toàn bộ dữ liệu)
+            @st.cache_data(show_spinner=False, ttl=7200, hash_funcs=FINGERPRINT_HASH_FUNCS)
+            def run_granger_test_cached(df_data, max_lag):
+                return grangercausalitytests(df_data[["y", "x"]], maxlag=max_lag, verbose=False)
             
             with st.spinner(f"🔍 Đang chạy kiểm định Granger (lag ≤ {maxlag})..."):
                 try:
-                    # Convert to tuple for caching
-                    test_data_tuple = tuple(map(tuple, df_test.values))
-                    results = run_granger_test_cached(test_data_tuple, maxlag)
+                    results = run_granger_test_cached(df_test, maxlag)
                     
                     # Trích xuất p-values
                     pvals = []
@@ -332,7 +333,7 @@ def render(ticker: str = None):
     # ======================================================
     # 🧠 VAR-BASED GRANGER TEST (Đa biến - Theo Paper)
     # ======================================================
-    else:
+    elif "VAR-based" in test_mode:
         st.markdown("### 🔧 Cấu hình kiểm định VAR-based (theo Paper)")
         
         col1, col2 = st.columns([2, 1])
@@ -366,6 +367,20 @@ def render(ticker: str = None):
                 options=[0.01, 0.05, 0.1],
                 value=0.05
             )
+            bootstrap_draws = st.number_input(
+                "Số lượt bootstrap (0 = tắt)",
+                min_value=0,
+                max_value=9999,
+                value=0,
+                step=500,
+                help="Thêm cột p-value (bootstrap) — đáng tin hơn p-value tiệm cận khi mẫu nhỏ (ART, AMD)"
+            )
+            bootstrap_method = st.radio(
+                "Phương pháp bootstrap",
+                list(BOOTSTRAP_METHODS),
+                horizontal=True,
+                disabled=bootstrap_draws == 0
+            )
 
         if len(cols_selected) < 2:
             st.warning("⚠️ Cần chọn ít nhất 2 biến để thực hiện kiểm định VAR-based.")
@@ -374,14 +389,17 @@ def render(ticker: str = None):
         if st.button("🚀 Chạy kiểm định VAR-based Granger", type="primary", use_container_width=True):
             with st.spinner("🧮 Đang chạy kiểm định VAR-based Granger..."):
                 try:
-                    @st.cache_data(show_spinner=False, ttl=7200)
-                    def run_var_granger_cached(df_data, cols, maxlag, test_indiv, sig_level):
+                    @st.cache_data(show_spinner=False, ttl=7200, hash_funcs=FINGERPRINT_HASH_FUNCS)
+                    def run_var_granger_cached(df_data, cols, maxlag, test_indiv, sig_level, draws, method):
                         return granger_test(
                             df=df_data,
                             columns_to_test=cols,
                             maxlags=maxlag,
                             test_individually=test_indiv,
-                            significance_level=sig_level
+                            significance_level=sig_level,
+                            bootstrap_draws=draws,
+                            bootstrap_method=method,
+                            bootstrap_seed=42
                         )
                     
                     # Gọi hàm granger_test từ models
@@ -390,7 +408,9 @@ def render(ticker: str = None):
                         cols_selected,
                         maxlag,
                         test_individually,
-                        significance_level
+                        significance_level,
+                        int(bootstrap_draws),
+                        bootstrap_method
                     )
                     
                     if results_df is None or results_df.empty:
@@ -404,7 +424,8 @@ def render(ticker: str = None):
                     styled_df = results_df.style.format({
                         "Coef (TB)": "{:.6f}",
                         "F-statistic": "{:.4f}",
-                        "p-value": "{:.4f}"
+                        "p-value": "{:.4f}",
+                        "p-value (bootstrap)": "{:.4f}"
                     }).applymap(
                         lambda x: 'background-color: #d1fae5' if x == "✅" else 'background-color: #fee2e2' if x == "❌" else '',
                         subset=['Có ý nghĩa'] if 'Có ý nghĩa' in results_df.columns else []
@@ -471,6 +492,86 @@ def render(ticker: str = None):
                     with st.expander("🔍 Chi tiết lỗi"):
                         st.code(str(e))
 
+    # ======================================================
+    # 📈 ROLLING GRANGER (p-value theo thời gian)
+    # ======================================================
+    else:
+        st.markdown("### 🔧 Cấu hình Granger theo cửa sổ trượt")
+
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            cols_selected = st.multiselect(
+                "**Chọn các biến để phân tích:**",
+                options=available_cols,
+                default=available_cols[:min(3, len(available_cols))],
+                key="rolling_granger_cols",
+                help="Kiểm định từng cặp biến trên mỗi cửa sổ (biến không dừng được lấy sai phân)"
+            )
+
+        with col2:
+            lag = st.slider("⏱ **Độ trễ (lag)**", min_value=1, max_value=14, value=5, key="rolling_granger_lag")
+
+        # Cửa sổ tối thiểu 60 quan sát; frame ngắn hơn → slider có min == max (Streamlit báo lỗi)
+        if len(df) < 60 + lag + 2:
+            st.warning(
+                f"⚠️ Dữ liệu chỉ có {len(df)} quan sát — cần ít nhất {60 + lag + 2} "
+                f"cho cửa sổ 60 quan sát với lag {lag}."
+            )
+            return
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            window = st.slider(
+                "🪟 Độ dài cửa sổ (quan sát)",
+                min_value=60,
+                max_value=max(60, min(500, len(df) - lag - 1)),
+                value=max(60, min(250, len(df) - lag - 1)),
+                step=10,
+            )
+        with col2:
+            step = st.slider("➡️ Bước trượt", min_value=1, max_value=30, value=5)
+        with col3:
+            expanding = st.checkbox(
+                "Cửa sổ mở rộng (expanding)",
+                value=False,
+                help="Giữ nguyên điểm đầu, cửa sổ chỉ dài thêm theo thời gian"
+            )
+
+        if len(cols_selected) < 2:
+            st.warning("⚠️ Cần chọn ít nhất 2 biến.")
+            return
+
+        if st.button("🚀 Chạy Granger theo cửa sổ trượt", type="primary", use_container_width=True):
+            try:
+                pvalues = rolling_granger_test(df, cols_selected, lag, window, step, expanding)
+            except Exception as e:
+                st.error(f"❌ Lỗi khi chạy Granger theo cửa sổ: {str(e)}")
+                return
+
+            directions = [c for c in pvalues.columns if c != "nobs"]
+            fig = go.Figure()
+            for direction in directions:
+                fig.add_trace(go.Scatter(x=pvalues.index, y=pvalues[direction], mode="lines", name=direction))
+            fig.add_hline(y=0.05, line_dash="dash", line_color="red", annotation_text="α = 0.05")
+            fig.update_layout(
+                title=f"p-value Granger theo {'cửa sổ mở rộng' if expanding else f'cửa sổ trượt {window} quan sát'}",
+                xaxis_title="Cuối cửa sổ",
+                yaxis_title="p-value",
+                yaxis_range=[0, 1],
+                height=450,
+                hovermode="x unified",
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+            share = (pvalues[directions] < 0.05).mean().sort_values(ascending=False)
+            summary = pd.DataFrame({
+                "Chiều nhân quả": share.index,
+                "Tỷ lệ cửa sổ có ý nghĩa (p < 0.05)": (share.values * 100).round(1),
+            })
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+            st.caption(f"{len(pvalues)} cửa sổ, VAR({lag}) từng cặp biến")
+
     # ======================================================
     # 📚 HƯỚNG DẪN & GHI CHÚ
     # ======================================================
@@ -26,6 +26,8 @@ import logging
 from email.utils import parsedate_to_datetime
 from typing import List, Dict, Optional, Tuple
 from functools import lru_cache
+from utils.keyword_sentiment import get_keyword_sentiment
+from models.sentiment_service import InferenceTimeout
 
 # Import PhoBERT sentiment analysis
 # Import moved to inside function to optimize load time
@@ -153,45 +155,78 @@ def format_display_date(date_value):
 # 🤖 AI SENTIMENT ANALYSIS
 # ======================================================
 
-@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
-def get_ai_sentiment(text: str) -> Tuple[str, float]:
+# Map PhoBERT labels to our labels
+PHOBERT_SENTIMENT_MAP = {
+    'POS': 'positive',
+    'NEG': 'negative',
+    'NEU': 'neutral',
+    'positive': 'positive',
+    'negative': 'negative',
+    'neutral': 'neutral'
+}
+
+
+def get_ai_sentiment_batch(texts: Tuple[str, ...]) -> List[Tuple[str, float]]:
     """
-    Phân tích sentiment sử dụng PhoBERT model
+    Phân tích sentiment cho nhiều văn bản trong MỘT lần gọi PhoBERT (batch)
+    
+    Model còn đang nạp nền (models.model_warmup) hoặc service PhoBERT quá tải
+    (InferenceTimeout) → dùng keyword-based tạm thời, không ghi vào cache để
+    lần render sau sẽ dùng PhoBERT.
     
     Args:
-        text: Văn bản cần phân tích
+        texts: Tuple các văn bản cần phân tích
         
     Returns:
-        Tuple[str, float]: (sentiment_label, confidence_score)
+        List[Tuple[str, float]]: (sentiment_label, confidence_score) theo thứ tự texts
     """
+    if not texts:
+        return []
+
+    from models.model_warmup import start_warmup
+    if not start_warmup().is_ready():
+        return get_keyword_based_sentiment_batch(texts)
+    try:
+        return _get_phobert_sentiment_batch(texts)
+    except InferenceTimeout as e:
+        logger.warning(f"{e}. Falling back to keyword-based.")
+        return get_keyword_based_sentiment_batch(texts)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def _get_phobert_sentiment_batch(texts: Tuple[str, ...]) -> List[Tuple[str, float]]:
+    """Phần chạy PhoBERT của get_ai_sentiment_batch (được cache theo texts)"""
     try:
         # Lazy import to avoid loading torch/transformers on app startup
-        from models.sentiment_phobert import analyze_sentiment
+        from models.sentiment_phobert import get_label_names, predict_proba
         
-        result = analyze_sentiment(text)
+        probs = predict_proba(list(texts))
+        labels = get_label_names()
         
-        if result and isinstance(result, dict):
-            # PhoBERT trả về dict với keys như 'NEG', 'NEU', 'POS'
-            # Tìm label có score cao nhất
-            label = max(result, key=result.get)
-            score = result[label]
-            
-            # Map PhoBERT labels to our labels
-            sentiment_map = {
-                'POS': 'positive',
-                'NEG': 'negative', 
-                'NEU': 'neutral',
-                'positive': 'positive',
-                'negative': 'negative',
-                'neutral': 'neutral'
-            }
-            
-            return sentiment_map.get(label, 'neutral'), float(score)
-        return 'neutral', 0.5
+        # Tìm label có score cao nhất cho từng văn bản
+        return [
+            (PHOBERT_SENTIMENT_MAP.get(labels[i], 'neutral'), float(row[i]))
+            for row, i in zip(probs, probs.argmax(axis=1))
+        ]
         
+    except InferenceTimeout:
+        raise  # get_ai_sentiment_batch xử lý, không cache kết quả dự phòng
     except Exception as e:
         logger.warning(f"AI sentiment analysis failed: {e}. Falling back to keyword-based.")
-        return get_keyword_based_sentiment(text)
+        return get_keyword_based_sentiment_batch(texts)
+
+
+def get_ai_sentiment(text: str) -> Tuple[str, float]:
+    """
+    Phân tích sentiment sử dụng PhoBERT model
+    
+    Args:
+        text: Văn bản cần phân tích
+        
+    Returns:
+        Tuple[str, float]: (sentiment_label, confidence_score)
+    """
+    return get_ai_sentiment_batch((text,))[0]
 
 
 def get_keyword_based_sentiment(text: str) -> Tuple[str, float]:
@@ -204,22 +239,20 @@ def get_keyword_based_sentiment(text: str) -> Tuple[str, float]:
     Returns:
         Tuple[str, float]: (sentiment_label, confidence_score)
     """
-    positive_keywords = ["tăng", "hồi phục", "lãi", "tang", "hoi phuc", "lai", "tích cực", "khởi sắc"]
-    negative_keywords = ["giảm", "bán tháo", "lỗ", "giam", "ban thao", "lo", "tiêu cực", "sụt giảm"]
-    
-    text_lower = text.lower()
-    pos_count = sum(1 for kw in positive_keywords if kw in text_lower)
-    neg_count = sum(1 for kw in negative_keywords if kw in text_lower)
-    
-    if pos_count > neg_count:
-        return 'positive', min(0.6 + (pos_count * 0.1), 0.9)
-    elif neg_count > pos_count:
-        return 'negative', min(0.6 + (neg_count * 0.1), 0.9)
-    else:
-        return 'neutral', 0.5
+    return get_keyword_sentiment().score(text)
+
 
+def get_keyword_based_sentiment_batch(texts) -> List[Tuple[str, float]]:
+    """Như get_keyword_based_sentiment cho cả danh sách văn bản (regex gộp, một lần gọi)"""
+    return get_keyword_sentiment().score_texts(texts)
 
-def get_news_sentiment_styles(title: str, content: str, use_ai: bool = True) -> Dict[str, str]:
+
+def get_news_sentiment_styles(
+    title: str,
+    content: str,
+    use_ai: bool = True,
+    precomputed: Optional[Tuple[str, float]] = None,
+) -> Dict[str, str]:
     """
     Xác định sentiment và style cho tin tức
     
@@ -227,6 +260,7 @@ def get_news_sentiment_styles(title: str, content: str, use_ai: bool = True) ->
         title: Tiêu đề tin tức
         content: Nội dung tin tức
         use_ai: Có sử dụng AI sentiment analysis không
+        precomputed: Kết quả (sentiment, confidence) đã tính sẵn theo batch (nếu có)
         
     Returns:
         Dict với border, background, label, sentiment, confidence
@@ -234,8 +268,10 @@ def get_news_sentiment_styles(title: str, content: str, use_ai: bool = True) ->
     # Phân tích sentiment dựa trên title
     text = title or content or ""
     
-    # Sử dụng AI hoặc keyword-based sentiment
-    if use_ai:
+    # Sử dụng kết quả batch, AI hoặc keyword-based sentiment
+    if precomputed is not None:
+        sentiment, confidence = precomputed
+    elif use_ai:
         sentiment, confidence = get_ai_sentiment(text)  # Phân tích toàn bộ title
     else:
         sentiment, confidence = get_keyword_based_sentiment(text)
@@ -889,12 +925,27 @@ def render(ticker: str = None):
         st.session_state.news_current_page = 1
         st.rerun()
     
+    # Chấm sentiment cả trang trong một batch PhoBERT
+    page_sentiments = [None] * len(page_news)
+    if use_ai_sentiment:
+        page_sentiments = get_ai_sentiment_batch(
+            tuple(item['title'] or item['content'] or "" for item in page_news)
+        )
+        from models.model_warmup import get_warmup
+        warmup = get_warmup().status()
+        if not warmup['ready']:
+            st.caption(
+                f"⏳ PhoBERT: {warmup['message']} ({int(warmup['progress'] * 100)}%) "
+                f"— tạm thời phân loại theo từ khóa"
+            )
+    
     # Hiển thị từng bài viết với sentiment analysis
-    for index, item in enumerate(page_news, start=start_idx + 1):
+    for index, (item, precomputed) in enumerate(zip(page_news, page_sentiments), start=start_idx + 1):
         sentiment_styles = get_news_sentiment_styles(
             item['title'], 
             item['content'],
-            use_ai=use_ai_sentiment
+            use_ai=use_ai_sentiment,
+            precomputed=precomputed
         )
         
         border_color = sentiment_styles['border']
@@ -62,8 +62,10 @@ def render(ticker: str = None):
         st.caption("🔹 Bật tùy chọn này để kiểm tra dữ liệu và chạy kiểm định thực tế.")
         return
 
-    # --- Tải dữ liệu ---
-    df = load_sentiment_data(ticker, data_type, time_period)
+    # --- Tải dữ liệu (chỉ đọc các cột cần cho kiểm định) ---
+    df = load_sentiment_data(
+        ticker, data_type, time_period, columns=["date", "label", "close", "adj close"]
+    )
     if df.empty:
         st.warning("⚠️ Không tìm thấy dữ liệu để kiểm định.")
         return
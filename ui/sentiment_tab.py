@@ -38,9 +38,15 @@ def render(ticker: str = None):
     if st.button("🔍 Phân tích cảm xúc"):
         if text_input.strip():
             try:
+                # Model đang nạp nền → chờ luồng warmup thay vì nạp lần nữa
+                from models.model_warmup import start_warmup
+                if not start_warmup().is_ready():
+                    with st.spinner("⏳ Đang nạp model PhoBERT (lần đầu)..."):
+                        start_warmup().wait()
+
                 # Lazy import để lấy cả scores chi tiết
                 from models.sentiment_phobert import analyze_sentiment, classify_sentiment
-                
+
                 with st.spinner("Đang phân tích với PhoBERT..."):
                     # Lấy scores chi tiết
                     scores_dict = analyze_sentiment(text_input)
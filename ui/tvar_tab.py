@@ -11,6 +11,7 @@ warnings.filterwarnings("ignore", message=".*torch.classes.*")
 warnings.filterwarnings("ignore", category=UserWarning)
 from utils.data_loader import load_sentiment_data
 from models.tvar_model import run_tvar
+from utils.fingerprint import FINGERPRINT_HASH_FUNCS
 
 
 # ============================================================
@@ -132,7 +133,10 @@ def render(ticker=None):
     # ============================================================
     # 📂 TẢI DỮ LIỆU
     # ============================================================
-    df = load_sentiment_data(ticker, time_period=time_period)
+    # Chỉ đọc các cột mô hình TVAR cần (đẩy xuống snapshot Parquet)
+    df = load_sentiment_data(
+        ticker, time_period=time_period, columns=["date", "close", "tích cực", "tiêu cực"]
+    )
     if df.empty:
         st.warning("⚠️ Không tìm thấy dữ liệu cho mã cổ phiếu này.")
         return
@@ -140,7 +144,7 @@ def render(ticker=None):
     # ============================================================
     # 🚀 CHẠY HOẶC TẢI LẠI MÔ HÌNH TVAR (với cache)
     # ============================================================
-    @st.cache_data(show_spinner=False, ttl=7200)
+    @st.cache_data(show_spinner=False, ttl=7200, hash_funcs=FINGERPRINT_HASH_FUNCS)
     def run_tvar_cached(df_data, ticker_name):
         return run_tvar(df_data, ticker_name)
     
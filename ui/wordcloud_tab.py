@@ -6,6 +6,8 @@ import matplotlib.pyplot as plt
 from collections import Counter
 import re
 
+from utils.data_loader import get_dataset_catalog
+
 # ======================================================
 # ☁️ WORD CLOUD TAB
 # ======================================================
@@ -29,12 +31,12 @@ VIETNAMESE_STOPWORDS = {
 def load_wordcloud_data(year: str) -> pd.DataFrame:
     """Load data for word cloud from Excel file"""
     try:
-        file_path = os.path.join(DATA_DIR, f"cleaned_data_vneconomy_{year}.xlsx")
-        if os.path.exists(file_path):
+        file_path = get_dataset_catalog().wordcloud_path(year)
+        if file_path and os.path.exists(file_path):
             df = pd.read_excel(file_path)
             return df
         else:
-            st.error(f"❌ File không tồn tại: {file_path}")
+            st.error(f"❌ File không tồn tại: {os.path.join(DATA_DIR, f'cleaned_data_vneconomy_{year}.xlsx')}")
             return pd.DataFrame()
     except Exception as e:
         st.error(f"❌ Lỗi khi đọc file: {e}")
@@ -42,14 +44,10 @@ def load_wordcloud_data(year: str) -> pd.DataFrame:
 
 
 def get_available_years():
-    """Get list of available years from data files"""
-    years = []
-    if os.path.exists(DATA_DIR):
-        for file in os.listdir(DATA_DIR):
-            if file.startswith("cleaned_data_vneconomy_") and file.endswith(".xlsx"):
-                year = file.replace("cleaned_data_vneconomy_", "").replace(".xlsx", "")
-                years.append(year)
-    return sorted(years)
+    """Get list of available years from the dataset catalog (không quét lại thư mục)"""
+    catalog = get_dataset_catalog()
+    catalog.maybe_refresh()
+    return catalog.wordcloud_years()
 
 
 def preprocess_text(text: str) -> str:
@@ -0,0 +1,184 @@
+"""
+Cache Stats - Thống kê hit/miss cho các hàm được cache bằng st.cache_data
+
+- `cached_data(component, **kwargs)` thay cho `@st.cache_data(**kwargs)`:
+  hàm gốc chỉ chạy khi cache miss → đếm được hit, miss và thời gian tính toán
+- Thời gian tiết kiệm = (thời gian tính trung bình khi miss - thời gian trả kết quả) mỗi lần hit
+- Eviction: một tham số đã từng tính nhưng bị tính lại (hết TTL / bị clear),
+  cộng với các entry bị disk cache loại bỏ
+- Đọc qua `config.cache_config.get_cache_stats()`; bật LOG_CACHE_HITS để log từng hit
+"""
+
+import functools
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+import streamlit as st
+
+from config.cache_config import LOG_CACHE_HITS
+
+logger = logging.getLogger(__name__)
+
+# Số khóa tối đa được nhớ mỗi component để phát hiện eviction
+MAX_TRACKED_KEYS = 4096
+
+
+def estimate_size(value) -> int:
+    """Ước lượng dung lượng (bytes) của kết quả được cache"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class CacheStats:
+    """Bộ đếm thống kê cache theo component (an toàn đa luồng)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Dict[str, Dict] = {}
+        self._keys: Dict[str, set] = {}
+
+    def _get(self, component: str) -> Dict:
+        if component not in self._components:
+            self._components[component] = {
+                "calls": 0,
+                "hits": 0,
+                "misses": 0,
+                "compute_seconds": 0.0,
+                "time_saved_seconds": 0.0,
+                "bytes_computed": 0,
+                "last_entry_bytes": 0,
+                "evictions": 0,
+                "disk_hits": 0,
+            }
+        return self._components[component]
+
+    def record_hit(self, component: str, elapsed: float):
+        with self._lock:
+            s = self._get(component)
+            s["calls"] += 1
+            s["hits"] += 1
+            if s["misses"]:
+                avg = s["compute_seconds"] / s["misses"]
+                s["time_saved_seconds"] += max(avg - elapsed, 0.0)
+
+    def record_miss(self, component: str, seconds: float, nbytes: int, key: Optional[str] = None):
+        with self._lock:
+            s = self._get(component)
+            s["calls"] += 1
+            s["misses"] += 1
+            s["compute_seconds"] += seconds
+            s["bytes_computed"] += nbytes
+            s["last_entry_bytes"] = nbytes
+
+            if key is not None:
+                keys = self._keys.setdefault(component, set())
+                if key in keys:
+                    # Đã từng tính với cùng tham số → entry cũ đã bị loại khỏi cache
+                    s["evictions"] += 1
+                elif len(keys) < MAX_TRACKED_KEYS:
+                    keys.add(key)
+
+    def record_disk_hit(self, component: str):
+        with self._lock:
+            self._get(component)["disk_hits"] += 1
+
+    def record_eviction(self, component: str, count: int = 1):
+        with self._lock:
+            self._get(component)["evictions"] += count
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Bản sao thống kê kèm hit_rate và thời gian tính trung bình"""
+        with self._lock:
+            result = {}
+            for component, s in self._components.items():
+                s = dict(s)
+                s["hit_rate"] = round(s["hits"] / s["calls"], 3) if s["calls"] else 0.0
+                s["avg_compute_seconds"] = round(s["compute_seconds"] / s["misses"], 4) if s["misses"] else 0.0
+                s["avg_entry_bytes"] = int(s["bytes_computed"] / s["misses"]) if s["misses"] else 0
+                s["compute_seconds"] = round(s["compute_seconds"], 4)
+                s["time_saved_seconds"] = round(s["time_saved_seconds"], 4)
+                result[component] = s
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._components.clear()
+            self._keys.clear()
+
+
+_stats = CacheStats()
+
+
+def get_stats() -> CacheStats:
+    """Bộ đếm dùng chung trong process"""
+    return _stats
+
+
+# ======================================================
+# 🎯 DECORATOR
+# ======================================================
+_call_frames = threading.local()
+
+
+def cached_data(component: str, **cache_kwargs) -> Callable:
+    """
+    Thay cho `@st.cache_data(**cache_kwargs)`, kèm thống kê hit/miss theo component.
+
+        @cached_data("price_data", show_spinner=False, ttl=7200)
+        def load_price_data(ticker): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        namespace = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            # Chỉ chạy khi st.cache_data miss
+            frames = getattr(_call_frames, "stack", None)
+            if frames:
+                frames[-1]["miss"] = True
+            start = time.perf_counter()
+            value = func(*args, **kwargs)
+            seconds = time.perf_counter() - start
+
+            try:
+                from utils.disk_cache import make_cache_key
+                key = make_cache_key(namespace, args, kwargs)
+            except Exception:
+                key = None
+            _stats.record_miss(component, seconds, estimate_size(value), key)
+            return value
+
+        cached = st.cache_data(**cache_kwargs)(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            frames = getattr(_call_frames, "stack", None)
+            if frames is None:
+                frames = _call_frames.stack = []
+            frames.append({"miss": False})
+            start = time.perf_counter()
+            try:
+                return cached(*args, **kwargs)
+            finally:
+                frame = frames.pop()
+                if not frame["miss"]:
+                    elapsed = time.perf_counter() - start
+                    _stats.record_hit(component, elapsed)
+                    if LOG_CACHE_HITS:
+                        logger.info(f"⚡ Cache hit [{component}] {func.__name__} ({elapsed * 1000:.1f} ms)")
+
+        wrapper.clear = cached.clear
+        return wrapper
+
+    return decorator
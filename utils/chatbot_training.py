@@ -12,6 +12,7 @@ import logging
 
 from utils.data_loader import load_price_data, load_sentiment_data, load_realtime_price_quote
 from utils.vndirect_api import get_vndirect_api
+from utils.cache_stats import cached_data
 
 logger = logging.getLogger(__name__)
 
@@ -302,7 +303,7 @@ class MarketContextProvider:
     """
     
     @staticmethod
-    @st.cache_data(ttl=60, show_spinner=False)
+    @cached_data("chatbot_market", ttl=60, show_spinner=False)
     def get_market_overview() -> str:
         """Lấy tổng quan thị trường"""
         try:
@@ -332,7 +333,7 @@ class MarketContextProvider:
             return ""
     
     @staticmethod
-    @st.cache_data(ttl=300, show_spinner=False)
+    @cached_data("chatbot_sector", ttl=300, show_spinner=False)
     def get_sector_performance(sector_tickers: List[str]) -> str:
         """Lấy hiệu suất ngành"""
         try:
@@ -364,7 +365,7 @@ class MarketContextProvider:
             return ""
     
     @staticmethod
-    @st.cache_data(ttl=300, show_spinner=False)
+    @cached_data("chatbot_training_signals", ttl=300, show_spinner=False)
     def get_trading_signals(ticker: str) -> str:
         """Lấy tín hiệu giao dịch"""
         try:
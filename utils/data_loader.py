@@ -1,12 +1,25 @@
 from datetime import datetime
 import os
+import numpy as np
 import pandas as pd
 import streamlit as st
 import logging
+import multiprocessing
 # import investpy # ĐÃ BỊ LOẠI BỎ
 # import yfinance as yf  # REMOVED - không sử dụng, tốn thời gian load
-from typing import Optional, Dict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional, Dict, List, Tuple
 from utils.vndirect_api import get_vndirect_api 
+from utils.snapshot_store import load_or_build, load_snapshot, snapshot_key
+from utils.fingerprint import derive_fingerprint, stamp_fingerprint
+from utils.normalization import normalize_numeric_columns
+from utils.dataset_catalog import DatasetCatalog, folder_name
+from utils.memory_profile import compact_frame
+from utils.price_store import PriceStore, get_price_store
+from utils.rate_limiter import acquire_source
+from utils.cache_stats import cached_data
+from config.cache_config import ENABLE_COMPACT_DTYPES, ENABLE_PRICE_PREFETCH
 
 # 🆕 VNSTOCK - Lazy loading để tránh lỗi circular import
 _vnstock_module = None
@@ -32,21 +45,13 @@ logger = logging.getLogger(__name__)
 # ======================================================
 # 🔧 HÀM ĐỌC FILE EXCEL AN TOÀN & CHUẨN HÓA DỮ LIỆU
 # ======================================================
-@st.cache_data(show_spinner=False)
-def _safe_load_excel(path: str) -> pd.DataFrame:
-    """Đọc file Excel an toàn, chuẩn hóa tên cột, kiểu dữ liệu và tránh lỗi Arrow."""
-    if not os.path.exists(path):
-        st.warning(f"⚠️ Không tìm thấy file: `{path}`")
-        logger.warning(f"File không tồn tại: {path}")
-        return pd.DataFrame()
-
-    try:
-        # Sử dụng engine "openpyxl" là tiêu chuẩn cho Streamlit
-        df = pd.read_excel(path, engine="openpyxl") 
-    except Exception as e:
-        st.error(f"❌ Lỗi đọc file `{path}`: {e}")
-        logger.error(f"Lỗi đọc file {path}: {e}")
-        return pd.DataFrame()
+def read_normalized_excel(path: str) -> pd.DataFrame:
+    """
+    Đọc file Excel và chuẩn hóa tên cột, kiểu dữ liệu (không phụ thuộc Streamlit).
+    Dùng chung cho `_safe_load_excel` và script `warm_snapshots.py`.
+    """
+    # Sử dụng engine "openpyxl" là tiêu chuẩn cho Streamlit
+    df = pd.read_excel(path, engine="openpyxl")
 
     # 🔹 Chuẩn hóa tên cột — chữ thường, loại bỏ khoảng trắng thừa
     df.columns = [str(c).strip().lower() for c in df.columns]
@@ -56,169 +61,268 @@ def _safe_load_excel(path: str) -> pd.DataFrame:
         df["date"] = pd.to_datetime(df["date"], errors="coerce")
         df = df.sort_values("date").dropna(subset=["date"])
 
-    # 🔹 Làm sạch dữ liệu số: thay ',' bằng '.', xóa '%', và ép kiểu an toàn
-    for col in df.columns:
-        if df[col].dtype == "object":
-            # Loại bỏ các ký tự không phải số và chuẩn hóa dấu thập phân
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.replace(",", "", regex=False) # Xóa dấu phẩy phân cách hàng nghìn
-                .str.replace(".", "", regex=False) # Sẽ thay thế lại nếu cần
-                .str.replace("%", "", regex=False)
-                .str.replace("₫", "", regex=False)
-                .str.replace("vnđ", "", regex=False)
-                .str.replace("$", "", regex=False)
-                .str.strip()
-            )
-            # Thử ép kiểu số
-            try:
-                # Ép kiểu an toàn, NaN nếu thất bại
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            except Exception:
-                pass
+    # 🔹 Làm sạch dữ liệu số: chỉ ép kiểu các cột có dạng số (lấy mẫu trước),
+    #    các cột văn bản được ép về string (fix lỗi Arrow / Streamlit caching)
+    df, report = normalize_numeric_columns(df)
+    df.attrs["normalization_report"] = report
+
+    return df
+
 
-    # 🔹 Ép các cột không phải số về string (fix lỗi Arrow / Streamlit caching)
-    for col in df.select_dtypes(include=["object"]).columns:
-        df[col] = df[col].astype(str)
+@cached_data("excel_file", show_spinner=False)
+def _safe_load_excel(
+    path: str, start=None, end=None, columns: Optional[Tuple[str, ...]] = None
+) -> pd.DataFrame:
+    """
+    Đọc file Excel an toàn, chuẩn hóa tên cột, kiểu dữ liệu và tránh lỗi Arrow.
+    Ưu tiên snapshot Parquet (data/.snapshots/) để bỏ qua bước parse Excel;
+    khoảng ngày `start`/`end` và danh sách `columns` được đẩy xuống snapshot.
+    """
+    if not os.path.exists(path):
+        st.warning(f"⚠️ Không tìm thấy file: `{path}`")
+        logger.warning(f"File không tồn tại: {path}")
+        return pd.DataFrame()
+
+    try:
+        df = load_or_build(path, read_normalized_excel, start=start, end=end, columns=columns)
+    except Exception as e:
+        st.error(f"❌ Lỗi đọc file `{path}`: {e}")
+        logger.error(f"Lỗi đọc file {path}: {e}")
+        return pd.DataFrame()
 
     # 🔹 Kiểm tra bắt buộc các cột cảm xúc (nếu có)
     required_cols = ["tích cực", "tiêu cực", "trung tính"]
+    if columns is not None:
+        required_cols = [c for c in required_cols if c in columns]
     missing = [c for c in required_cols if c not in df.columns]
     if missing:
         logger.warning(f"Thiếu các cột {missing} trong file {path}")
 
-    return df
+    # 🔹 Gắn fingerprint (định danh file + bộ lọc) để hàm mô hình không phải hash cả frame
+    return stamp_fingerprint(df, snapshot_key(path), f"excel:start={start},end={end},columns={columns}")
+
+
+# ======================================================
+# 📚 CATALOG DỮ LIỆU (data/)
+# ======================================================
+def _catalog_reader(path: str) -> pd.DataFrame:
+    """Đọc file qua snapshot để catalog lấy số dòng, khoảng ngày và schema."""
+    return load_or_build(path, read_normalized_excel)
+
+
+@st.cache_resource(show_spinner=False)
+def get_dataset_catalog() -> DatasetCatalog:
+    """Catalog dùng chung cho toàn app - quét data/ một lần, sau đó cập nhật tăng dần"""
+    catalog = DatasetCatalog("data", reader=_catalog_reader)
+    catalog.refresh()
+    return catalog
+
+
+# ======================================================
+# ⚡ HỢP NHẤT NHIỀU FILE SONG SONG (PROCESS POOL)
+# ======================================================
+# Số process tối đa khi parse nhiều file Excel cùng lúc (parse Excel tốn CPU → dùng process)
+MAX_LOAD_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _load_file_worker(
+    path: str, start=None, end=None, columns: Optional[Tuple[str, ...]] = None
+) -> Tuple[str, Optional[pd.DataFrame], Optional[str]]:
+    """Chạy trong process con: đọc 1 file (qua snapshot), trả về (path, df, lỗi)."""
+    try:
+        return path, load_or_build(path, read_normalized_excel, start=start, end=end, columns=columns), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def _concat_with_ticker(parts: List[Tuple[str, pd.DataFrame]]) -> pd.DataFrame:
+    """
+    Ghép các DataFrame trong MỘT lần `pd.concat` và gắn cột `ticker` dạng categorical
+    (sinh từ mã số + độ dài từng phần, không tạo chuỗi cho từng dòng).
+    """
+    tickers = sorted({t for t, _ in parts})
+    code_of = {t: i for i, t in enumerate(tickers)}
+    lengths = [len(df) for _, df in parts]
+
+    merged = pd.concat([df for _, df in parts], ignore_index=True, copy=False)
+    codes = np.repeat([code_of[t] for t, _ in parts], lengths).astype(np.int32)
+    merged["ticker"] = pd.Categorical.from_codes(codes, categories=tickers)
+    return merged
+
+
+def _load_merged_folder(
+    paths: List[str], start=None, end=None, columns: Optional[Tuple[str, ...]] = None
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Hợp nhất các file Excel của một thư mục (danh sách lấy từ catalog).
+
+    File đã có snapshot được đọc ngay; các file còn lại được parse song song
+    trên process pool.
+
+    Returns:
+        Tuple[pd.DataFrame, int]: (DataFrame hợp nhất, số file hợp lệ)
+    """
+    frames: Dict[str, pd.DataFrame] = {}
+    pending = []
+    for path in paths:
+        df = load_snapshot(path, start=start, end=end, columns=columns)
+        if df is not None:
+            frames[path] = df
+        else:
+            pending.append(path)
+
+    worker = partial(_load_file_worker, start=start, end=end, columns=columns)
+    if len(pending) > 1 and MAX_LOAD_WORKERS > 1:
+        # spawn: fork một server Streamlit đa luồng (prefetch, warmup, inference service,
+        # kết nối SQLite) có thể làm process con treo trên lock bị sao chép
+        with ProcessPoolExecutor(
+            max_workers=min(MAX_LOAD_WORKERS, len(pending)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            results = list(pool.map(worker, pending))
+    else:
+        results = [worker(path) for path in pending]
+
+    for path, df, error in results:
+        if error:
+            st.warning(f"⚠️ Lỗi đọc file `{path}`: {error}")
+            logger.error(f"Lỗi đọc file {path}: {error}")
+        else:
+            frames[path] = df
+
+    parts = [
+        (os.path.splitext(os.path.basename(path))[0].upper(), frames[path])
+        for path in paths
+        if path in frames and not frames[path].empty
+    ]
+    if not parts:
+        return pd.DataFrame(), 0
+
+    merged = _concat_with_ticker(parts)
+    stamp_fingerprint(
+        merged,
+        "+".join(snapshot_key(path) for path in paths if path in frames),
+        f"merge:start={start},end={end},columns={columns}",
+    )
+    return merged, len(parts)
+
+
+def _maybe_compact(df: pd.DataFrame, compact: Optional[bool], label: str) -> pd.DataFrame:
+    """Thu gọn dtype nếu bật (tham số `compact` hoặc cờ ENABLE_COMPACT_DTYPES)."""
+    if compact is None:
+        compact = ENABLE_COMPACT_DTYPES
+    if not compact or df.empty:
+        return df
+    return derive_fingerprint(compact_frame(df, label)[0], df, "compact")
 
 
 # ======================================================
 # 📰 TẢI DỮ LIỆU CẢM XÚC THEO CẤU HÌNH SIDEBAR
 # ======================================================
-@st.cache_data(show_spinner=False, ttl=7200)
+@cached_data("data_loader", show_spinner=False, ttl=7200)
 def load_sentiment_data(
-    ticker: Optional[str] = None, data_type: str = "Content", time_period: str = "Before Scandal"
+    ticker: Optional[str] = None,
+    data_type: str = "Content",
+    time_period: str = "Before Scandal",
+    start=None,
+    end=None,
+    columns: Optional[List[str]] = None,
+    compact: Optional[bool] = None,
 ) -> pd.DataFrame:
     """
     Tải dữ liệu cảm xúc dựa trên cấu hình được chọn trong sidebar.
-    (Giữ nguyên)
-    """
-    base_dir = "data"
-    type_map = {"Content": "vnecon", "Title": "vnecon_title"}
-    period_map = {"Before Scandal": "before_scandals", "After Scandal": "after_scandals"}
-
-    folder_name = f"{type_map.get(data_type, 'vnecon')}_{period_map.get(time_period, 'before_scandals')}"
-    data_dir = os.path.join(base_dir, folder_name)
 
-    if not os.path.exists(data_dir):
+    `start`/`end` (khoảng ngày) và `columns` (danh sách cột) được đẩy xuống
+    snapshot Parquet: chỉ đọc các row group và cột cần thiết.
+    `compact=True` thu gọn dtype (mặc định theo ENABLE_COMPACT_DTYPES).
+    """
+    columns = tuple(columns) if columns is not None else None
+    catalog = get_dataset_catalog()
+    catalog.maybe_refresh()
+    folder = folder_name("sentiment", data_type, time_period)
+    data_dir = catalog.folder("sentiment", data_type, time_period)
+
+    if data_dir is None:
+        data_dir = os.path.join("data", folder)
         st.error(f"❌ Thư mục dữ liệu không tồn tại: `{data_dir}`")
         return pd.DataFrame()
 
     # Nếu người dùng chọn mã cụ thể
     if ticker:
-        file_path = os.path.join(data_dir, f"{ticker.upper()}.xlsx")
-        if os.path.exists(file_path):
-            df = _safe_load_excel(file_path)
-            return df
+        entry = catalog.lookup("sentiment", ticker, data_type, time_period)
+        if entry:
+            df = _safe_load_excel(entry["path"], start, end, columns)
+            return _maybe_compact(df, compact, f"{folder}/{ticker.upper()}")
         else:
-            st.warning(f"⚠️ Không tìm thấy file `{ticker}.xlsx` trong `{folder_name}/`.")
+            st.warning(f"⚠️ Không tìm thấy file `{ticker}.xlsx` trong `{folder}/`.")
             return pd.DataFrame()
 
-    # Nếu không có ticker -> hợp nhất toàn bộ file trong thư mục
-    dfs = []
-    for file in os.listdir(data_dir):
-        if file.endswith((".xlsx", ".xls")) and not file.startswith("~$"):
-            df = _safe_load_excel(os.path.join(data_dir, file))
-            if not df.empty:
-                df["ticker"] = file.replace(".xlsx", "").replace(".xls", "").upper()
-                dfs.append(df)
-
-    if not dfs:
-        st.error(f"❌ Không tìm thấy file Excel nào trong `{folder_name}/`.")
+    # Nếu không có ticker -> hợp nhất toàn bộ file trong thư mục (song song)
+    df, n_files = _load_merged_folder(
+        [e["path"] for e in catalog.entries("sentiment", data_type, time_period)],
+        start, end, columns,
+    )
+
+    if not n_files:
+        st.error(f"❌ Không tìm thấy file Excel nào trong `{folder}/`.")
         return pd.DataFrame()
 
-    st.info(f"📘 Đã hợp nhất dữ liệu trong `{folder_name}/` ({len(dfs)} file).")
-    return pd.concat(dfs, ignore_index=True)
+    st.info(f"📘 Đã hợp nhất dữ liệu trong `{folder}/` ({n_files} file).")
+    return _maybe_compact(df, compact, f"{folder}/*")
 
 
 # ======================================================
 # 💹 TẢI DỮ LIỆU GIÁ CỔ PHIẾU LỊCH SỬ (VNSTOCK)
 # ======================================================
-@st.cache_data(show_spinner=False, ttl=7200)
-def load_price_data(ticker: str) -> pd.DataFrame:
-    """
-    Lấy dữ liệu giá cổ phiếu lịch sử qua Vnstock API.
-    Ưu tiên tải từ cache CSV trước.
-    """
+PRICE_HISTORY_START = "2018-01-01"
+PRICE_SOURCES = ['VCI', 'TCBS']  # Thử nhiều nguồn
+PRICE_MAX_RETRIES = 2
+PRICE_RATE_LIMIT_TIMEOUT = 30  # Giây tối đa chờ lượt gọi API của một nguồn
+
+# 🔹 Danh sách mã đã bị delisted (Ngày hủy niêm yết chính thức DD/MM/YYYY)
+DELISTED_INFO = {
+    'FLC': '05/09/2023',
+    'GAB': '01/03/2024',
+    'HAI': '01/08/2023',
+}
+
+
+def _delisting_date(ticker: str) -> Optional[datetime]:
+    value = DELISTED_INFO.get(ticker.upper())
+    return datetime.strptime(value, "%d/%m/%Y") if value else None
+
+
+def _fetch_vnstock_history(ticker: str, start: str, end: str) -> Optional[pd.DataFrame]:
+    """Tải lịch sử giá [start, end] từ Vnstock với retry qua nhiều nguồn (None nếu thất bại)"""
     Vnstock = _get_vnstock()
     if Vnstock is None:
-        return pd.DataFrame()
-        
-    ticker = ticker.upper()
-    path = f"data/prices/{ticker}_vnstock.csv" # Đổi tên cache để tránh xung đột
-    
-    # Ngày bắt đầu và kết thúc (YYYY-MM-DD) - vnstock dùng định dạng này
-    start_date_str = "2018-01-01"
-    end_date_str = datetime.now().strftime("%Y-%m-%d")
-    
-    # 🔹 Danh sách mã đã bị delisted (Ngày hủy niêm yết chính thức DD/MM/YYYY)
-    delisted_info = {
-        'FLC': '05/09/2023', 
-        'GAB': '01/03/2024',
-        'HAI': '01/08/2023',
-    }
-    ticker_upper = ticker.upper()
-
-    # 1. Tải từ cache local
-    if os.path.exists(path):
-        try:
-            df = pd.read_csv(path, index_col='date', parse_dates=True)
-            # Kiểm tra xem cache có cần cập nhật không
-            if df.index.max().date() == datetime.now().date():
-                return df
-            # Nếu không, tiếp tục tải mới
-            os.remove(path)
-        except Exception:
-            os.remove(path)
-
-    # 2. Tải từ Vnstock với retry logic
-    df = None
-    max_retries = 2
-    sources = ['VCI', 'TCBS']  # Thử nhiều nguồn
-    
-    for attempt in range(max_retries):
-        for source in sources:
+        return None
+
+    for attempt in range(PRICE_MAX_RETRIES):
+        for source in PRICE_SOURCES:
+            if not acquire_source(source, timeout=PRICE_RATE_LIMIT_TIMEOUT):
+                logger.warning(f"Lần thử {attempt + 1}: Hết thời gian chờ rate limit của {source}")
+                continue
             try:
                 stock = Vnstock().stock(symbol=ticker, source=source)
-                df = stock.quote.history(start=start_date_str, end=end_date_str)
-
+                df = stock.quote.history(start=start, end=end)
                 if df is not None and not df.empty:
-                    # Nếu có dữ liệu, thoát khỏi vòng lặp
-                    break
+                    return df
             except Exception as e:
                 logger.warning(f"Lần thử {attempt + 1}: Lỗi tải từ {source}: {str(e)[:100]}")
                 continue
-        
-        if df is not None and not df.empty:
-            break  # Đã có dữ liệu, thoát vòng ngoài
-    
-    if df is None or df.empty:
-        st.warning(f"⚠️ Không tìm thấy dữ liệu cho {ticker} trên Vnstock sau {max_retries} lần thử với {len(sources)} nguồn.")
-        return pd.DataFrame()
+    return None
 
+
+def _clean_price_frame(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """Chuẩn hóa dữ liệu Vnstock → index date, cột open/high/low/close/adj_close/volume"""
     # 🔹 Chuẩn hóa tên cột
-    df.rename(columns={
-        "time": "date", # Cột time thành date
-        "open": "open",
-        "high": "high",
-        "low": "low",
-        "close": "close",
-        "volume": "volume"
-    }, inplace=True)
-    
+    df = df.rename(columns={"time": "date"})
+
     # Thêm Adj Close (tạm thời bằng Close nếu không có sẵn)
     if 'adj_close' not in df.columns:
         df['adj_close'] = df['close']
-        
+
     # Chọn các cột cần thiết và đảm bảo thứ tự
     required_cols = ['date', 'open', 'high', 'low', 'close', 'adj_close', 'volume']
     df = df[[col for col in required_cols if col in df.columns]].copy()
@@ -226,45 +330,132 @@ def load_price_data(ticker: str) -> pd.DataFrame:
     # Đảm bảo cột date là datetime
     df['date'] = pd.to_datetime(df['date'])
     df = df.sort_values('date').reset_index(drop=True)
-    
+
     # 🔹 SET DATE LÀM INDEX (Quan trọng cho biểu đồ)
     df = df.set_index('date')
-    
+
     # 🔹 LÀM SẠCH DỮ LIỆU MẠNH MẼ: Loại bỏ giá = 0 hoặc flatline sau delisting
     df = df[df['close'] > 0].copy()
     df = df.dropna(subset=['close', 'open', 'high', 'low'])
-    
+
     # 🔹 LỌC MÃ BỊ DELISTED: Chỉ giữ dữ liệu đến ngày delisting
-    if ticker_upper in delisted_info:
-        delisting_date_str = delisted_info[ticker_upper]
-        # Chuyển đổi DD/MM/YYYY sang datetime
-        delisting_date = datetime.strptime(delisting_date_str, "%d/%m/%Y")
-        
-        # Chỉ giữ lại các hàng có ngày <= ngày delisting (sử dụng index)
+    delisting_date = _delisting_date(ticker)
+    if delisting_date is not None:
         df = df[df.index <= delisting_date].copy()
         logger.info(f"Lọc dữ liệu {ticker} đến ngày delisting: {delisting_date.date()}")
-        
-    # 🔹 KIỂM TRA TÍNH CHÍNH XÁC (Abnormal changes)
-    if len(df) > 0:
-        # Giá được trả về từ Vnstock thường đã được nhân 1000/10000 tùy nguồn, 
-        # nhưng phần trăm thay đổi vẫn chính xác.
-        price_change = df['close'].pct_change().abs()
-        abnormal_days = price_change[price_change > 0.5]
-        if len(abnormal_days) > 0:
-            logger.warning(f"{ticker}: Phát hiện {len(abnormal_days)} ngày có biến động giá >50%")
-    
-    # Lưu vào cache local (giữ lại index date)
-    os.makedirs("data/prices", exist_ok=True)
-    df.to_csv(path, index=True)
-    
-    logger.info(f"✅ Đã tải {len(df)} ngày dữ liệu cho {ticker} từ Vnstock")
     return df
 
 
+def price_is_fresh(ticker: str, store: Optional[PriceStore] = None) -> bool:
+    """Kho giá của mã đã cập nhật trong hôm nay (hoặc đã đóng băng) → không cần gọi API"""
+    store = store or get_price_store()
+    meta = store.meta(ticker)
+    if meta.get("frozen"):
+        return True
+    return bool(meta.get("last_date")) and meta.get("checked_on") == datetime.now().strftime("%Y-%m-%d")
+
+
+def update_price_store(ticker: str, store: Optional[PriceStore] = None) -> pd.DataFrame:
+    """
+    Cập nhật kho giá của một mã rồi trả về toàn bộ lịch sử (không phụ thuộc Streamlit UI).
+
+    - Lần đầu: chuyển cache CSV cũ (nếu có) hoặc tải toàn bộ từ PRICE_HISTORY_START
+    - Các lần sau: chỉ tải phần đuôi từ ngày cuối đã lưu (gồm cả ngày đó, để thay
+      nến của phiên chưa đóng cửa) và ghi thêm vào kho
+    - Mã đã hủy niêm yết: đóng băng vĩnh viễn sau khi đã có dữ liệu
+    - Tải thất bại: trả về dữ liệu đã lưu (có thể cũ) thay vì DataFrame rỗng
+    """
+    ticker = ticker.upper()
+    store = store or get_price_store()
+
+    legacy_csv = os.path.join(store.root, f"{ticker}_vnstock.csv")
+    if store.last_date(ticker) is None and os.path.exists(legacy_csv):
+        store.import_legacy_csv(ticker, legacy_csv)
+
+    if store.is_frozen(ticker):
+        return store.read(ticker)
+
+    # Đã kiểm tra trong ngày hôm nay → không gọi lại API
+    if price_is_fresh(ticker, store):
+        return store.read(ticker)
+
+    today = datetime.now()
+    today_str = today.strftime("%Y-%m-%d")
+    last_date = store.last_date(ticker)
+
+    start_str = last_date.strftime("%Y-%m-%d") if last_date is not None else PRICE_HISTORY_START
+    delisting_date = _delisting_date(ticker)
+
+    raw = _fetch_vnstock_history(ticker, start_str, today_str)
+    if raw is not None:
+        delta = _clean_price_frame(raw, ticker)
+        store.append(ticker, delta)
+        store.update_meta(ticker, checked_on=today_str)
+        logger.info(f"✅ Đã tải {len(delta)} ngày dữ liệu mới cho {ticker} từ Vnstock (từ {start_str})")
+    elif last_date is not None:
+        logger.warning(f"{ticker}: Không tải được dữ liệu mới, dùng dữ liệu đã lưu đến {last_date.date()}")
+
+    # 🔹 Mã đã hủy niêm yết: không bao giờ tải lại nữa
+    if delisting_date is not None and today > delisting_date and store.last_date(ticker) is not None:
+        store.freeze(ticker, f"Hủy niêm yết {DELISTED_INFO[ticker]}")
+
+    return store.read(ticker)
+
+
+def price_store_version(ticker: str, store: Optional[PriceStore] = None) -> str:
+    """Phiên bản dữ liệu giá của mã trong kho (ngày cuối) — đổi khi kho có thêm dữ liệu"""
+    return str((store or get_price_store()).meta(ticker.upper()).get("last_date"))
+
+
+def load_price_data(ticker: str) -> pd.DataFrame:
+    """
+    Lấy dữ liệu giá cổ phiếu lịch sử qua Vnstock API.
+    Ưu tiên đọc từ kho giá Parquet (data/prices/{TICKER}/), chỉ tải phần còn thiếu.
+    Nếu kho đã có dữ liệu (dù cũ), trả về ngay và để prefetcher cập nhật ở nền —
+    chỉ chặn chờ mạng khi mã chưa từng được tải.
+
+    Khóa cache gồm phiên bản kho của mã → prefetcher cập nhật mã nào thì chỉ entry
+    của mã đó hết hiệu lực (không xóa cache giá của mọi mã).
+    """
+    ticker = ticker.upper()
+    return _load_price_data(ticker, price_store_version(ticker))
+
+
+@cached_data("price_data", show_spinner=False, ttl=7200)
+def _load_price_data(ticker: str, store_version: str) -> pd.DataFrame:
+    """Phần có cache của load_price_data (`store_version` chỉ dùng làm khóa)"""
+    store = get_price_store()
+
+    if ENABLE_PRICE_PREFETCH and store.last_date(ticker) is not None and not price_is_fresh(ticker, store):
+        from utils.price_prefetcher import get_price_prefetcher
+        get_price_prefetcher().prefetch([ticker])
+        df = store.read(ticker)
+    else:
+        df = update_price_store(ticker, store)
+
+    if df.empty:
+        st.warning(
+            f"⚠️ Không tìm thấy dữ liệu cho {ticker} trên Vnstock sau {PRICE_MAX_RETRIES} lần thử "
+            f"với {len(PRICE_SOURCES)} nguồn."
+        )
+        return pd.DataFrame()
+
+    # 🔹 KIỂM TRA TÍNH CHÍNH XÁC (Abnormal changes)
+    # Giá được trả về từ Vnstock thường đã được nhân 1000/10000 tùy nguồn,
+    # nhưng phần trăm thay đổi vẫn chính xác.
+    price_change = df['close'].pct_change().abs()
+    abnormal_days = price_change[price_change > 0.5]
+    if len(abnormal_days) > 0:
+        logger.warning(f"{ticker}: Phát hiện {len(abnormal_days)} ngày có biến động giá >50%")
+
+    meta = store.meta(ticker)
+    return stamp_fingerprint(df, f"prices:{ticker}:{meta.get('last_date')}:{meta.get('checked_on')}")
+
+
 # ======================================================
 # 💹 TẢI DỮ LIỆU GIÁ REAL-TIME (CÂU CHẤP)
 # ======================================================
-@st.cache_data(ttl=5, show_spinner=False) # Cache 5 giây để cập nhật
+@cached_data("realtime_price", ttl=5, show_spinner=False) # Cache 5 giây để cập nhật
 def load_realtime_price_quote(ticker: str) -> Optional[Dict]:
     """
     Lấy dữ liệu giá real-time (last trade quote) từ VNDirect API.
@@ -286,52 +477,57 @@ def load_realtime_price_quote(ticker: str) -> Optional[Dict]:
 # ======================================================
 # 🔁 TẢI DỮ LIỆU KIỂM ĐỊNH GRANGER/TVAR THEO CẤU HÌNH SIDEBAR
 # ======================================================
-@st.cache_data(show_spinner=False, ttl=7200)
+@cached_data("data_loader", show_spinner=False, ttl=7200)
 def load_granger_data(
-    ticker: Optional[str] = None, data_type: str = "Content", time_period: str = "Before Scandal"
+    ticker: Optional[str] = None,
+    data_type: str = "Content",
+    time_period: str = "Before Scandal",
+    start=None,
+    end=None,
+    columns: Optional[List[str]] = None,
+    compact: Optional[bool] = None,
 ) -> pd.DataFrame:
     """
     Tải dữ liệu đã chuẩn hóa (thường là Log Return Price và Sentiment Score)
     cho các mô hình Kinh tế lượng (Granger, TVAR).
-    (Giữ nguyên)
-    """
-    base_dir = "data"
-    # Các thư mục này chứa dữ liệu đã được xử lý cho mô hình kinh tế lượng
-    type_map = {"Content": "data", "Title": "data_title"} 
-    period_map = {"Before Scandal": "before_scandals", "After Scandal": "after_scandals"}
 
-    folder_name = f"{type_map.get(data_type, 'data')}_{period_map.get(time_period, 'before_scandals')}"
-    data_dir = os.path.join(base_dir, folder_name)
-
-    if not os.path.exists(data_dir):
+    `start`/`end` (khoảng ngày) và `columns` (danh sách cột) được đẩy xuống
+    snapshot Parquet: chỉ đọc các row group và cột cần thiết.
+    `compact=True` thu gọn dtype (mặc định theo ENABLE_COMPACT_DTYPES).
+    """
+    columns = tuple(columns) if columns is not None else None
+    catalog = get_dataset_catalog()
+    catalog.maybe_refresh()
+    folder = folder_name("granger", data_type, time_period)
+    data_dir = catalog.folder("granger", data_type, time_period)
+
+    if data_dir is None:
+        data_dir = os.path.join("data", folder)
         st.error(f"❌ Thư mục dữ liệu không tồn tại: `{data_dir}`")
         logger.error(f"Không tìm thấy thư mục: {data_dir}")
         return pd.DataFrame()
 
     # Nếu người dùng chọn mã cổ phiếu cụ thể
     if ticker:
-        file_path = os.path.join(data_dir, f"{ticker.upper()}.xlsx")
-        if os.path.exists(file_path):
-            df = _safe_load_excel(file_path)
-            return df
+        entry = catalog.lookup("granger", ticker, data_type, time_period)
+        if entry:
+            df = _safe_load_excel(entry["path"], start, end, columns)
+            return _maybe_compact(df, compact, f"{folder}/{ticker.upper()}")
         else:
-            st.warning(f"⚠️ Không tìm thấy file `{ticker}.xlsx` trong `{folder_name}/`.")
-            logger.warning(f"Thiếu file: {file_path}")
+            st.warning(f"⚠️ Không tìm thấy file `{ticker}.xlsx` trong `{folder}/`.")
+            logger.warning(f"Thiếu file: {os.path.join(data_dir, ticker.upper() + '.xlsx')}")
             return pd.DataFrame()
 
-    # Nếu không có ticker → hợp nhất toàn bộ file trong thư mục
-    dfs = []
-    for file in os.listdir(data_dir):
-        if file.endswith((".xlsx", ".xls")) and not file.startswith("~$"):
-            df = _safe_load_excel(os.path.join(data_dir, file))
-            if not df.empty:
-                df["ticker"] = file.replace(".xlsx", "").replace(".xls", "").upper()
-                dfs.append(df)
-
-    if not dfs:
-        st.error(f"❌ Không tìm thấy file Excel nào trong `{folder_name}/`.")
+    # Nếu không có ticker → hợp nhất toàn bộ file trong thư mục (song song)
+    df, n_files = _load_merged_folder(
+        [e["path"] for e in catalog.entries("granger", data_type, time_period)],
+        start, end, columns,
+    )
+
+    if not n_files:
+        st.error(f"❌ Không tìm thấy file Excel nào trong `{folder}/`.")
         logger.error(f"Không có file Excel trong thư mục {data_dir}")
         return pd.DataFrame()
 
-    st.info(f"📊 Đã hợp nhất dữ liệu Granger trong `{folder_name}/` ({len(dfs)} file).")
-    return pd.concat(dfs, ignore_index=True)
\ No newline at end of file
+    st.info(f"📊 Đã hợp nhất dữ liệu Granger trong `{folder}/` ({n_files} file).")
+    return _maybe_compact(df, compact, f"{folder}/*")
\ No newline at end of file
@@ -0,0 +1,383 @@
+"""
+Dataset Catalog - Chỉ mục (index) in-memory cho toàn bộ cây thư mục data/
+
+- Quét data/ MỘT lần, ánh xạ (nguồn, ticker, data_type, period) → file
+- refresh() chỉ dùng stat (đường dẫn, mtime, size) → khởi động không phải đọc file nào
+- Số dòng, khoảng ngày, schema cột và checksum điền sau trong luồng nền (thống kê ưu tiên
+  đọc footer Parquet của snapshot, không parse Excel); bỏ qua corpus Word Cloud
+- Ghi manifest nhỏ (data/.catalog.json); lần sau chỉ mô tả lại file đã thay đổi
+- Tra cứu O(1), sidebar hiển thị dữ liệu sẵn có mà không cần chạm đĩa
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.snapshot_store import snapshot_metadata
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = os.path.join("data", ".catalog.json")
+MANIFEST_VERSION = 1
+
+# Khoảng thời gian tối thiểu (giây) giữa hai lần quét lại thư mục
+CATALOG_REFRESH_INTERVAL = 60
+
+# Tiền tố thư mục → (nguồn dữ liệu, data_type trên sidebar)
+FOLDER_SOURCES = {
+    "vnecon": ("sentiment", "Content"),
+    "vnecon_title": ("sentiment", "Title"),
+    "data": ("granger", "Content"),
+    "data_title": ("granger", "Title"),
+}
+
+# Hậu tố thư mục → giai đoạn trên sidebar
+PERIOD_SUFFIXES = {
+    "before_scandals": "Before Scandal",
+    "after_scandals": "After Scandal",
+}
+
+# Dữ liệu Word Cloud: data/data_world_cloud/cleaned_data_vneconomy_{year}.xlsx
+WORDCLOUD_FOLDER = "data_world_cloud"
+WORDCLOUD_PREFIX = "cleaned_data_vneconomy_"
+
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+
+CatalogKey = Tuple[str, Optional[str], Optional[str], Optional[str]]
+
+
+# ======================================================
+# 🔧 HÀM PHỤ TRỢ
+# ======================================================
+def folder_name(source: str, data_type: str, time_period: str) -> str:
+    """Tên thư mục ứng với cấu hình sidebar (giữ quy ước mặc định của data_loader)."""
+    prefixes = {v: k for k, v in FOLDER_SOURCES.items()}
+    default_prefix = "vnecon" if source == "sentiment" else "data"
+    prefix = prefixes.get((source, data_type), default_prefix)
+    periods = {v: k for k, v in PERIOD_SUFFIXES.items()}
+    return f"{prefix}_{periods.get(time_period, 'before_scandals')}"
+
+
+def _parse_folder(name: str) -> Optional[Tuple[str, str, str]]:
+    """'data_title_after_scandals' → ('granger', 'Title', 'After Scandal')."""
+    for suffix, period in PERIOD_SUFFIXES.items():
+        if name.endswith(f"_{suffix}"):
+            source = FOLDER_SOURCES.get(name[: -len(suffix) - 1])
+            if source:
+                return source[0], source[1], period
+    return None
+
+
+def file_checksum(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-1 của nội dung file (đọc theo từng khối 1 MB)."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_key(entry: Dict) -> CatalogKey:
+    return entry["source"], entry["ticker"], entry["data_type"], entry["period"]
+
+
+# ======================================================
+# 📚 DATASET CATALOG
+# ======================================================
+class DatasetCatalog:
+    """Chỉ mục các file dữ liệu trong data/ với metadata và manifest trên đĩa"""
+
+    def __init__(
+        self,
+        base_dir: str = "data",
+        manifest_path: Optional[str] = MANIFEST_PATH,
+        reader: Optional[Callable[[str], pd.DataFrame]] = None,
+    ):
+        """
+        Args:
+            base_dir: Thư mục dữ liệu gốc
+            manifest_path: File manifest JSON (None = không lưu ra đĩa)
+            reader: Hàm đọc file → DataFrame đã chuẩn hóa, dùng (trong luồng nền) để tính
+                số dòng, khoảng ngày và schema khi chưa có snapshot (None = chỉ dùng snapshot
+                có sẵn, không tự mô tả sau refresh)
+        """
+        self.base_dir = base_dir
+        self.manifest_path = manifest_path
+        self.reader = reader
+        self._entries: Dict[str, Dict] = {}        # path → entry
+        self._index: Dict[CatalogKey, Dict] = {}   # (source, ticker, type, period) → entry
+        self._folders: Dict[Tuple[str, str, str], str] = {}  # (source, type, period) → dir
+        self._lock = threading.Lock()
+        self._describe_thread: Optional[threading.Thread] = None
+        self._last_refresh = 0.0
+        self._load_manifest()
+
+    # ------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------
+    def _load_manifest(self):
+        """Nạp manifest đã lưu (nếu có) để tránh đọc lại các file không đổi"""
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != MANIFEST_VERSION:
+                return
+            self._entries = {e["path"]: e for e in manifest.get("entries", [])}
+            self._rebuild_index()
+        except Exception as e:
+            logger.warning(f"Không thể đọc manifest {self.manifest_path}: {e}")
+
+    def _save_manifest(self):
+        """Ghi manifest (ghi file tạm rồi os.replace để an toàn giữa các worker)"""
+        if not self.manifest_path:
+            return
+        tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": MANIFEST_VERSION, "entries": sorted(self._entries.values(), key=lambda e: e["path"])},
+                    f, ensure_ascii=False, indent=1,
+                )
+            os.replace(tmp, self.manifest_path)
+        except Exception as e:
+            logger.warning(f"Không thể ghi manifest {self.manifest_path}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _rebuild_index(self):
+        self._index, self._folders = self._build_index(self._entries, {})
+
+    @staticmethod
+    def _build_index(entries: Dict[str, Dict], folders: Dict) -> Tuple[Dict, Dict]:
+        """(index, folders) dựng từ `entries`; `folders` = các thư mục đã quét (kể cả rỗng)"""
+        index = {_entry_key(e): e for e in entries.values()}
+        folders = dict(folders)
+        for e in entries.values():
+            if e["source"] != "wordcloud":
+                folders.setdefault((e["source"], e["data_type"], e["period"]), os.path.dirname(e["path"]))
+        return index, folders
+
+    # ------------------------------------------------------
+    # Quét thư mục
+    # ------------------------------------------------------
+    def _scan_files(self) -> Tuple[Dict[str, Tuple], Dict[Tuple[str, str, str], str]]:
+        """
+        Liệt kê file dữ liệu → (source, ticker, data_type, period), không đọc nội dung.
+        Trả thêm các thư mục đã quét (kể cả rỗng, để phân biệt "thiếu thư mục" và "thiếu file").
+        """
+        found, folders = {}, {}
+        if not os.path.isdir(self.base_dir):
+            return found, folders
+
+        for folder in sorted(os.listdir(self.base_dir)):
+            folder_path = os.path.join(self.base_dir, folder)
+            if not os.path.isdir(folder_path):
+                continue
+
+            parsed = _parse_folder(folder)
+            if parsed is None and folder != WORDCLOUD_FOLDER:
+                continue
+
+            if parsed:
+                folders[parsed] = folder_path
+
+            for file in os.listdir(folder_path):
+                if not file.endswith(EXCEL_EXTENSIONS) or file.startswith("~$"):
+                    continue
+                stem = os.path.splitext(file)[0]
+                path = os.path.join(folder_path, file)
+
+                if parsed:
+                    source, data_type, period = parsed
+                    found[path] = (source, stem.upper(), data_type, period)
+                elif stem.startswith(WORDCLOUD_PREFIX):
+                    found[path] = ("wordcloud", None, None, stem[len(WORDCLOUD_PREFIX):])
+        return found, folders
+
+    @staticmethod
+    def _stat_entry(path: str, key: Tuple, stat: os.stat_result) -> Dict:
+        """Entry chỉ từ stat (số dòng, khoảng ngày, schema, checksum điền sau bởi describe_pending)"""
+        source, ticker, data_type, period = key
+        return {
+            "path": path,
+            "source": source,
+            "ticker": ticker,
+            "data_type": data_type,
+            "period": period,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "rows": None,
+            "date_min": None,
+            "date_max": None,
+            "columns": None,
+            "checksum": None,
+        }
+
+    def refresh(self, describe_in_background: bool = True) -> int:
+        """
+        Quét lại data/ CHỈ bằng stat (đường dẫn, mtime, size) — không đọc nội dung file.
+
+        Index mới được dựng trong biến cục bộ rồi thay một lần → các session đang tra cứu
+        không bao giờ thấy index dở dang. Thống kê nội dung được tính sau, trong luồng nền
+        (describe_in_background=False → không khởi động luồng, phía gọi tự gọi describe_pending).
+
+        Returns:
+            int: Số entry được thêm, cập nhật hoặc xóa
+        """
+        with self._lock:
+            found, folders = self._scan_files()
+            entries: Dict[str, Dict] = {}
+            changed = len(set(self._entries) - set(found))
+
+            for path, key in found.items():
+                old = self._entries.get(path)
+                stat = os.stat(path)
+                if old is not None and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+                    entries[path] = old
+                    continue
+                entries[path] = self._stat_entry(path, key, stat)
+                changed += 1
+
+            index, folders = self._build_index(entries, folders)
+            self._entries, self._index, self._folders = entries, index, folders
+            self._last_refresh = time.monotonic()
+
+            if changed:
+                logger.info(f"📚 Catalog cập nhật {changed} file trong {self.base_dir}/")
+                self._save_manifest()
+
+        if describe_in_background and self.reader is not None and self._pending():
+            self._start_describe()
+        return changed
+
+    # ------------------------------------------------------
+    # Thống kê nội dung (lazy, luồng nền)
+    # ------------------------------------------------------
+    def _pending(self) -> List[str]:
+        """File chưa có thống kê hoặc checksum (bỏ qua corpus Word Cloud — file lớn, không cần cho sidebar)"""
+        return [
+            p for p, e in self._entries.items()
+            if e["source"] != "wordcloud" and (e["rows"] is None or e.get("checksum") is None)
+        ]
+
+    def _start_describe(self):
+        with self._lock:
+            if self._describe_thread is not None and self._describe_thread.is_alive():
+                return
+            self._describe_thread = threading.Thread(
+                target=self.describe_pending, name="catalog-describe", daemon=True
+            )
+            self._describe_thread.start()
+
+    def _describe(self, path: str, entry: Dict) -> Dict:
+        """
+        Phần còn thiếu của entry: checksum nội dung; số dòng, khoảng ngày, schema (ưu tiên
+        footer Parquet của snapshot, sau đó mới `reader`). Rỗng nếu không tính được gì.
+        """
+        meta = {}
+        if entry.get("checksum") is None:
+            try:
+                meta["checksum"] = file_checksum(path)
+            except OSError as e:
+                logger.warning(f"Không thể tính checksum cho {path}: {e}")
+        if entry["rows"] is None:
+            stats = snapshot_metadata(path) or self._read_stats(path)
+            if stats is not None:
+                meta.update(stats)
+        return meta
+
+    def _read_stats(self, path: str) -> Optional[Dict]:
+        if self.reader is None:
+            return None
+        try:
+            df = self.reader(path)
+        except Exception as e:
+            logger.warning(f"Không thể đọc thống kê cho {path}: {e}")
+            return None
+        meta = {
+            "rows": int(len(df)),
+            "columns": [[str(c), str(t)] for c, t in df.dtypes.items()],
+            "date_min": None,
+            "date_max": None,
+        }
+        if "date" in df.columns and pd.api.types.is_datetime64_any_dtype(df["date"]) and len(df):
+            meta["date_min"] = df["date"].min().strftime("%Y-%m-%d")
+            meta["date_max"] = df["date"].max().strftime("%Y-%m-%d")
+        return meta
+
+    def describe_pending(self) -> int:
+        """
+        Điền thống kê cho các file còn thiếu (chạy trong luồng nền sau refresh,
+        hoặc gọi trực tiếp từ script như warm_snapshots.py). Trả về số file đã mô tả.
+        """
+        described = 0
+        for path in self._pending():
+            entry = self._entries.get(path)
+            meta = self._describe(path, entry) if entry is not None else None
+            if not meta:
+                continue
+            with self._lock:
+                old = self._entries.get(path)
+                if old is None:
+                    continue
+                entry = {**old, **meta}
+                entries = {**self._entries, path: entry}
+                index, _ = self._build_index(entries, {})
+                self._entries, self._index = entries, index
+            described += 1
+
+        if described:
+            with self._lock:
+                self._save_manifest()
+        return described
+
+    def maybe_refresh(self, interval: float = CATALOG_REFRESH_INTERVAL) -> int:
+        """Chỉ quét lại nếu lần quét trước đã quá `interval` giây"""
+        if time.monotonic() - self._last_refresh < interval:
+            return 0
+        return self.refresh()
+
+    # ------------------------------------------------------
+    # Tra cứu (O(1), không chạm đĩa)
+    # ------------------------------------------------------
+    def lookup(self, source: str, ticker: str, data_type: str, time_period: str) -> Optional[Dict]:
+        """Entry của file ứng với (nguồn, mã, loại dữ liệu, giai đoạn), None nếu không có"""
+        return self._index.get((source, ticker.upper(), data_type, time_period))
+
+    def folder(self, source: str, data_type: str, time_period: str) -> Optional[str]:
+        """Thư mục dữ liệu ứng với cấu hình, None nếu thư mục không tồn tại"""
+        return self._folders.get((source, data_type, time_period))
+
+    def entries(self, source: str, data_type: str, time_period: str) -> List[Dict]:
+        """Toàn bộ entry (theo thứ tự mã) trong một thư mục"""
+        return sorted(
+            (e for k, e in self._index.items() if k[0] == source and k[2] == data_type and k[3] == time_period),
+            key=lambda e: e["ticker"],
+        )
+
+    def tickers(self, source: str, data_type: str, time_period: str) -> List[str]:
+        return [e["ticker"] for e in self.entries(source, data_type, time_period)]
+
+    def availability(self, ticker: str) -> List[Dict]:
+        """Danh sách dataset có sẵn cho một mã (dùng cho sidebar)"""
+        ticker = (ticker or "").upper()
+        return sorted(
+            (e for k, e in self._index.items() if k[1] == ticker),
+            key=lambda e: (e["source"], e["data_type"], e["period"]),
+        )
+
+    def wordcloud_years(self) -> List[str]:
+        return sorted(k[3] for k in self._index if k[0] == "wordcloud")
+
+    def wordcloud_path(self, year: str) -> Optional[str]:
+        entry = self._index.get(("wordcloud", None, None, str(year)))
+        return entry["path"] if entry else None
@@ -0,0 +1,354 @@
+"""
+Disk Cache - Cache kết quả bền vững trên đĩa, dùng chung giữa các worker Streamlit
+
+- Khóa theo nội dung (content-addressed): hash của tên hàm, code (bytecode, hằng số, code lồng
+  nhau, cùng các hàm/lớp/module phụ thuộc khai báo trong `depends`) và giá trị tham số
+  (DataFrame được hash theo fingerprint của loader / dữ liệu, không theo id đối tượng)
+- Backend mặc định là SQLite (WAL) → nhiều process đọc/ghi đồng thời an toàn
+- TTL lấy từ `get_cache_config(component)`, giới hạn dung lượng MAX_CACHE_SIZE_MB
+  với cơ chế loại bỏ LRU (entry ít được truy cập gần đây nhất bị xóa trước)
+- `st.cache_data` vẫn là lớp cache in-memory phía trên; lớp đĩa giúp kết quả
+  sống sót qua restart và được chia sẻ giữa các process
+"""
+
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.cache_stats import get_stats
+from utils.fingerprint import frame_fingerprint
+from config.cache_config import (
+    DISK_CACHE_PATH,
+    ENABLE_DISK_CACHE,
+    MAX_CACHE_SIZE_MB,
+    get_cache_config,
+)
+
+logger = logging.getLogger(__name__)
+
+# Tăng khi thay đổi định dạng khóa/giá trị để bỏ qua toàn bộ entry cũ
+DISK_CACHE_VERSION = 1
+
+# Sau khi vượt giới hạn, xóa LRU đến khi còn tỉ lệ này của giới hạn
+EVICT_TARGET_RATIO = 0.9
+
+
+# ======================================================
+# 🔑 KHÓA THEO NỘI DUNG
+# ======================================================
+def _feed(h, value: Any):
+    """Đưa giá trị vào hàm hash theo nội dung (đệ quy cho list/tuple/dict)"""
+    if isinstance(value, pd.DataFrame):
+        # Dùng fingerprint của loader nếu có, ngược lại hash toàn bộ dữ liệu
+        h.update(b"df")
+        h.update(frame_fingerprint(value).encode())
+    elif isinstance(value, pd.Series):
+        h.update(b"series")
+        h.update(repr((value.name, str(value.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(b"ndarray")
+        h.update(repr((value.dtype.str, value.shape)).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}[{len(value)}]".encode())
+        for item in value:
+            _feed(h, item)
+    elif isinstance(value, dict):
+        h.update(f"dict[{len(value)}]".encode())
+        for k in sorted(value, key=repr):
+            _feed(h, k)
+            _feed(h, value[k])
+    else:
+        h.update(f"{type(value).__name__}:{value!r}".encode())
+    h.update(b"|")
+
+
+def make_cache_key(namespace: str, args: tuple = (), kwargs: Optional[dict] = None) -> str:
+    """Khóa SHA-256 từ namespace (tên hàm + phiên bản) và giá trị tham số"""
+    h = hashlib.sha256()
+    h.update(f"v{DISK_CACHE_VERSION}:{namespace}".encode())
+    _feed(h, tuple(args))
+    _feed(h, dict(kwargs or {}))
+    return h.hexdigest()
+
+
+# ======================================================
+# 💾 BACKEND
+# ======================================================
+class CacheBackend(ABC):
+    """Giao diện chung cho backend cache (get/set/delete/clear) — thiếu phương thức nào thì lỗi ngay khi khởi tạo"""
+
+    @abstractmethod
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Trả về (hit, value)"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, component: str = "") -> bool:
+        """Ghi giá trị; False nếu không ghi được"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Xóa một khóa"""
+
+    @abstractmethod
+    def clear(self, component: Optional[str] = None) -> int:
+        """Xóa toàn bộ (hoặc của một component), trả về số entry đã xóa"""
+
+    @abstractmethod
+    def size_bytes(self) -> int:
+        """Dung lượng đang dùng"""
+
+
+class NullCacheBackend(CacheBackend):
+    """Backend rỗng (khi tắt ENABLE_DISK_CACHE) — luôn miss, không lưu gì"""
+
+    def get(self, key):
+        return False, None
+
+    def set(self, key, value, ttl=None, component=""):
+        return False
+
+    def delete(self, key):
+        pass
+
+    def clear(self, component=None):
+        return 0
+
+    def size_bytes(self):
+        return 0
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Cache trên một file SQLite (WAL), an toàn giữa nhiều thread và process"""
+
+    def __init__(self, path: str = DISK_CACHE_PATH, max_size_mb: float = MAX_CACHE_SIZE_MB):
+        self.path = path
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    component TEXT,
+                    value BLOB,
+                    size INTEGER,
+                    created REAL,
+                    expires REAL,
+                    accessed REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed)")
+
+    def _conn(self) -> sqlite3.Connection:
+        """Mỗi thread một connection (sqlite3 không cho dùng chung giữa các thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, expires, component FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False, None
+            value, expires, component = row
+            now = time.time()
+            if expires is not None and expires < now:
+                with conn:
+                    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                get_stats().record_eviction(component)
+                return False, None
+            with conn:
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            return True, pickle.loads(value)
+        except Exception as e:
+            logger.warning(f"Disk cache: lỗi đọc {key[:12]}: {e}")
+            return False, None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, component: str = "") -> bool:
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Disk cache: không thể pickle kết quả {component}: {e}")
+            return False
+
+        if len(blob) > self.max_bytes:
+            logger.warning(f"Disk cache: bỏ qua entry {component} quá lớn ({len(blob) / 1e6:.1f} MB)")
+            return False
+
+        now = time.time()
+        expires = now + ttl if ttl else None
+        try:
+            conn = self._conn()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, component, sqlite3.Binary(blob), len(blob), now, expires, now),
+                )
+            self.evict()
+            return True
+        except Exception as e:
+            logger.warning(f"Disk cache: lỗi ghi {component}: {e}")
+            return False
+
+    def evict(self) -> int:
+        """Xóa entry hết hạn, rồi xóa LRU nếu tổng dung lượng vượt giới hạn"""
+        conn = self._conn()
+        stats = get_stats()
+        now = time.time()
+        with conn:
+            expired = conn.execute(
+                "SELECT component, COUNT(*) FROM entries WHERE expires IS NOT NULL AND expires < ? GROUP BY component",
+                (now,),
+            ).fetchall()
+            conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires < ?", (now,))
+            removed = 0
+            for component, count in expired:
+                stats.record_eviction(component, count)
+                removed += count
+
+            total = self.size_bytes()
+            if total <= self.max_bytes:
+                return removed
+
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            victims = []
+            for key, size, component in conn.execute(
+                "SELECT key, size, component FROM entries ORDER BY accessed ASC"
+            ):
+                if total <= target:
+                    break
+                victims.append((key,))
+                stats.record_eviction(component)
+                total -= size
+            conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+        logger.info(f"🧹 Disk cache: loại bỏ {len(victims)} entry (LRU), còn {total / 1e6:.1f} MB")
+        return removed + len(victims)
+
+    def delete(self, key: str):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self, component: Optional[str] = None) -> int:
+        with self._conn() as conn:
+            if component is None:
+                return conn.execute("DELETE FROM entries").rowcount
+            return conn.execute("DELETE FROM entries WHERE component = ?", (component,)).rowcount
+
+    def size_bytes(self) -> int:
+        row = self._conn().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return int(row[0])
+
+
+# ======================================================
+# 🔁 SINGLETON & DECORATOR
+# ======================================================
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_disk_cache() -> CacheBackend:
+    """Backend dùng chung trong process (SQLite nếu bật ENABLE_DISK_CACHE)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if ENABLE_DISK_CACHE:
+                try:
+                    _backend = SQLiteCacheBackend()
+                except Exception as e:
+                    logger.error(f"Không thể mở disk cache {DISK_CACHE_PATH}: {e}")
+                    _backend = NullCacheBackend()
+            else:
+                _backend = NullCacheBackend()
+        return _backend
+
+
+def _feed_code(h, code):
+    """Hash một code object: bytecode, tên được gọi và hằng số (đệ quy vào code lồng nhau)"""
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            _feed_code(h, const)
+        else:
+            h.update(repr(const).encode())
+
+
+def _feed_dependency(h, obj):
+    """Hàm → code object; lớp / module → mã nguồn (không lấy được thì bỏ qua kèm cảnh báo)"""
+    code = getattr(obj, "__code__", None)
+    if code is not None:
+        _feed_code(h, code)
+        return
+    try:
+        h.update(inspect.getsource(obj).encode())
+    except (OSError, TypeError) as e:
+        logger.warning(f"Không hash được mã nguồn của {obj!r} cho disk cache: {e}")
+
+
+def disk_cached(
+    component: str,
+    backend: Optional[CacheBackend] = None,
+    depends: Sequence[Any] = (),
+    version: str = "",
+) -> Callable:
+    """
+    Decorator cache kết quả hàm trên đĩa, TTL theo `get_cache_config(component)`.
+
+    Dùng bên dưới `st.cache_data` (cache in-memory ở trên, cache đĩa ở dưới):
+
+        @st.cache_data(...)
+        @disk_cached("granger_test", depends=(_granger_test_core, var_service), version="1")
+        def granger_test(df, ...): ...
+
+    `depends`: các hàm, lớp hoặc module mà hàm được cache gọi tới (vd. `_granger_test_core`)
+    → code của chúng cũng vào namespace.
+    `version`: tăng thủ công khi kết quả đổi mà code được hash không đổi
+    (vd. nâng cấp thư viện, thay đổi trong hàm phụ thuộc không khai báo).
+    """
+    def decorator(func: Callable) -> Callable:
+        # Code vào namespace → sửa hàm hoặc phụ thuộc sẽ tự vô hiệu hóa các entry cũ
+        digest = hashlib.sha1(version.encode())
+        _feed_code(digest, func.__code__)
+        for dependency in depends:
+            _feed_dependency(digest, dependency)
+        code_hash = digest.hexdigest()[:12]
+        namespace = f"{func.__module__}.{func.__qualname__}:{code_hash}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = backend or get_disk_cache()
+            key = make_cache_key(namespace, args, kwargs)
+            hit, value = cache.get(key)
+            if hit:
+                get_stats().record_disk_hit(component)
+                return value
+            value = func(*args, **kwargs)
+            cache.set(key, value, ttl=get_cache_config(component).get("ttl"), component=component)
+            return value
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,87 @@
+"""
+Dataset Fingerprint - Token định danh rẻ cho DataFrame để làm khóa cache
+
+- Loader gắn `df.attrs["fingerprint"]` = hash(nguồn dữ liệu + chuỗi biến đổi)
+- Hàm mô hình dùng `hash_funcs=FINGERPRINT_HASH_FUNCS` → st.cache_data chỉ hash token
+  (kèm shape, cột, dtype và biên index) thay vì toàn bộ dữ liệu
+- pandas sao chép `attrs` sang frame suy ra (.copy(), df[cols], diff().dropna(), ...) →
+  bước biến đổi làm đổi giá trị phải gắn token mới (derive_fingerprint) hoặc bỏ token
+  (drop_fingerprint); token chỉ đúng cho frame vừa ra khỏi loader
+- Frame chưa có fingerprint vẫn được hash đầy đủ như cũ (an toàn khi quên gắn)
+"""
+
+import hashlib
+from typing import Optional
+
+import pandas as pd
+
+FINGERPRINT_ATTR = "fingerprint"
+
+
+def _structure_token(df: pd.DataFrame) -> str:
+    """Shape, cột, dtype và biên index (rẻ, không đọc dữ liệu)"""
+    parts = [
+        repr(df.shape),
+        repr([str(c) for c in df.columns]),
+        repr([str(t) for t in df.dtypes]),
+    ]
+    if len(df.index):
+        parts.append(repr((df.index[0], df.index[-1])))
+    return "|".join(parts)
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+def stamp_fingerprint(df: pd.DataFrame, source: str, transform: str = "") -> pd.DataFrame:
+    """
+    Gắn fingerprint cho frame vừa tải (sửa tại chỗ và trả về chính frame đó).
+
+    Args:
+        df: DataFrame vừa tải
+        source: Định danh nguồn (checksum / snapshot key / phiên bản kho giá)
+        transform: Mô tả các bước biến đổi đã áp dụng (lọc ngày, chọn cột, ...)
+    """
+    df.attrs[FINGERPRINT_ATTR] = _digest(source, transform, _structure_token(df))
+    return df
+
+
+def derive_fingerprint(df: pd.DataFrame, parent: pd.DataFrame, step: str) -> pd.DataFrame:
+    """Gắn fingerprint cho frame suy ra từ `parent` qua bước biến đổi `step`"""
+    token = get_fingerprint(parent)
+    if token is None:
+        df.attrs.pop(FINGERPRINT_ATTR, None)
+        return df
+    return stamp_fingerprint(df, token, step)
+
+
+def drop_fingerprint(df: pd.DataFrame) -> pd.DataFrame:
+    """Bỏ token thừa hưởng từ frame gốc (sửa tại chỗ) → khóa cache hash theo dữ liệu"""
+    df.attrs.pop(FINGERPRINT_ATTR, None)
+    return df
+
+
+def get_fingerprint(df: pd.DataFrame) -> Optional[str]:
+    return df.attrs.get(FINGERPRINT_ATTR)
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Giá trị hash dùng làm khóa cache cho DataFrame.
+    Có fingerprint → token + cấu trúc; không có → hash toàn bộ dữ liệu.
+    """
+    token = get_fingerprint(df)
+    if token is None:
+        return _digest(
+            "full", _structure_token(df),
+            pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes(),
+        )
+    return _digest(token, _structure_token(df))
+
+
+FINGERPRINT_HASH_FUNCS = {pd.DataFrame: frame_fingerprint}
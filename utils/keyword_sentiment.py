@@ -0,0 +1,179 @@
+"""
+Keyword Sentiment - Phân loại cảm xúc nhanh bằng từ điển có trọng số
+
+- Toàn bộ từ khóa (kể cả cụm nhiều từ) + từ phủ định gộp vào MỘT regex dựng theo trie
+  (các từ chung tiền tố dùng chung nhánh) → mỗi văn bản chỉ quét một lượt
+- score_texts() nối cả danh sách văn bản thành một chuỗi và quét một lần duy nhất
+  → nhãn sơ bộ cho hàng nghìn tiêu đề trong vài mili giây khi PhoBERT chưa sẵn sàng
+- Từ khóa có trọng số ("tăng trần" mạnh hơn "tăng"); cụm dài được ưu tiên khớp
+- Phủ định: từ khóa nằm trong NEGATION_WINDOW từ sau "không", "chưa", ... bị đảo dấu
+  (không vượt qua dấu . ; ! ?)
+- Từ khóa không dấu ("tang", "lai", ...) chỉ áp dụng cho văn bản không dấu
+  (tránh "tương lai" bị tính là "lãi")
+"""
+
+import bisect
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# ======================================================
+# 📚 TỪ ĐIỂN MẶC ĐỊNH
+# ======================================================
+# Từ khóa → trọng số
+POSITIVE_LEXICON: Dict[str, float] = {
+    "tăng": 1.0, "tăng mạnh": 1.5, "tăng trần": 2.0, "tăng trưởng": 1.0, "bứt phá": 1.5,
+    "hồi phục": 1.0, "phục hồi": 1.0, "lãi": 1.0, "có lãi": 1.0, "lãi lớn": 1.5,
+    "lợi nhuận tăng": 1.5, "tích cực": 1.0, "khởi sắc": 1.0, "kỷ lục": 1.0,
+    "vượt kỳ vọng": 1.5, "mua ròng": 1.0, "cổ tức": 0.5, "nâng hạng": 1.5,
+}
+NEGATIVE_LEXICON: Dict[str, float] = {
+    "giảm": 1.0, "giảm mạnh": 1.5, "giảm sàn": 2.0, "sụt giảm": 1.5, "lao dốc": 1.5,
+    "bán tháo": 1.5, "bán ròng": 1.0, "lỗ": 1.0, "thua lỗ": 1.5, "lỗ ròng": 1.5,
+    "tiêu cực": 1.0, "rủi ro": 0.5, "lo ngại": 1.0, "vỡ nợ": 2.0, "phá sản": 2.0,
+    "khởi tố": 1.5, "bắt giam": 1.5, "thao túng": 1.5, "vi phạm": 1.0,
+    "đình chỉ": 1.5, "hủy niêm yết": 2.0, "cảnh báo": 0.5,
+}
+NEGATIONS = ("không", "chưa", "chẳng", "chả", "không hề", "chưa hề")
+
+# Dạng không dấu thường gặp trong tiêu đề RSS (chỉ dùng cho văn bản không dấu)
+UNACCENTED_POSITIVE: Dict[str, float] = {"tang": 1.0, "hoi phuc": 1.0, "lai": 1.0, "tich cuc": 1.0}
+UNACCENTED_NEGATIVE: Dict[str, float] = {"giam": 1.0, "ban thao": 1.5, "lo": 1.0, "tieu cuc": 1.0}
+UNACCENTED_NEGATIONS = ("khong", "chua")
+
+# Số từ tối đa giữa từ phủ định và từ khóa để đảo dấu ("không còn tăng" → tiêu cực)
+NEGATION_WINDOW = 3
+
+# Ký tự nối các văn bản khi quét theo lô (không phải \w → không tạo khớp xuyên văn bản)
+_SEPARATOR = "\x00"
+_WORD = re.compile(r"\w+")
+_SPACES = re.compile(r"\s+")
+# Dấu kết thúc câu / mệnh đề: phủ định không vượt qua (dấu chấm thập phân "1.5" không tính)
+_CLAUSE_END = re.compile(r"[;!?]|\.(?!\d)")
+
+
+def _canonical(term: str) -> str:
+    return _SPACES.sub(" ", unicodedata.normalize("NFC", term)).strip().lower()
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """Regex khớp đúng tập `terms`, dựng theo trie; khoảng trắng khớp \\s+"""
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node) -> str:
+        branches = [
+            (r"\s+" if ch == " " else re.escape(ch)) + build(child)
+            for ch, child in sorted((k, v) for k, v in node.items() if k)
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Nhánh dài thử trước (greedy) → "giảm mạnh" thắng "giảm"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordSentiment:
+    """Bộ chấm điểm từ khóa với regex gộp biên dịch một lần"""
+
+    def __init__(
+        self,
+        positive: Dict[str, float] = POSITIVE_LEXICON,
+        negative: Dict[str, float] = NEGATIVE_LEXICON,
+        negations: Iterable[str] = NEGATIONS,
+        unaccented_positive: Dict[str, float] = UNACCENTED_POSITIVE,
+        unaccented_negative: Dict[str, float] = UNACCENTED_NEGATIVE,
+        unaccented_negations: Iterable[str] = UNACCENTED_NEGATIONS,
+        negation_window: int = NEGATION_WINDOW,
+    ):
+        # Từ → (trọng số có dấu: + tích cực, - tiêu cực, None = phủ định; chỉ cho văn bản không dấu?)
+        self.terms: Dict[str, Tuple[Optional[float], bool]] = {}
+        for lexicon, sign, unaccented_only in (
+            (positive, 1.0, False), (negative, -1.0, False),
+            (unaccented_positive, 1.0, True), (unaccented_negative, -1.0, True),
+        ):
+            for term, weight in lexicon.items():
+                self.terms[_canonical(term)] = (sign * float(weight), unaccented_only)
+        for words, unaccented_only in ((negations, False), (unaccented_negations, True)):
+            for term in words:
+                self.terms[_canonical(term)] = (None, unaccented_only)
+
+        self.negation_window = negation_window
+        self.pattern = re.compile(r"(?<!\w)(" + _trie_pattern(self.terms) + r")(?!\w)")
+
+    def polarities(self, texts: Iterable[str]) -> List[Tuple[float, float]]:
+        """Tổng trọng số (tích cực, tiêu cực) của từng văn bản — quét MỘT lần cho cả danh sách"""
+        prepared = [unicodedata.normalize("NFC", text or "").lower() for text in texts]
+        starts, offset = [], 0
+        for text in prepared:
+            starts.append(offset)
+            offset += len(text) + len(_SEPARATOR)
+        unaccented = [text.isascii() for text in prepared]
+        joined = _SEPARATOR.join(prepared)
+
+        scores = [[0.0, 0.0] for _ in prepared]
+        negation = None  # (chỉ số văn bản, vị trí kết thúc từ phủ định)
+        for match in self.pattern.finditer(joined):
+            term = match.group(1)
+            if " " in term or not term.isalnum():
+                term = _SPACES.sub(" ", term)
+            weight, unaccented_only = self.terms[term]
+            index = bisect.bisect_right(starts, match.start()) - 1
+            if unaccented_only and not unaccented[index]:
+                continue
+            if weight is None:
+                negation = (index, match.end())
+                continue
+            if negation is not None:
+                if negation[0] == index and not _CLAUSE_END.search(joined, negation[1], match.start()):
+                    gap = len(_WORD.findall(joined, negation[1], match.start()))
+                    if gap <= self.negation_window:
+                        weight = -weight
+                negation = None
+            if weight > 0:
+                scores[index][0] += weight
+            else:
+                scores[index][1] -= weight
+        return [tuple(s) for s in scores]
+
+    def polarity(self, text: str) -> Tuple[float, float]:
+        return self.polarities([text])[0]
+
+    @staticmethod
+    def _label(positive: float, negative: float) -> Tuple[str, float]:
+        """(nhãn 'positive' / 'negative' / 'neutral', độ tin cậy) — cùng thang với bản cũ"""
+        if positive > negative:
+            return "positive", min(0.6 + positive * 0.1, 0.9)
+        if negative > positive:
+            return "negative", min(0.6 + negative * 0.1, 0.9)
+        return "neutral", 0.5
+
+    def score(self, text: str) -> Tuple[str, float]:
+        return self._label(*self.polarity(text))
+
+    def score_texts(self, texts: Iterable[str]) -> List[Tuple[str, float]]:
+        return [self._label(p, n) for p, n in self.polarities(texts)]
+
+
+_default: Optional[KeywordSentiment] = None
+_default_lock = threading.Lock()
+
+
+def get_keyword_sentiment() -> KeywordSentiment:
+    """Bộ chấm điểm dùng từ điển mặc định (biên dịch regex một lần cho cả process)"""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = KeywordSentiment()
+        return _default
+
+
+def score_texts(texts: Iterable[str]) -> List[Tuple[str, float]]:
+    return get_keyword_sentiment().score_texts(texts)
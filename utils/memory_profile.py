@@ -0,0 +1,81 @@
+"""
+Memory Profile - Thu gọn kiểu dữ liệu cho DataFrame sau khi tải (tùy chọn)
+
+- Xác suất cảm xúc (tích cực / tiêu cực / trung tính) → float32
+- label → int8 (hoặc category nếu có giá trị thiếu), ticker → category
+- Cột văn bản còn lại → chuỗi Arrow (`string[pyarrow]`) thay cho object Python
+- Ghi lại memory_usage(deep=True) trước/sau cho từng dataset
+"""
+
+import logging
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_PROB_COLUMNS = ("tích cực", "tiêu cực", "trung tính")
+LABEL_COLUMNS = ("label",)
+CATEGORICAL_COLUMNS = ("ticker",)
+
+ARROW_STRING_DTYPE = "string[pyarrow]"
+
+
+def _compact_label(series: pd.Series) -> pd.Series:
+    """label (-1/0/1) → int8 nếu đủ giá trị và nằm trong khoảng int8, ngược lại → category."""
+    if pd.api.types.is_numeric_dtype(series) and series.notna().all():
+        values = series.to_numpy()
+        if np.all(np.mod(values, 1) == 0) and values.min() >= -128 and values.max() <= 127:
+            return series.astype(np.int8)
+    return series.astype("category")
+
+
+def compact_frame(df: pd.DataFrame, label: str = "") -> Tuple[pd.DataFrame, Dict]:
+    """
+    Thu gọn kiểu dữ liệu của DataFrame.
+
+    Args:
+        df: DataFrame cần thu gọn (không bị sửa, trả về bản mới)
+        label: Tên dataset dùng trong log/báo cáo
+
+    Returns:
+        Tuple[pd.DataFrame, Dict]: (DataFrame đã thu gọn, báo cáo bộ nhớ gồm
+        dataset, rows, before_bytes, after_bytes, saved_pct, columns)
+    """
+    before = int(df.memory_usage(deep=True).sum())
+    df = df.copy()
+    changed = {}
+
+    for col in df.columns:
+        old_dtype = str(df[col].dtype)
+
+        if col in SENTIMENT_PROB_COLUMNS and pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].astype(np.float32)
+        elif col in LABEL_COLUMNS:
+            df[col] = _compact_label(df[col])
+        elif col in CATEGORICAL_COLUMNS:
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+        elif df[col].dtype == "object":
+            df[col] = df[col].astype(ARROW_STRING_DTYPE)
+
+        if str(df[col].dtype) != old_dtype:
+            changed[col] = (old_dtype, str(df[col].dtype))
+
+    after = int(df.memory_usage(deep=True).sum())
+    report = {
+        "dataset": label,
+        "rows": len(df),
+        "before_bytes": before,
+        "after_bytes": after,
+        "saved_pct": round((1 - after / before) * 100, 1) if before else 0.0,
+        "columns": changed,
+    }
+    logger.info(
+        f"🗜️ Compact dtypes {label or ''}: {before / 1024:.1f} KB → {after / 1024:.1f} KB "
+        f"(-{report['saved_pct']}%)"
+    )
+
+    df.attrs["memory_report"] = report
+    return df, report
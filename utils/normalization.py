@@ -0,0 +1,130 @@
+"""
+Normalization - Chuẩn hóa cột số cho DataFrame đọc từ Excel
+
+Thay cho chuỗi 7 lần `.str.replace` trên mọi cột object:
+- Lấy mẫu từng cột để quyết định cột có "dạng số" hay không
+- Chỉ làm sạch + ép kiểu các cột dạng số, bằng MỘT regex biên dịch sẵn
+- Ghi lại thời gian xử lý và dtype được chọn cho từng cột
+"""
+
+import logging
+import re
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Các ký tự/chuỗi bị loại bỏ trước khi ép kiểu số
+# (tương đương chuỗi replace cũ: ',', '.', '%', '₫', 'vnđ', '$')
+NUMERIC_JUNK_PATTERN = re.compile(r"[,.%₫$]|vnđ")
+
+# Số giá trị lấy mẫu cho mỗi cột
+NUMERIC_SAMPLE_SIZE = 200
+
+# Tỷ lệ giá trị mẫu parse được thành số để coi cột là dạng số
+NUMERIC_LIKE_THRESHOLD = 0.8
+
+
+# ======================================================
+# 🔍 PHÁT HIỆN CỘT DẠNG SỐ
+# ======================================================
+def _clean_numeric_text(series: pd.Series) -> pd.Series:
+    """Loại bỏ ký tự phân cách / đơn vị tiền tệ trong một lượt regex."""
+    return series.astype(str).str.replace(NUMERIC_JUNK_PATTERN, "", regex=True).str.strip()
+
+
+def numeric_parse_rate(series: pd.Series, sample_size: int = NUMERIC_SAMPLE_SIZE) -> float:
+    """
+    Tỷ lệ giá trị (trên mẫu) parse được thành số sau khi làm sạch.
+
+    Mẫu được lấy cách đều trên toàn cột (không chỉ phần đầu) để không bị
+    đánh lừa bởi vài dòng tiêu đề/ghi chú ở đầu file.
+    """
+    values = series.dropna()
+    if values.empty:
+        # Cột rỗng: ép về float (NaN) giống hành vi cũ
+        return 1.0
+
+    if len(values) > sample_size:
+        positions = np.linspace(0, len(values) - 1, sample_size).astype(int)
+        values = values.iloc[positions]
+
+    parsed = pd.to_numeric(_clean_numeric_text(values), errors="coerce")
+    return float(parsed.notna().mean())
+
+
+# ======================================================
+# ⚙️ CHUẨN HÓA
+# ======================================================
+def normalize_numeric_columns(
+    df: pd.DataFrame,
+    sample_size: int = NUMERIC_SAMPLE_SIZE,
+    threshold: float = NUMERIC_LIKE_THRESHOLD,
+) -> Tuple[pd.DataFrame, List[Dict]]:
+    """
+    Ép kiểu số cho các cột object có dạng số, giữ nguyên cột văn bản.
+
+    Args:
+        df: DataFrame cần chuẩn hóa (được sửa trực tiếp)
+        sample_size: Số giá trị lấy mẫu cho mỗi cột
+        threshold: Tỷ lệ parse tối thiểu để coi cột là dạng số
+
+    Returns:
+        Tuple[pd.DataFrame, List[Dict]]: (DataFrame, báo cáo từng cột gồm
+        column, dtype_in, dtype_out, numeric_like, parse_rate, seconds)
+    """
+    report = []
+
+    for col in df.columns:
+        start = time.perf_counter()
+        dtype_in = str(df[col].dtype)
+
+        if df[col].dtype != "object":
+            report.append({
+                "column": col,
+                "dtype_in": dtype_in,
+                "dtype_out": dtype_in,
+                "numeric_like": None,
+                "parse_rate": None,
+                "seconds": time.perf_counter() - start,
+            })
+            continue
+
+        parse_rate = numeric_parse_rate(df[col], sample_size)
+        numeric_like = parse_rate >= threshold
+
+        if numeric_like:
+            # Ép kiểu an toàn, NaN nếu thất bại
+            df[col] = pd.to_numeric(_clean_numeric_text(df[col]), errors="coerce")
+        else:
+            # Cột văn bản: chỉ ép về string (fix lỗi Arrow / Streamlit caching)
+            df[col] = df[col].astype(str)
+
+        report.append({
+            "column": col,
+            "dtype_in": dtype_in,
+            "dtype_out": str(df[col].dtype),
+            "numeric_like": numeric_like,
+            "parse_rate": round(parse_rate, 4),
+            "seconds": time.perf_counter() - start,
+        })
+
+    for row in report:
+        logger.debug(
+            f"Chuẩn hóa cột '{row['column']}': {row['dtype_in']} → {row['dtype_out']} "
+            f"({row['seconds'] * 1000:.1f} ms)"
+        )
+
+    return df, report
+
+
+def format_normalization_report(report: List[Dict]) -> pd.DataFrame:
+    """Chuyển báo cáo chuẩn hóa thành bảng, sắp xếp theo thời gian xử lý giảm dần."""
+    if not report:
+        return pd.DataFrame()
+    table = pd.DataFrame(report)
+    table["ms"] = (table.pop("seconds") * 1000).round(2)
+    return table.sort_values("ms", ascending=False).reset_index(drop=True)
@@ -0,0 +1,135 @@
+"""
+Price Prefetcher - Làm "ấm" kho giá cho toàn bộ mã trên sidebar ở nền
+
+- Pool thread giới hạn số worker, mỗi mã chỉ có tối đa một tác vụ đang chạy
+- Mọi request Vnstock đi qua rate limiter theo nguồn (utils/rate_limiter.py)
+- Bảng trạng thái từng mã: queued / running / fresh / stale / failed
+- Khi một mã có dữ liệu mới, khóa cache của `load_price_data` (phiên bản kho của mã) đổi
+  theo → lần đọc sau thấy ngay, cache giá của các mã khác giữ nguyên
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+import streamlit as st
+
+from utils.data_loader import price_is_fresh, update_price_store
+from utils.price_store import PriceStore, get_price_store
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = 4
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_FRESH = "fresh"      # Đã cập nhật trong hôm nay (hoặc mã đã đóng băng)
+STATE_STALE = "stale"      # Có dữ liệu nhưng lần tải mới nhất thất bại
+STATE_FAILED = "failed"    # Không có dữ liệu nào
+
+
+class PricePrefetcher:
+    """Cập nhật kho giá của nhiều mã song song trên pool thread giới hạn"""
+
+    def __init__(
+        self,
+        store: PriceStore,
+        max_workers: int = PREFETCH_WORKERS,
+        on_update: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        Args:
+            store: Kho giá dùng chung
+            max_workers: Số thread tải đồng thời
+            on_update: Hàm gọi lại khi một mã có thêm dữ liệu mới
+        """
+        self.store = store
+        self.on_update = on_update
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="price-prefetch")
+        self._status: Dict[str, Dict] = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def _set_status(self, ticker: str, state: str, **fields):
+        with self._lock:
+            entry = self._status.setdefault(ticker, {})
+            entry.update(state=state, updated_at=time.time(), **fields)
+
+    def prefetch(self, tickers: Iterable[str], force: bool = False) -> int:
+        """
+        Đưa các mã vào hàng đợi cập nhật (bỏ qua mã đang chạy hoặc đã mới trong hôm nay).
+
+        Returns:
+            int: Số mã thực sự được đưa vào hàng đợi
+        """
+        submitted = 0
+        for ticker in dict.fromkeys(t.upper() for t in tickers if t):
+            if not force and price_is_fresh(ticker, self.store):
+                last_date = self.store.last_date(ticker)
+                self._set_status(ticker, STATE_FRESH, last_date=last_date.strftime("%Y-%m-%d") if last_date else None)
+                continue
+
+            with self._lock:
+                if ticker in self._in_flight:
+                    continue
+                self._in_flight.add(ticker)
+            self._set_status(ticker, STATE_QUEUED)
+            self._executor.submit(self._run, ticker)
+            submitted += 1
+
+        if submitted:
+            logger.info(f"📡 Prefetch giá: {submitted} mã được đưa vào hàng đợi")
+        return submitted
+
+    def _run(self, ticker: str):
+        self._set_status(ticker, STATE_RUNNING)
+        start = time.perf_counter()
+        try:
+            before = self.store.last_date(ticker)
+            df = update_price_store(ticker, self.store)
+            after = self.store.last_date(ticker)
+
+            if df.empty:
+                state = STATE_FAILED
+            elif price_is_fresh(ticker, self.store):
+                state = STATE_FRESH
+            else:
+                state = STATE_STALE
+            self._set_status(
+                ticker, state,
+                last_date=after.strftime("%Y-%m-%d") if after is not None else None,
+                rows=len(df),
+                seconds=round(time.perf_counter() - start, 2),
+                error=None,
+            )
+
+            if after != before and self.on_update is not None:
+                self.on_update(ticker)
+        except Exception as e:
+            logger.warning(f"Prefetch giá {ticker} thất bại: {e}")
+            self._set_status(ticker, STATE_FAILED, error=str(e)[:200])
+        finally:
+            with self._lock:
+                self._in_flight.discard(ticker)
+
+    def status(self) -> Dict[str, Dict]:
+        """Bản sao trạng thái của từng mã"""
+        with self._lock:
+            return {t: dict(s) for t, s in self._status.items()}
+
+    def summary(self) -> Dict[str, int]:
+        """Số mã theo từng trạng thái"""
+        with self._lock:
+            return dict(Counter(s["state"] for s in self._status.values()))
+
+
+# ============================================================
+# SINGLETON với @st.cache_resource
+# ============================================================
+@st.cache_resource(show_spinner=False)
+def get_price_prefetcher() -> PricePrefetcher:
+    """Prefetcher dùng chung cho toàn app"""
+    return PricePrefetcher(get_price_store())
@@ -0,0 +1,194 @@
+"""
+Price Store - Kho giá lịch sử tăng dần (append-only) cho từng mã cổ phiếu
+
+Thay cho cache CSV bị xóa & tải lại toàn bộ mỗi ngày:
+- Mỗi mã là một thư mục data/prices/{TICKER}/ gồm các file Parquet "part-*"
+- Lần cập nhật chỉ ghi thêm phần đuôi còn thiếu (delta) thành một part mới
+- Khi số part vượt ngưỡng, các part được gộp (compact) lại thành một file
+- _meta.json lưu ngày cuối, ngày kiểm tra gần nhất và trạng thái "đóng băng"
+  (mã đã hủy niêm yết → không bao giờ tải lại)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+PRICE_STORE_DIR = os.path.join("data", "prices")
+
+# Số part tối đa trước khi gộp lại thành một file
+MAX_PARTS_BEFORE_COMPACT = 16
+
+META_FILE = "_meta.json"
+PART_PREFIX = "part-"
+PART_EXT = ".parquet"
+
+
+class PriceStore:
+    """Kho giá OHLCV append-only, mỗi mã một thư mục Parquet"""
+
+    def __init__(self, root: str = PRICE_STORE_DIR):
+        self.root = root
+        self._lock = threading.RLock()
+
+    # ============================================================
+    # ĐƯỜNG DẪN & METADATA
+    # ============================================================
+    def _ticker_dir(self, ticker: str) -> str:
+        return os.path.join(self.root, ticker.upper())
+
+    def _parts(self, ticker: str) -> List[str]:
+        folder = self._ticker_dir(ticker)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(
+            os.path.join(folder, f) for f in os.listdir(folder)
+            if f.startswith(PART_PREFIX) and f.endswith(PART_EXT)
+        )
+
+    def meta(self, ticker: str) -> Dict:
+        """Đọc _meta.json của mã (dict rỗng nếu chưa có)"""
+        path = os.path.join(self._ticker_dir(ticker), META_FILE)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Không thể đọc metadata giá {ticker}: {e}")
+            return {}
+
+    def update_meta(self, ticker: str, **fields) -> Dict:
+        """Cập nhật một số trường trong _meta.json (ghi file tạm rồi os.replace)"""
+        with self._lock:
+            meta = self.meta(ticker)
+            meta.update(fields)
+            folder = self._ticker_dir(ticker)
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, META_FILE)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, path)
+            return meta
+
+    def last_date(self, ticker: str) -> Optional[pd.Timestamp]:
+        """Ngày giao dịch cuối cùng đã lưu (đọc từ metadata, không đọc dữ liệu)"""
+        value = self.meta(ticker).get("last_date")
+        return pd.Timestamp(value) if value else None
+
+    def is_frozen(self, ticker: str) -> bool:
+        return bool(self.meta(ticker).get("frozen"))
+
+    def freeze(self, ticker: str, reason: str = ""):
+        """Đóng băng vĩnh viễn (mã đã hủy niêm yết → không tải thêm dữ liệu)"""
+        self.update_meta(ticker, frozen=True, frozen_reason=reason)
+        logger.info(f"🧊 Đóng băng dữ liệu giá {ticker.upper()}: {reason}")
+
+    # ============================================================
+    # ĐỌC / GHI
+    # ============================================================
+    def read(self, ticker: str) -> pd.DataFrame:
+        """Đọc toàn bộ lịch sử giá (index = date), bỏ trùng ngày - giữ bản ghi mới nhất"""
+        for _ in range(2):
+            try:
+                frames = [pd.read_parquet(p) for p in self._parts(ticker)]
+                break
+            except FileNotFoundError:
+                # Part vừa bị gộp bởi process khác → liệt kê lại
+                continue
+        else:
+            frames = []
+
+        if not frames:
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True)
+        df["date"] = pd.to_datetime(df["date"])
+        df = df.drop_duplicates(subset="date", keep="last").sort_values("date")
+        return df.set_index("date")
+
+    def append(self, ticker: str, df: pd.DataFrame) -> Optional[str]:
+        """
+        Ghi thêm một đoạn dữ liệu mới (index = date) thành một part.
+        Ngày trùng với dữ liệu cũ sẽ được thay thế khi đọc (keep="last").
+        """
+        if df is None or df.empty:
+            return None
+
+        with self._lock:
+            folder = self._ticker_dir(ticker)
+            os.makedirs(folder, exist_ok=True)
+
+            data = df.reset_index()
+            first = data["date"].min().strftime("%Y%m%d")
+            last = data["date"].max().strftime("%Y%m%d")
+            # time_ns đảm bảo thứ tự part theo thời điểm ghi (part sau ghi đè part trước)
+            name = f"{PART_PREFIX}{time.time_ns()}-{first}-{last}-{os.getpid()}{PART_EXT}"
+            path = os.path.join(folder, name)
+            data.to_parquet(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
+
+            current_last = self.last_date(ticker)
+            new_last = data["date"].max()
+            if current_last is None or new_last > current_last:
+                self.update_meta(ticker, last_date=new_last.strftime("%Y-%m-%d"))
+
+            if len(self._parts(ticker)) > MAX_PARTS_BEFORE_COMPACT:
+                self.compact(ticker)
+            return path
+
+    def compact(self, ticker: str):
+        """Gộp toàn bộ part thành một file duy nhất"""
+        with self._lock:
+            parts = self._parts(ticker)
+            if len(parts) <= 1:
+                return
+            df = self.read(ticker)
+            if df.empty:
+                return
+            data = df.reset_index()
+            first = data["date"].min().strftime("%Y%m%d")
+            last = data["date"].max().strftime("%Y%m%d")
+            path = os.path.join(
+                self._ticker_dir(ticker),
+                f"{PART_PREFIX}{time.time_ns()}-{first}-{last}-{os.getpid()}{PART_EXT}",
+            )
+            data.to_parquet(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
+            for p in parts:
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            logger.info(f"🗜️ Đã gộp {len(parts)} part giá của {ticker.upper()}")
+
+    def import_legacy_csv(self, ticker: str, csv_path: str) -> bool:
+        """Chuyển cache CSV cũ ({TICKER}_vnstock.csv) vào kho rồi xóa file CSV"""
+        try:
+            df = pd.read_csv(csv_path, index_col="date", parse_dates=True)
+        except Exception as e:
+            logger.warning(f"Không thể đọc cache CSV cũ {csv_path}: {e}")
+            return False
+
+        if not df.empty:
+            self.append(ticker, df)
+        os.remove(csv_path)
+        logger.info(f"📦 Đã chuyển {len(df)} dòng từ {csv_path} vào kho giá")
+        return True
+
+
+# ============================================================
+# SINGLETON với @st.cache_resource
+# ============================================================
+@st.cache_resource(show_spinner=False)
+def get_price_store() -> PriceStore:
+    """Kho giá dùng chung cho toàn app"""
+    return PriceStore()
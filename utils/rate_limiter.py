@@ -0,0 +1,89 @@
+"""
+Rate Limiter - Giới hạn tần suất gọi API theo từng nguồn dữ liệu (token bucket)
+
+- Mỗi nguồn Vnstock (VCI, TCBS) có một "xô token" riêng, dùng chung cho mọi thread
+- Mỗi request lấy 1 token; hết token thì chờ đến khi xô được nạp lại
+- Tránh bị nguồn chặn (HTTP 429) khi prefetch hàng loạt nhiều mã cùng lúc
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Nguồn → (số request mỗi giây, dung lượng burst)
+SOURCE_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "VCI": (2.0, 4),
+    "TCBS": (1.0, 2),
+}
+DEFAULT_RATE_LIMIT: Tuple[float, int] = (1.0, 2)
+
+
+class TokenBucket:
+    """Token bucket an toàn đa luồng"""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Args:
+            rate: Số token được nạp lại mỗi giây
+            capacity: Số token tối đa (số request được phép dồn liền nhau)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Lấy 1 token, chờ nếu xô đang rỗng.
+
+        Returns:
+            bool: True nếu lấy được token, False nếu quá `timeout` giây
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(source: str) -> TokenBucket:
+    """Token bucket dùng chung (trong process) cho một nguồn dữ liệu"""
+    source = source.upper()
+    with _buckets_lock:
+        if source not in _buckets:
+            rate, capacity = SOURCE_RATE_LIMITS.get(source, DEFAULT_RATE_LIMIT)
+            _buckets[source] = TokenBucket(rate, capacity)
+        return _buckets[source]
+
+
+def acquire_source(source: str, timeout: Optional[float] = None) -> bool:
+    """Chờ đến lượt gọi API của `source` (log khi phải chờ quá lâu)"""
+    start = time.monotonic()
+    ok = get_rate_limiter(source).acquire(timeout)
+    waited = time.monotonic() - start
+    if waited > 1:
+        logger.debug(f"⏳ Rate limit {source}: chờ {waited:.1f}s")
+    return ok
@@ -0,0 +1,143 @@
+"""
+Sentiment Store - Lưu xác suất cảm xúc PhoBERT trên đĩa theo hash văn bản
+
+- Khóa = SHA-256(văn bản đã chuẩn hóa) + model key (tên model @ revision / backend)
+- Điểm PhoBERT là hàm thuần của văn bản và model → không cần TTL
+- Dùng chung cho đường đơn lẻ (news tab) lẫn batch (upload file, script chấm điểm)
+- SQLite (WAL) → nhiều worker / process đọc ghi đồng thời an toàn
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from config.cache_config import ENABLE_SENTIMENT_CACHE, SENTIMENT_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+# Số tham số tối đa trong một câu SELECT ... IN (...)
+LOOKUP_CHUNK_SIZE = 500
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text) -> str:
+    """Chuẩn hóa Unicode (NFC) và khoảng trắng — cùng nội dung → cùng khóa"""
+    if text is None:
+        return ""
+    text = unicodedata.normalize("NFC", text if isinstance(text, str) else str(text))
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def text_hash(text) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class SentimentStore:
+    """Kho (text_hash, model_key) → vector xác suất float32"""
+
+    def __init__(self, path: str = SENTIMENT_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sentiments (
+                    text_hash TEXT,
+                    model_key TEXT,
+                    probs BLOB,
+                    created REAL,
+                    PRIMARY KEY (text_hash, model_key)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS labels (model_key TEXT PRIMARY KEY, names TEXT)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        """Mỗi thread một connection (sqlite3 không cho dùng chung giữa các thread)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, model_key: str, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Tra cứu nhiều hash cùng lúc → {hash: xác suất} (chỉ các hash đã có)"""
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+        conn = self._conn()
+        for start in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+            chunk = hashes[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT text_hash, probs FROM sentiments WHERE model_key = ? AND text_hash IN ({placeholders})",
+                [model_key, *chunk],
+            )
+            for h, blob in rows:
+                found[h] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, model_key: str, hashes: List[str], probs: np.ndarray):
+        """Ghi xác suất cho các hash (ghi đè nếu đã có)"""
+        now = time.time()
+        probs = np.asarray(probs, dtype=np.float32)
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO sentiments VALUES (?, ?, ?, ?)",
+                [(h, model_key, sqlite3.Binary(row.tobytes()), now) for h, row in zip(hashes, probs)],
+            )
+
+    def labels(self, model_key: str) -> Optional[List[str]]:
+        """Tên nhãn đã lưu của model (để không phải nạp model khi mọi văn bản đều có sẵn)"""
+        row = self._conn().execute("SELECT names FROM labels WHERE model_key = ?", (model_key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_labels(self, model_key: str, names: List[str]):
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO labels VALUES (?, ?)", (model_key, json.dumps(names)))
+
+    def count(self, model_key: Optional[str] = None) -> int:
+        if model_key is None:
+            return self._conn().execute("SELECT COUNT(*) FROM sentiments").fetchone()[0]
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM sentiments WHERE model_key = ?", (model_key,)
+        ).fetchone()[0]
+
+    def clear(self, model_key: Optional[str] = None) -> int:
+        with self._conn() as conn:
+            if model_key is None:
+                return conn.execute("DELETE FROM sentiments").rowcount
+            return conn.execute("DELETE FROM sentiments WHERE model_key = ?", (model_key,)).rowcount
+
+
+_store: Optional[SentimentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_sentiment_store() -> Optional[SentimentStore]:
+    """Kho dùng chung trong process (None nếu tắt ENABLE_SENTIMENT_CACHE hoặc lỗi mở file)"""
+    global _store
+    if not ENABLE_SENTIMENT_CACHE:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = SentimentStore()
+            except Exception as e:
+                logger.error(f"Không thể mở sentiment store {SENTIMENT_CACHE_PATH}: {e}")
+                return None
+        return _store
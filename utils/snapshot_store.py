@@ -0,0 +1,259 @@
+"""
+Snapshot Store - Lớp snapshot dạng cột (Parquet) cho các file Excel trong data/
+
+Lần đọc đầu tiên: DataFrame đã chuẩn hóa được ghi ra file Parquet trong
+`data/.snapshots/`, khóa theo (đường dẫn nguồn + mtime + kích thước).
+Các lần đọc sau nạp thẳng file Parquet, bỏ qua openpyxl và các bước làm sạch cột.
+
+Snapshot được ghi theo thứ tự ngày với row group nhỏ, nên khi đọc có thể đẩy
+điều kiện khoảng ngày (start/end) và danh sách cột xuống tầng lưu trữ:
+pyarrow bỏ qua các row group nằm ngoài khoảng ngày và chỉ đọc các cột cần.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from typing import Callable, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Thư mục chứa snapshot (mirror lại cấu trúc thư mục nguồn)
+SNAPSHOT_DIR = os.path.join("data", ".snapshots")
+
+# Tăng giá trị này khi thay đổi logic chuẩn hóa để vô hiệu hóa toàn bộ snapshot cũ
+SNAPSHOT_VERSION = 3
+
+SNAPSHOT_EXT = ".parquet"
+
+# Số dòng mỗi row group (nhỏ → lọc theo ngày bỏ qua được nhiều row group hơn)
+SNAPSHOT_ROW_GROUP_SIZE = 128
+
+DATE_COLUMN = "date"
+
+
+# ======================================================
+# 🔑 KHÓA SNAPSHOT
+# ======================================================
+def snapshot_key(path: str) -> str:
+    """Khóa snapshot = hash(đường dẫn tuyệt đối + mtime + size + version)."""
+    stat = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|v{SNAPSHOT_VERSION}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _snapshot_folder(path: str, snapshot_dir: str) -> str:
+    """Thư mục snapshot tương ứng với thư mục chứa file nguồn."""
+    rel_dir = os.path.relpath(os.path.dirname(os.path.abspath(path)))
+    if rel_dir.startswith(".."):
+        # File nằm ngoài thư mục làm việc → gom theo hash của thư mục
+        rel_dir = hashlib.sha1(rel_dir.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(snapshot_dir, rel_dir)
+
+
+def snapshot_path(path: str, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """Đường dẫn file Parquet ứng với phiên bản hiện tại của file nguồn."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(
+        _snapshot_folder(path, snapshot_dir), f"{stem}.{snapshot_key(path)}{SNAPSHOT_EXT}"
+    )
+
+
+def _stale_snapshots(path: str, snapshot_dir: str) -> List[str]:
+    """Các snapshot cũ (khác khóa hiện tại) của cùng một file nguồn."""
+    folder = _snapshot_folder(path, snapshot_dir)
+    if not os.path.isdir(folder):
+        return []
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    current = os.path.basename(snapshot_path(path, snapshot_dir))
+    stale = []
+    for f in os.listdir(folder):
+        if f == current or not (f.startswith(f"{stem}.") and f.endswith(SNAPSHOT_EXT)):
+            continue
+        # Chỉ nhận đúng dạng {stem}.{key}.parquet — tránh xóa nhầm file của stem khác
+        key = f[len(stem) + 1:-len(SNAPSHOT_EXT)]
+        if len(key) == 16 and all(c in "0123456789abcdef" for c in key):
+            stale.append(os.path.join(folder, f))
+    return stale
+
+
+# ======================================================
+# 🔎 LỌC KHOẢNG NGÀY & CHỌN CỘT
+# ======================================================
+def _to_timestamp(value) -> Optional[pd.Timestamp]:
+    return None if value is None else pd.Timestamp(value)
+
+
+def filter_frame(
+    df: pd.DataFrame,
+    start=None,
+    end=None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Áp dụng khoảng ngày [start, end] và chọn cột trên DataFrame đã có trong bộ nhớ."""
+    start, end = _to_timestamp(start), _to_timestamp(end)
+    if (start is not None or end is not None) and DATE_COLUMN in df.columns:
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df[DATE_COLUMN] >= start
+        if end is not None:
+            mask &= df[DATE_COLUMN] <= end
+        df = df.loc[mask]
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+
+def _date_filters(start, end, schema_names: List[str]) -> Optional[List]:
+    """Điều kiện lọc theo ngày dạng pyarrow (None nếu không cần lọc)."""
+    start, end = _to_timestamp(start), _to_timestamp(end)
+    if DATE_COLUMN not in schema_names or (start is None and end is None):
+        return None
+    filters = []
+    if start is not None:
+        filters.append((DATE_COLUMN, ">=", start))
+    if end is not None:
+        filters.append((DATE_COLUMN, "<=", end))
+    return filters
+
+
+# ======================================================
+# 📥 ĐỌC / 📤 GHI SNAPSHOT
+# ======================================================
+def load_snapshot(
+    path: str,
+    snapshot_dir: str = SNAPSHOT_DIR,
+    start=None,
+    end=None,
+    columns: Optional[Sequence[str]] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Đọc snapshot nếu còn hợp lệ, trả về None nếu chưa có hoặc lỗi.
+
+    Args:
+        start, end: Khoảng ngày (bao gồm 2 đầu) — đẩy xuống pyarrow để bỏ qua row group
+        columns: Chỉ đọc các cột này (cột không tồn tại bị bỏ qua)
+    """
+    snap = snapshot_path(path, snapshot_dir)
+    if not os.path.exists(snap):
+        return None
+
+    try:
+        if start is None and end is None and columns is None:
+            return pd.read_parquet(snap)
+
+        names = pq.read_schema(snap).names
+        read_columns = None if columns is None else [c for c in columns if c in names]
+        df = pd.read_parquet(snap, columns=read_columns, filters=_date_filters(start, end, names))
+        return df.reset_index(drop=True)
+    except Exception as e:
+        logger.warning(f"Snapshot hỏng, sẽ tạo lại: {snap} ({e})")
+        try:
+            os.remove(snap)
+        except OSError:
+            pass
+        return None
+
+
+def snapshot_metadata(path: str, snapshot_dir: str = SNAPSHOT_DIR) -> Optional[dict]:
+    """
+    Số dòng, schema và khoảng ngày đọc từ footer Parquet của snapshot (không đọc dữ liệu).
+    None nếu chưa có snapshot hợp lệ.
+    """
+    snap = snapshot_path(path, snapshot_dir)
+    if not os.path.exists(snap):
+        return None
+    try:
+        parquet = pq.ParquetFile(snap)
+        schema = parquet.schema_arrow
+        meta = {
+            "rows": parquet.metadata.num_rows,
+            "columns": [[field.name, str(field.type)] for field in schema],
+            "date_min": None,
+            "date_max": None,
+        }
+        if DATE_COLUMN in schema.names:
+            index = schema.get_field_index(DATE_COLUMN)
+            mins, maxs = [], []
+            for group in range(parquet.metadata.num_row_groups):
+                stats = parquet.metadata.row_group(group).column(index).statistics
+                if stats is not None and stats.has_min_max:
+                    mins.append(pd.Timestamp(stats.min))
+                    maxs.append(pd.Timestamp(stats.max))
+            if mins:
+                meta["date_min"] = min(mins).strftime("%Y-%m-%d")
+                meta["date_max"] = max(maxs).strftime("%Y-%m-%d")
+        return meta
+    except Exception as e:
+        logger.warning(f"Không thể đọc metadata snapshot {snap}: {e}")
+        return None
+
+
+def write_snapshot(path: str, df: pd.DataFrame, snapshot_dir: str = SNAPSHOT_DIR) -> Optional[str]:
+    """
+    Ghi snapshot Parquet cho file nguồn `path`.
+
+    Ghi ra file tạm rồi `os.replace` để nhiều worker Streamlit ghi đồng thời
+    không làm hỏng file. Tên file tạm riêng theo process VÀ luồng: luồng mô tả của
+    catalog và luồng request có thể dựng cùng một snapshot cùng lúc.
+    Snapshot cũ của cùng nguồn được dọn dẹp.
+    """
+    snap = snapshot_path(path, snapshot_dir)
+    tmp = f"{snap}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(snap), exist_ok=True)
+        df.to_parquet(tmp, index=False, row_group_size=SNAPSHOT_ROW_GROUP_SIZE)
+        os.replace(tmp, snap)
+    except Exception as e:
+        logger.warning(f"Không thể ghi snapshot cho {path}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
+
+    for old in _stale_snapshots(path, snapshot_dir):
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+    return snap
+
+
+def load_or_build(
+    path: str,
+    builder: Callable[[str], pd.DataFrame],
+    snapshot_dir: str = SNAPSHOT_DIR,
+    force: bool = False,
+    start=None,
+    end=None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """
+    Trả về DataFrame từ snapshot nếu có; nếu không thì gọi `builder(path)`
+    (đọc Excel + chuẩn hóa) và ghi snapshot cho lần sau.
+
+    Args:
+        path: Đường dẫn file nguồn (.xlsx/.xls)
+        builder: Hàm đọc + chuẩn hóa file nguồn
+        snapshot_dir: Thư mục gốc chứa snapshot
+        force: Bỏ qua snapshot hiện có và tạo lại
+        start, end: Khoảng ngày cần đọc (None = toàn bộ)
+        columns: Danh sách cột cần đọc (None = toàn bộ)
+
+    Returns:
+        pd.DataFrame đã chuẩn hóa
+    """
+    if not force:
+        df = load_snapshot(path, snapshot_dir, start=start, end=end, columns=columns)
+        if df is not None:
+            return df
+
+    df = builder(path)
+    if not df.empty:
+        write_snapshot(path, df, snapshot_dir)
+    return filter_frame(df, start, end, columns).reset_index(drop=True)
@@ -0,0 +1,87 @@
+"""
+Script để chuyển trước toàn bộ file Excel trong data/ sang snapshot Parquet
+(giúp container mới khởi động "ấm" trước khi người dùng đầu tiên truy cập)
+Chạy: python warm_snapshots.py [--data-dir data] [--force] [--report] [--memory]
+"""
+
+import argparse
+import os
+import time
+
+from utils.data_loader import read_normalized_excel
+from utils.normalization import format_normalization_report
+from utils.dataset_catalog import DatasetCatalog
+from utils.memory_profile import compact_frame
+from utils.snapshot_store import SNAPSHOT_DIR, load_or_build, load_snapshot
+
+
+def iter_excel_files(data_dir: str):
+    """Liệt kê các file Excel trong cây thư mục data/ (bỏ qua snapshot & file tạm)"""
+    snapshot_root = os.path.abspath(SNAPSHOT_DIR)
+    for root, dirs, files in os.walk(data_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != snapshot_root)
+        for file in sorted(files):
+            if file.endswith((".xlsx", ".xls")) and not file.startswith("~$"):
+                yield os.path.join(root, file)
+
+
+def print_memory_profile(data_dir: str = "data"):
+    """In memory_usage(deep=True) trước/sau khi thu gọn dtype cho từng dataset"""
+    print(f"\n🗜️  Memory profile (compact dtypes):")
+    for path in iter_excel_files(data_dir):
+        df = load_or_build(path, read_normalized_excel)
+        _, mem = compact_frame(df, path)
+        print(
+            f"   {path}: {mem['before_bytes'] / 1024:8.1f} KB → {mem['after_bytes'] / 1024:8.1f} KB "
+            f"(-{mem['saved_pct']}%)"
+        )
+
+
+def warm_snapshots(data_dir: str = "data", force: bool = False, report: bool = False):
+    """Tạo snapshot Parquet cho mọi file Excel chưa có snapshot hợp lệ"""
+    converted, skipped, failed = 0, 0, 0
+
+    for path in iter_excel_files(data_dir):
+        if not force and load_snapshot(path) is not None:
+            skipped += 1
+            print(f"ℹ️  Đã có snapshot: {path}")
+            continue
+
+        start = time.perf_counter()
+        try:
+            df = load_or_build(path, read_normalized_excel, force=True)
+            converted += 1
+            print(f"✅ {path} → {len(df):,} dòng ({time.perf_counter() - start:.2f}s)")
+            if report:
+                table = format_normalization_report(df.attrs.get("normalization_report", []))
+                if not table.empty:
+                    print(table.to_string(index=False))
+        except Exception as e:
+            failed += 1
+            print(f"⚠️  Không thể chuyển {path}: {e}")
+
+    # Dựng luôn manifest catalog để app không phải quét/đọc file khi khởi động
+    catalog = DatasetCatalog(
+        data_dir,
+        manifest_path=os.path.join(data_dir, ".catalog.json"),
+        reader=lambda p: load_or_build(p, read_normalized_excel),
+    )
+    # Mô tả ngay trên luồng chính (không để refresh khởi động thêm luồng nền làm trùng việc)
+    changed = catalog.refresh(describe_in_background=False)
+    described = catalog.describe_pending()
+    print(f"📚 Catalog: cập nhật {changed} file, mô tả {described} file → {catalog.manifest_path}")
+
+    print(f"\n✨ Hoàn tất! Đã chuyển: {converted} | Bỏ qua: {skipped} | Lỗi: {failed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chuyển trước data/*.xlsx sang snapshot Parquet")
+    parser.add_argument("--data-dir", default="data", help="Thư mục dữ liệu gốc (mặc định: data)")
+    parser.add_argument("--force", action="store_true", help="Tạo lại snapshot kể cả khi đã có")
+    parser.add_argument("--report", action="store_true", help="In thời gian & dtype của từng cột khi chuẩn hóa")
+    parser.add_argument("--memory", action="store_true", help="In bộ nhớ trước/sau khi thu gọn dtype")
+    args = parser.parse_args()
+
+    warm_snapshots(args.data_dir, force=args.force, report=args.report)
+    if args.memory:
+        print_memory_profile(args.data_dir)